@@ -0,0 +1,712 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""AsyncMinitel est un module permettant de piloter un Minitel depuis une
+application asyncio.
+"""
+
+import asyncio
+from time import monotonic
+from queue import Empty # Exception levée lorsqu’aucun caractère n’arrive
+
+from minitel.Sequence import Sequence # Gestion des séquences de caractères
+from minitel.Protocole import Protocole # Réponses aux commandes protocole
+from minitel.Decodeur import Decodeur # Découpage des caractères reçus
+from minitel.Minitel import (MinitelBase, VITESSES, TRANSITIONS_MODE,
+    COMMANDES_ECHO, appels_clavier, appels_session, analyser_identification,
+    analyser_fonctionnement, delai_reponse, ordre_vitesses)
+
+from minitel.constantes import (PRO1, PRO2, PRO3, SOH, ENQROM,
+    STATUS_FONCTIONNEMENT, STATUS_TERMINAL, LONGUEUR_PRO2, LONGUEUR_PRO3,
+    PROG, CAPACITES_BASIQUES)
+
+class AsyncMinitel(MinitelBase):
+    """Une classe de pilotage du Minitel reposant sur asyncio
+
+    Présentation
+    ============
+
+    La classe AsyncMinitel offre les mêmes commandes que la classe Minitel
+    mais ne crée aucun thread : elle s’appuie sur les flux (streams) d’asyncio.
+    Une application peut ainsi servir de nombreux Minitel depuis une seule
+    boucle d’événements, à raison d’une coroutine par Minitel.
+
+    Les commandes qui se contentent d’émettre des caractères (couleur,
+    position, efface…) sont de simples méthodes : les octets sont placés
+    dans le tampon du flux d’écriture. La coroutine vider permet d’attendre
+    qu’ils aient été transmis.
+
+    Les commandes qui attendent une réponse du Minitel (appeler, identifier,
+    deviner_vitesse…) ainsi que la réception sont des coroutines.
+
+    Démarrage rapide
+    ================
+
+    ::
+
+        from minitel.AsyncMinitel import AsyncMinitel
+
+        async def session():
+            minitel = await AsyncMinitel.connecter('passerelle', 3615)
+
+            await minitel.deviner_vitesse()
+            await minitel.identifier()
+
+            # ...
+            # Utilisation de l’objet minitel
+            # ...
+
+            await minitel.close()
+    """
+    def __init__(self, lecteur, ecrivain, nom = None):
+        """Constructeur d’AsyncMinitel
+
+        :param lecteur:
+            le flux par lequel arrivent les caractères émis par le Minitel
+        :type lecteur:
+            un objet asyncio.StreamReader
+
+        :param ecrivain:
+            le flux par lequel les caractères sont envoyés au Minitel
+        :type ecrivain:
+            un objet asyncio.StreamWriter
+
+        :param nom:
+            nom du périphérique, utilisé pour se souvenir de sa vitesse, ou
+            None si ce nom ne désigne pas toujours le même Minitel (connexion
+            acceptée par un serveur)
+        :type nom:
+            une chaîne de caractères ou None
+        """
+        assert isinstance(lecteur, asyncio.StreamReader)
+        assert isinstance(ecrivain, asyncio.StreamWriter)
+        assert isinstance(nom, str) or nom == None
+
+        # Initialise l’état du Minitel
+        self.mode = 'VIDEOTEX'
+        self.vitesse = 1200
+
+        # Initialise la liste des capacités du Minitel
+        self.capacite = dict(CAPACITES_BASIQUES)
+
+        # Identifications déjà connues (un objet Profils), à renseigner par
+        # l’application pour accélérer la méthode identifier
+        self.profils = None
+
+        self.nom = nom
+        self._lecteur = lecteur
+        self._ecrivain = ecrivain
+
+        # Extrait les réponses aux commandes du flux reçu, les autres
+        # caractères étant conservés pour la méthode recevoir
+        self._protocole = Protocole()
+        self._clavier = bytearray()
+
+        # Découpe les caractères reçus en séquences pour recevoir_sequence
+        self.decodeur = Decodeur()
+        self._sequences = []
+
+        # Optimiseur appliqué aux octets émis (un objet Optimiseur), None pour
+        # émettre les octets tels quels. Il n’est valable qu’en mode Videotex.
+        self.optimiseur = None
+
+        # Compresseur remplaçant les suites de caractères identiques par des
+        # commandes REP (un objet Compresseur), None pour ne pas compresser
+        self.compresseur = None
+
+    @classmethod
+    async def connecter(cls, hote, port):
+        """Crée un AsyncMinitel relié à un Minitel accessible en TCP
+
+        :param hote:
+            nom ou adresse de l’hôte auquel se connecter
+        :type hote:
+            une chaîne de caractères
+
+        :param port:
+            port TCP auquel se connecter
+        :type port:
+            un entier
+
+        :returns:
+            un objet AsyncMinitel
+        """
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+
+        return cls(lecteur, ecrivain, 'tcp://%s:%d' % (hote, port))
+
+    @classmethod
+    async def ouvrir_serie(cls, peripherique = '/dev/ttyUSB0'):
+        """Crée un AsyncMinitel relié à un Minitel par un port série
+
+        Cette méthode nécessite le module pyserial-asyncio. La connexion est
+        établie selon le standard de base du Minitel : 1200 bps, 7 bits,
+        parité paire.
+
+        :param peripherique:
+            Le périphérique sur lequel est connecté le Minitel.
+        :type peripherique:
+            une chaîne de caractères
+
+        :returns:
+            un objet AsyncMinitel
+        """
+        # Dépendance optionnelle, seulement nécessaire pour ce cas
+        from serial_asyncio import open_serial_connection
+
+        lecteur, ecrivain = await open_serial_connection(
+            url      = peripherique,
+            baudrate = 1200, # vitesse à 1200 bps, le standard Minitel
+            bytesize = 7,    # taille de caractère à 7 bits
+            parity   = 'E',  # parité paire
+            stopbits = 1,    # 1 bit d’arrêt
+            xonxoff  = 0,    # pas de contrôle logiciel
+            rtscts   = 0     # pas de contrôle matériel
+        )
+
+        return cls(lecteur, ecrivain, peripherique)
+
+    async def close(self):
+        """Ferme la connexion avec le Minitel
+
+        Les caractères encore en attente d’émission sont envoyés avant la
+        fermeture.
+        """
+        await self.vider()
+        self._ecrivain.close()
+        await self._ecrivain.wait_closed()
+
+    def _regler_vitesse(self, vitesse):
+        """Configure la vitesse de la liaison série si elle existe
+
+        Les liaisons autres que série (TCP…) ne sont pas concernées.
+
+        :param vitesse:
+            vitesse en bits par seconde
+        :type vitesse:
+            un entier
+        """
+        serie = self._ecrivain.get_extra_info('serial')
+
+        if serie != None:
+            serie.baudrate = vitesse
+
+    def envoyer(self, contenu):
+        """Envoi de séquence de caractères
+
+        Place une séquence de caractère dans le tampon d’émission à destination
+        du Minitel. Voir la coroutine vider pour attendre son émission.
+
+        Si un optimiseur est défini, chaque envoi est réécrit par lui. Les
+        attributs déjà en vigueur sont alors omis d’un envoi à l’autre. Si un
+        compresseur est défini, les suites de caractères identiques sont
+        remplacées par des commandes REP. Tous deux ne s’appliquent qu’en
+        mode VIDEOTEX.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
+        """
+        contenu = self._preparer(contenu)
+
+        if len(contenu) == 0:
+            return
+
+        if self.optimiseur != None and self.mode == 'VIDEOTEX':
+            contenu = self.optimiseur.optimiser(contenu)
+
+        self._ecrivain.write(contenu)
+
+    async def vider(self):
+        """Attend que les caractères envoyés aient été transmis
+
+        C’est l’équivalent de la méthode join de la file sortie de la classe
+        Minitel.
+        """
+        await self._ecrivain.drain()
+
+    async def recevoir(self, attente = None):
+        """Lit un caractère en provenance du Minitel
+
+        :param attente:
+            attente en secondes, valeurs en dessous de la seconde acceptées.
+            Si attente = None, on attend indéfiniment qu’un caractère arrive.
+        :type attente:
+            un entier, un flottant ou None
+
+        :returns:
+            le caractère reçu
+
+        :raise Empty:
+            Lance une exception de type Empty si le temps d’attente a été
+            dépassé
+
+        :raise ConnectionError:
+            si la liaison avec le Minitel a été perdue
+        """
+        assert isinstance(attente, (int, float)) or attente == None
+
+        echeance = None
+        if attente != None:
+            echeance = monotonic() + attente
+
+        # Les séquences déjà découpées par recevoir_sequence mais non lues
+        # précèdent les caractères arrivés depuis
+        restant = bytearray()
+        for sequence in self._sequences:
+            restant += bytes(sequence.valeurs)
+
+        self._sequences = []
+        self._clavier[:0] = restant + self.decodeur.extraire()
+
+        # Lit jusqu’à obtenir un caractère ne faisant partie d’aucune réponse
+        while len(self._clavier) == 0:
+            if not await self._lire(echeance):
+                raise Empty
+
+        caractere = chr(self._clavier[0])
+        del self._clavier[0]
+
+        return caractere
+
+    async def _lire(self, echeance):
+        """Lit les caractères disponibles et les confie au protocole
+
+        :param echeance:
+            instant (horloge monotonic) au-delà duquel on abandonne, None pour
+            attendre indéfiniment
+        :type echeance:
+            un flottant ou None
+
+        :returns:
+            False si l’échéance est dépassée, True sinon
+
+        :raises ConnectionError:
+            si la liaison avec le Minitel a été perdue
+        """
+        attente = None
+        if echeance != None:
+            attente = max(0, echeance - monotonic())
+
+        try:
+            octets = await asyncio.wait_for(self._lecteur.read(4096), attente)
+        except asyncio.TimeoutError:
+            return False
+
+        # Une lecture vide indique que la connexion a été fermée
+        if len(octets) == 0:
+            raise ConnectionError('liaison avec le Minitel perdue')
+
+        clavier = self._protocole.traiter(octets)
+        self._clavier += clavier
+
+        # Le Minitel a pu afficher lui-même les caractères tapés
+        if self.ecran != None:
+            self.ecran.saisie(clavier)
+
+        return True
+
+    async def recevoir_sequence(self, attente = None):
+        """Lit une séquence en provenance du Minitel
+
+        Voir la méthode recevoir_sequence de la classe Minitel.
+
+        :param attente:
+            attente en secondes, valeurs en dessous de la seconde acceptées.
+            Si attente = None, on attend indéfiniment qu’un caractère arrive.
+        :type attente:
+            un entier, un flottant ou None
+
+        :returns:
+            un objet Sequence
+
+        :raise Empty:
+            si aucune séquence complète n’est arrivée dans le temps imparti
+
+        :raise ConnectionError:
+            si la liaison avec le Minitel a été perdue
+        """
+        assert isinstance(attente, (int, float)) or attente == None
+
+        fin = None
+        if attente != None:
+            fin = monotonic() + attente
+
+        self._sequences += self.decodeur.expirer()
+
+        while len(self._sequences) == 0:
+            # Les caractères déjà lus passent d’abord par le décodeur
+            if len(self._clavier) > 0:
+                self._sequences += self.decodeur.decoder(self._clavier)
+                self._clavier.clear()
+                continue
+
+            # Un ESC isolé en attente borne le temps de lecture
+            echeance = self.decodeur.echeance
+            if fin != None and (echeance == None or fin < echeance):
+                echeance = fin
+
+            try:
+                if await self._lire(echeance):
+                    continue
+            except ConnectionError:
+                # Un ESC isolé reçu avant la fermeture est encore rendu à
+                # son échéance
+                if self.decodeur.echeance == None:
+                    raise
+
+                await asyncio.sleep(
+                    max(0, self.decodeur.echeance - monotonic())
+                )
+
+            self._sequences += self.decodeur.expirer()
+            if len(self._sequences) > 0:
+                break
+
+            if self.decodeur.echeance == None or \
+               (fin != None and monotonic() >= fin):
+                raise Empty
+
+        return self._sequences.pop(0)
+
+    async def appeler(self, contenu, attente, motif = None, delai = 1):
+        """Envoie une séquence au Minitel et attend sa réponse.
+
+        Voir la méthode appeler de la classe Minitel.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe
+            Sequence
+        :type contenu:
+            un objet Sequence, une chaîne de caractères, une chaîne unicode
+            ou un entier
+
+        :param attente:
+            Nombre de caractères attendu de la part du Minitel en
+            réponse à notre envoi.
+        :type attente:
+            un entier
+
+        :param motif:
+            Début de la réponse attendue, None pour accepter les prochains
+            caractères quels qu’ils soient.
+        :type motif:
+            un objet Sequence, une liste, un entier ou None
+
+        :param delai:
+            Temps d’attente maximum de la réponse en secondes.
+        :type delai:
+            un entier ou un flottant
+
+        :returns:
+            un objet Sequence contenant la réponse du Minitel à la commande
+            envoyée.
+        """
+        assert isinstance(attente, int)
+
+        reponses, _ = await self.appeler_groupe(
+            [(contenu, attente, motif)],
+            delai
+        )
+
+        return reponses[0]
+
+    async def appeler_groupe(self, appels, delai = 1):
+        """Envoie plusieurs commandes en une fois et attend leurs réponses.
+
+        Voir la méthode appeler_groupe de la classe Minitel.
+
+        :param appels:
+            liste de tuples (commande, longueur de la réponse, début de la
+            réponse)
+        :type appels:
+            une liste de tuples
+
+        :param delai:
+            Temps d’attente maximum de l’ensemble des réponses en secondes.
+        :type delai:
+            un entier ou un flottant
+
+        :returns:
+            un tuple (réponses, durée) où réponses est la liste des objets
+            Sequence reçus, dans l’ordre des commandes, et durée le temps
+            écoulé en secondes
+        """
+        assert isinstance(appels, list)
+        assert isinstance(delai, (int, float))
+
+        debut = monotonic()
+
+        requetes = []
+        sequence = Sequence()
+        for commande, attente, motif in appels:
+            assert isinstance(attente, int)
+
+            requetes.append(self._protocole.attendre(motif, attente))
+            sequence.ajoute(commande)
+
+        # Envoie les commandes et attend qu’elles aient été transmises
+        self.envoyer(sequence)
+        await self.vider()
+
+        # Lit jusqu’à obtenir toutes les réponses, atteindre l’échéance ou
+        # perdre la liaison. Comme pour la classe Minitel, les réponses
+        # incomplètes sont alors retournées.
+        echeance = monotonic() + delai
+        try:
+            while not all(requete.terminee for requete in requetes):
+                if not await self._lire(echeance):
+                    break
+        except ConnectionError:
+            pass
+
+        # Retire les requêtes qui n’ont pas abouti
+        for requete in requetes:
+            self._protocole.annuler(requete)
+
+        self._clavier += self._protocole.traiter(b'')
+
+        return [requete.sequence() for requete in requetes], monotonic() - debut
+
+    async def definir_mode(self, mode = 'VIDEOTEX'):
+        """Définit le mode de fonctionnement du Minitel.
+
+        Voir la méthode definir_mode de la classe Minitel.
+
+        :param mode:
+            une valeur parmi les suivantes : VIDEOTEX,
+            MIXTE ou TELEINFORMATIQUE (la casse est importante).
+        :type mode:
+            une chaîne de caractères
+
+        :returns:
+            False si le changement de mode n’a pu avoir lieu, True sinon.
+        """
+        assert isinstance(mode, str)
+
+        # 3 modes sont possibles
+        if mode not in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']:
+            return False
+
+        # Si le mode demandé est déjà actif, ne fait rien
+        if self.mode == mode:
+            return True
+
+        # Effectue les appels nécessaires au changement de mode
+        for commande, longueur, attendu in TRANSITIONS_MODE[(self.mode, mode)]:
+            retour = await self.appeler(commande, longueur, attendu)
+
+            if not retour.egale(attendu):
+                return False
+
+        # Le changement a eu lieu, on garde le nouveau mode en mémoire
+        self.mode = mode
+
+        return True
+
+    async def identifier(self):
+        """Identifie le Minitel connecté.
+
+        Voir la méthode identifier de la classe Minitel.
+        """
+        self.capacite = dict(CAPACITES_BASIQUES)
+
+        profil = self._profil()
+
+        if profil != None:
+            retour = await self.appeler(
+                [PRO1, STATUS_FONCTIONNEMENT],
+                LONGUEUR_PRO2,
+                PRO2
+            )
+
+            if retour.longueur == LONGUEUR_PRO2:
+                self.capacite = analyser_identification(profil)
+                self.mode = analyser_fonctionnement(retour)
+                return
+
+        # Émet ensemble la commande d’identification et la demande du mode
+        # écran dans lequel se trouve le Minitel
+        (identification, fonctionnement), _ = await self.appeler_groupe([
+            ([PRO1, ENQROM], 5, SOH),
+            ([PRO1, STATUS_FONCTIONNEMENT], LONGUEUR_PRO2, PRO2)
+        ])
+
+        self._adopter_identification(identification, fonctionnement)
+
+    def _nom_stable(self):
+        """Retourne le nom sous lequel mémoriser le Minitel
+
+        :returns:
+            le nom donné à la construction, éventuellement None
+        """
+        return self.nom
+
+    async def deviner_vitesse(self):
+        """Deviner la vitesse de connexion avec le Minitel.
+
+        Voir la méthode deviner_vitesse de la classe Minitel. Sur une liaison
+        autre que série, seule la réponse du Minitel est vérifiée.
+
+        :returns:
+            La méthode retourne la vitesse en bits par seconde ou -1 si elle
+            n’a pas pu être déterminée.
+        """
+        for vitesse in ordre_vitesses(self._nom_stable()):
+            # Configure le port série à la vitesse à tester
+            self._regler_vitesse(vitesse)
+
+            # Envoie une demande de statut terminal
+            retour = await self.appeler(
+                [PRO1, STATUS_TERMINAL],
+                LONGUEUR_PRO2,
+                PRO2,
+                delai_reponse(vitesse, 2, LONGUEUR_PRO2)
+            )
+
+            # Les caractères reçus à une mauvaise vitesse sont inexploitables
+            self._oublier_entree()
+
+            # Le Minitel doit renvoyer un acquittement PRO2
+            if retour.longueur == LONGUEUR_PRO2:
+                self._adopter_vitesse(vitesse)
+                return vitesse
+
+        # La vitesse n’a pas été trouvée
+        return -1
+
+    def _oublier_entree(self):
+        """Supprime les caractères reçus et non encore lus"""
+        self._clavier.clear()
+        self._sequences = []
+        self.decodeur.extraire()
+
+    async def definir_vitesse(self, vitesse):
+        """Programme le Minitel et le port série pour une vitesse donnée.
+
+        Voir la méthode definir_vitesse de la classe Minitel.
+
+        :param vitesse:
+            vitesse en bits par seconde. Les valeurs acceptées sont 300, 1200,
+            4800 et 9600.
+        :type vitesse:
+            un entier
+
+        :returns:
+            True si la vitesse a pu être programmée, False sinon.
+        """
+        assert isinstance(vitesse, int)
+
+        # Teste la validité de la vitesse demandée
+        if vitesse not in VITESSES or vitesse > self.capacite['vitesse']:
+            return False
+
+        # Envoie une commande protocole de programmation de vitesse
+        retour = await self.appeler(
+            [PRO2, PROG, VITESSES[vitesse]],
+            LONGUEUR_PRO2,
+            PRO2,
+            delai_reponse(self.vitesse, 3, LONGUEUR_PRO2)
+        )
+
+        # Un acquittement PRO2 reçu avant d’avoir réglé la vitesse du port
+        # série indique que le Minitel ne peut pas utiliser cette vitesse
+        if retour.longueur == LONGUEUR_PRO2:
+            return False
+
+        # Configure le port série à la nouvelle vitesse
+        self._regler_vitesse(vitesse)
+        self._adopter_vitesse(vitesse)
+
+        return True
+
+    async def configurer_clavier(self, etendu = False, curseur = False,
+                                 minuscule = False):
+        """Configure le fonctionnement du clavier.
+
+        Voir la méthode configurer_clavier de la classe Minitel.
+
+        :returns:
+            True si toutes les commandes ont été acceptées, False sinon.
+        """
+        assert etendu in [True, False]
+        assert curseur in [True, False]
+        assert minuscule in [True, False]
+
+        # Envoie les commandes en une fois
+        appels = appels_clavier(etendu, curseur, minuscule)
+        retours, _ = await self.appeler_groupe(appels)
+
+        for (_, longueur, _), retour in zip(appels, retours):
+            if retour.longueur != longueur:
+                return False
+
+        return True
+
+    async def echo(self, actif):
+        """Active ou désactive l’écho clavier
+
+        Voir la méthode echo de la classe Minitel.
+
+        :param actif:
+            indique s’il faut activer l’écho (True) ou le désactiver (False)
+        :type actif:
+            un booléen
+
+        :returns:
+            True si la commande a été acceptée par le Minitel, False sinon.
+        """
+        assert actif in [True, False]
+
+        retour = await self.appeler(COMMANDES_ECHO[actif], LONGUEUR_PRO3, PRO3)
+
+        return retour.longueur == LONGUEUR_PRO3
+
+    async def initialiser(self, vitesse = None, mode = 'VIDEOTEX',
+                          etendu = False, curseur = False, minuscule = False,
+                          echo = None):
+        """Prépare une session avec le Minitel.
+
+        Voir la méthode initialiser de la classe Minitel.
+
+        :returns:
+            un dictionnaire contenant les clés 'vitesse', 'commandes' et
+            'duree'
+        """
+        assert mode in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']
+        assert echo in [True, False, None]
+
+        debut = monotonic()
+        bilan = { 'vitesse': -1, 'commandes': [], 'duree': 0 }
+
+        bilan['vitesse'] = await self.deviner_vitesse()
+
+        if bilan['vitesse'] != -1:
+            await self.identifier()
+
+            if vitesse != None and vitesse != self.vitesse and \
+               await self.definir_vitesse(vitesse):
+                bilan['vitesse'] = vitesse
+
+            appels = appels_session(
+                self.mode, mode, etendu, curseur, minuscule, echo
+            )
+
+            retours, _ = await self.appeler_groupe(
+                [(commande, longueur, motif)
+                 for _, commande, longueur, motif in appels]
+            )
+
+            for (etape, _, longueur, _), retour in zip(appels, retours):
+                bilan['commandes'].append(
+                    (etape, retour, retour.longueur == longueur)
+                )
+
+            if all(succes for etape, _, succes in bilan['commandes']
+                   if etape == 'mode'):
+                self.mode = mode
+
+        bilan['duree'] = monotonic() - debut
+
+        return bilan
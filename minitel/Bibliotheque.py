@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Bibliotheque est un module permettant de servir des pages Videotex
+rassemblées dans un fichier unique.
+
+Un service Minitel compte souvent des centaines de pages toutes prêtes
+(fichiers .vdt). Plutôt que de lire chaque fichier et de le convertir à
+chaque affichage, les pages sont assemblées une fois pour toutes dans un
+fichier de bibliothèque par la fonction assembler :
+
+- une signature,
+- un index associant à chaque nom de page sa position et sa longueur,
+- le contenu des pages, octet pour octet.
+
+Un objet Bibliotheque projette ce fichier en mémoire (mmap). Seul l’index est
+lu à l’ouverture. Le contenu des pages reste dans le cache du système, partagé
+par tous les processus qui ouvrent la même bibliothèque, et une page est
+transmise au Minitel sous la forme d’une vue (memoryview) sur la projection,
+sans copie ni conversion par Python.
+
+Exemple::
+
+    assembler('pages.bib', pages_vdt('pages'))
+
+    bibliotheque = Bibliotheque('pages.bib')
+    bibliotheque.afficher(minitel, 'accueil')
+"""
+
+import mmap
+import os
+import struct
+
+# Signature des fichiers de bibliothèque
+SIGNATURE = b'PYMINITEL-BIB\x01'
+
+# En-tête : signature, nombre de pages, taille de l’index
+ENTETE = struct.Struct('>%dsII' % len(SIGNATURE))
+
+# Entrée de l’index après le nom de la page : position et longueur
+ENTREE = struct.Struct('>QI')
+
+# Extension des fichiers de pages Videotex
+EXTENSION_VDT = '.vdt'
+
+def pages_vdt(dossier):
+    """Énumère les pages Videotex d’un dossier
+
+    Le nom de chaque page est celui de son fichier sans l’extension .vdt.
+    Les fichiers sont lus un par un, au fur et à mesure de l’énumération.
+
+    :param dossier:
+        dossier contenant les fichiers .vdt
+    :type dossier:
+        une chaîne de caractères
+
+    :returns:
+        un générateur de tuples (nom, octets)
+    """
+    for fichier in sorted(os.listdir(dossier)):
+        if not fichier.endswith(EXTENSION_VDT):
+            continue
+
+        with open(os.path.join(dossier, fichier), 'rb') as vdt:
+            yield (fichier[:-len(EXTENSION_VDT)], vdt.read())
+
+def assembler(chemin, pages):
+    """Crée un fichier de bibliothèque
+
+    Le fichier est d’abord écrit sous un nom temporaire puis renommé : une
+    bibliothèque ouverte par ailleurs n’est jamais modifiée.
+
+    :param chemin:
+        chemin du fichier de bibliothèque
+    :type chemin:
+        une chaîne de caractères
+
+    :param pages:
+        pages à rassembler, par exemple celles retournées par pages_vdt
+    :type pages:
+        un dictionnaire ou un itérable de tuples (nom, octets)
+
+    :raises ValueError:
+        si deux pages portent le même nom
+    """
+    if isinstance(pages, dict):
+        pages = pages.items()
+
+    temporaire = '%s.%d.tmp' % (chemin, os.getpid())
+
+    try:
+        # Le contenu des pages est écrit au fil de l’eau, l’index étant
+        # construit en mémoire et placé en tête à la fin
+        with open(temporaire + '.donnees', 'w+b') as donnees:
+            entrees = []
+            noms = set()
+            position = 0
+
+            for nom, octets in pages:
+                assert isinstance(nom, str) and len(nom) > 0
+
+                if nom in noms:
+                    raise ValueError('page %s en double' % nom)
+
+                noms.add(nom)
+                nom = nom.encode('utf-8')
+                entrees.append(struct.pack('>H', len(nom)) + nom +
+                               ENTREE.pack(position, len(octets)))
+                donnees.write(octets)
+                position += len(octets)
+
+            index = b''.join(entrees)
+
+            with open(temporaire, 'wb') as fichier:
+                fichier.write(ENTETE.pack(SIGNATURE, len(entrees),
+                                          len(index)))
+                fichier.write(index)
+
+                donnees.seek(0)
+                while True:
+                    bloc = donnees.read(1 << 20)
+                    if len(bloc) == 0:
+                        break
+                    fichier.write(bloc)
+
+        os.replace(temporaire, chemin)
+    finally:
+        for fichier in [temporaire, temporaire + '.donnees']:
+            try:
+                os.remove(fichier)
+            except FileNotFoundError:
+                pass
+
+class Bibliotheque:
+    """Pages Videotex d’un fichier de bibliothèque projeté en mémoire
+
+    Les vues retournées par la méthode page empêchent la fermeture de la
+    bibliothèque tant qu’elles existent : la méthode fermer ne doit être
+    appelée qu’une fois les pages transmises au Minitel.
+
+    Elle instaure l’attribut suivant :
+
+    - chemin : chemin du fichier de bibliothèque
+    """
+    def __init__(self, chemin):
+        """Constructeur
+
+        :param chemin:
+            chemin du fichier de bibliothèque
+        :type chemin:
+            une chaîne de caractères
+
+        :raises ValueError:
+            si le fichier n’est pas une bibliothèque de pages
+        """
+        self.chemin = chemin
+
+        with open(chemin, 'rb') as fichier:
+            self._projection = mmap.mmap(fichier.fileno(), 0,
+                                         access = mmap.ACCESS_READ)
+
+        try:
+            self._index = self._lire_index()
+        except (struct.error, UnicodeDecodeError, ValueError):
+            self._projection.close()
+            raise ValueError('%s n’est pas une bibliothèque de pages' % chemin)
+
+        self._vue = memoryview(self._projection)
+
+    def _lire_index(self):
+        """Lit l’index de la bibliothèque
+
+        :returns:
+            un dictionnaire associant à chaque nom de page un tuple (début,
+            fin) dans la projection
+        """
+        projection = self._projection
+        signature, nombre, taille = ENTETE.unpack_from(projection, 0)
+
+        if signature != SIGNATURE:
+            raise ValueError('signature invalide')
+
+        position = ENTETE.size
+        debut_donnees = position + taille
+
+        index = {}
+        for _ in range(nombre):
+            (longueur_nom,) = struct.unpack_from('>H', projection, position)
+            position += 2
+            nom = projection[position:position + longueur_nom].decode('utf-8')
+            position += longueur_nom
+            debut, longueur = ENTREE.unpack_from(projection, position)
+            position += ENTREE.size
+
+            debut += debut_donnees
+            if debut + longueur > len(projection):
+                raise ValueError('page %s tronquée' % nom)
+
+            index[nom] = (debut, debut + longueur)
+
+        if position != debut_donnees:
+            raise ValueError('index invalide')
+
+        return index
+
+    def __contains__(self, nom):
+        return nom in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def noms(self):
+        """Retourne les noms des pages de la bibliothèque
+
+        :returns:
+            une liste de chaînes de caractères
+        """
+        return list(self._index)
+
+    def page(self, nom):
+        """Retourne le contenu d’une page sans le copier
+
+        :param nom:
+            nom de la page
+        :type nom:
+            une chaîne de caractères
+
+        :returns:
+            un objet memoryview en lecture seule
+
+        :raises KeyError:
+            si la page n’existe pas
+        """
+        debut, fin = self._index[nom]
+
+        return self._vue[debut:fin]
+
+    def afficher(self, minitel, nom):
+        """Envoie une page au Minitel
+
+        La vue sur la page est transmise telle quelle à la méthode envoyer,
+        qui la place directement dans le flux de sortie.
+
+        :param minitel:
+            le Minitel destinataire
+        :type minitel:
+            un objet MinitelBase
+
+        :param nom:
+            nom de la page
+        :type nom:
+            une chaîne de caractères
+
+        :raises KeyError:
+            si la page n’existe pas
+        """
+        minitel.envoyer(self.page(nom))
+
+    def fermer(self):
+        """Ferme la bibliothèque
+
+        :raises BufferError:
+            si des vues sur les pages existent encore
+        """
+        self._vue.release()
+
+        try:
+            self._projection.close()
+        except BufferError:
+            self._vue = memoryview(self._projection)
+            raise
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""CodecVideotex est un module enregistrant les codecs videotex et
+minitel-mixte auprès du module codecs de Python.
+
+Une fois ce module importé (il l’est par le paquet minitel), les
+conversions entre chaînes unicode et octets Minitel se font d’un seul
+appel ::
+
+    octets = 'Opéra à 5 £'.encode('videotex')
+    texte = octets.decode('videotex')
+
+Le codec videotex correspond au standard VIDEOTEX (caractères spéciaux
+introduits par SS2), le codec minitel-mixte aux standards MIXTE et
+TELEINFORMATIQUE (caractères spéciaux encadrés par SO et SI). Les deux
+disposent d’un encodeur et d’un décodeur incrémentaux pour traiter des
+flux.
+
+L’encodage ne lève jamais d’erreur : comme pour la classe Sequence, un
+caractère sans équivalent est décomposé et réduit à la norme ASCII. Le
+décodage applique le paramètre errors (strict, replace ou ignore) aux
+séquences spéciales inconnues.
+"""
+
+import codecs
+from binascii import unhexlify
+from unicodedata import normalize
+
+from minitel.Sequence import (UNICODEVERSVIDEOTEX, UNICODEVERSAUTRE,
+    TABLES_CONVERSION, DIACRITIQUES)
+
+from minitel.constantes import SS2, SO
+
+# Codes suivant SS2 qui annoncent un accent et donc un troisième caractère,
+# et caractère combinant unicode correspondant
+ACCENTS_SS2 = {
+    code: diacritique for diacritique, code in DIACRITIQUES.items()
+}
+
+class TableComposition(dict):
+    """Table de conversion Minitel vers unicode composant les accents
+
+    En plus des séquences spéciales de la table de départ, toute séquence SS2,
+    accent, lettre est convertie en la lettre accentuée correspondante (forme
+    NFC). Si unicode ne connaît pas de telle lettre ou si l’accent porte sur
+    un autre caractère imprimable, l’accent est ignoré comme le ferait le
+    Minitel. Les séquences rencontrées sont mémorisées.
+    """
+    def __missing__(self, sequence):
+        """Compose et mémorise une séquence non encore rencontrée"""
+        if (len(sequence) != 3 or sequence[0] != SS2 or
+            sequence[1] not in ACCENTS_SS2 or
+            sequence[2] < 0x20 or sequence[2] >= 0x7f):
+            raise KeyError(sequence)
+
+        lettre = chr(sequence[2])
+        compose = normalize('NFC', lettre + ACCENTS_SS2[sequence[1]])
+
+        if len(compose) != 1:
+            compose = lettre
+
+        self[sequence] = compose
+
+        return compose
+
+def table_inverse(conversions):
+    """Construit la table de conversion Minitel vers unicode
+
+    Lorsque plusieurs caractères unicode ont le même équivalent Minitel, le
+    premier de la table est retenu. Les équivalents d’un seul caractère ASCII
+    sont ignorés : ils se décodent tels quels.
+
+    :param conversions:
+        table des caractères spéciaux et de leur équivalent en hexadécimal
+    :type conversions:
+        un dictionnaire
+
+    :returns:
+        un dictionnaire associant des octets à un caractère unicode
+    """
+    inverse = {}
+    for caractere, hexa in conversions.items():
+        octets = unhexlify(hexa)
+        if len(octets) > 1 and octets not in inverse:
+            inverse[octets] = caractere
+
+    return inverse
+
+VIDEOTEXVERSUNICODE = TableComposition(table_inverse(UNICODEVERSVIDEOTEX))
+AUTREVERSUNICODE = table_inverse(UNICODEVERSAUTRE)
+
+def _longueur_videotex(octets, position):
+    """Longueur de la séquence SS2 commençant à une position donnée
+
+    :returns:
+        la longueur de la séquence ou None si elle ne peut être déterminée
+        faute d’octets
+    """
+    if position + 1 >= len(octets):
+        return None
+
+    if octets[position + 1] in ACCENTS_SS2:
+        return 3
+
+    return 2
+
+def _longueur_mixte(octets, position):
+    """Longueur de la séquence SO … SI commençant à une position donnée
+
+    :returns:
+        toujours 3
+    """
+    return 3
+
+def _decoder(nom, octets, erreurs, final, introducteur, longueur, table):
+    """Décode des octets Minitel en texte unicode
+
+    Les octets situés entre deux séquences spéciales sont décodés d’un bloc.
+
+    :param nom:
+        nom du codec, utilisé dans les messages d’erreur
+    :param octets:
+        octets à décoder
+    :param erreurs:
+        gestion des erreurs : strict, replace ou ignore
+    :param final:
+        False si d’autres octets peuvent suivre. Une séquence incomplète en
+        fin de bloc n’est alors pas décodée.
+    :param introducteur:
+        code annonçant une séquence spéciale
+    :param longueur:
+        fonction donnant la longueur de la séquence spéciale
+    :param table:
+        table de conversion des séquences spéciales
+
+    :returns:
+        un tuple (texte, nombre d’octets consommés)
+    """
+    octets = bytes(octets)
+    morceaux = []
+    debut = 0
+    taille = len(octets)
+
+    while debut < taille:
+        position = octets.find(introducteur, debut)
+
+        if position == -1:
+            morceaux.append(octets[debut:].decode('ascii', erreurs))
+            debut = taille
+            break
+
+        morceaux.append(octets[debut:position].decode('ascii', erreurs))
+        debut = position
+
+        fin = longueur(octets, position)
+        if fin == None or position + fin > taille:
+            if not final:
+                break
+
+            fin = taille - position
+
+        try:
+            morceaux.append(table[octets[position:position + fin]])
+        except KeyError:
+            if erreurs == 'strict':
+                raise UnicodeDecodeError(
+                    nom, octets, position, position + fin,
+                    'séquence spéciale inconnue'
+                )
+            elif erreurs == 'replace':
+                morceaux.append('\ufffd')
+
+        debut = position + fin
+
+    return ''.join(morceaux), debut
+
+def encoder_videotex(texte, erreurs = 'strict'):
+    """Encode un texte unicode selon le standard VIDEOTEX
+
+    :returns:
+        un tuple (octets, nombre de caractères consommés)
+    """
+    table = TABLES_CONVERSION['VIDEOTEX']
+
+    return texte.translate(table).encode('latin-1'), len(texte)
+
+def encoder_mixte(texte, erreurs = 'strict'):
+    """Encode un texte unicode selon les standards MIXTE et TELEINFORMATIQUE
+
+    :returns:
+        un tuple (octets, nombre de caractères consommés)
+    """
+    table = TABLES_CONVERSION['MIXTE']
+
+    return texte.translate(table).encode('latin-1'), len(texte)
+
+def decoder_videotex(octets, erreurs = 'strict', final = True):
+    """Décode des octets Minitel du standard VIDEOTEX
+
+    :returns:
+        un tuple (texte, nombre d’octets consommés)
+    """
+    return _decoder(
+        'videotex', octets, erreurs, final,
+        bytes([SS2]), _longueur_videotex, VIDEOTEXVERSUNICODE
+    )
+
+def decoder_mixte(octets, erreurs = 'strict', final = True):
+    """Décode des octets Minitel des standards MIXTE et TELEINFORMATIQUE
+
+    :returns:
+        un tuple (texte, nombre d’octets consommés)
+    """
+    return _decoder(
+        'minitel-mixte', octets, erreurs, final,
+        bytes([SO]), _longueur_mixte, AUTREVERSUNICODE
+    )
+
+class EncodeurVideotex(codecs.IncrementalEncoder):
+    """Encodeur incrémental du standard VIDEOTEX"""
+    def encode(self, texte, final = False):
+        return encoder_videotex(texte, self.errors)[0]
+
+class DecodeurVideotex(codecs.BufferedIncrementalDecoder):
+    """Décodeur incrémental du standard VIDEOTEX"""
+    def _buffer_decode(self, octets, erreurs, final):
+        return decoder_videotex(octets, erreurs, final)
+
+class EncodeurMixte(codecs.IncrementalEncoder):
+    """Encodeur incrémental des standards MIXTE et TELEINFORMATIQUE"""
+    def encode(self, texte, final = False):
+        return encoder_mixte(texte, self.errors)[0]
+
+class DecodeurMixte(codecs.BufferedIncrementalDecoder):
+    """Décodeur incrémental des standards MIXTE et TELEINFORMATIQUE"""
+    def _buffer_decode(self, octets, erreurs, final):
+        return decoder_mixte(octets, erreurs, final)
+
+class LecteurVideotex(codecs.StreamReader):
+    """Lecteur de flux du standard VIDEOTEX"""
+    def decode(self, octets, erreurs = 'strict'):
+        return decoder_videotex(octets, erreurs, False)
+
+class EcrivainVideotex(codecs.StreamWriter):
+    """Écrivain de flux du standard VIDEOTEX"""
+    def encode(self, texte, erreurs = 'strict'):
+        return encoder_videotex(texte, erreurs)
+
+class LecteurMixte(codecs.StreamReader):
+    """Lecteur de flux des standards MIXTE et TELEINFORMATIQUE"""
+    def decode(self, octets, erreurs = 'strict'):
+        return decoder_mixte(octets, erreurs, False)
+
+class EcrivainMixte(codecs.StreamWriter):
+    """Écrivain de flux des standards MIXTE et TELEINFORMATIQUE"""
+    def encode(self, texte, erreurs = 'strict'):
+        return encoder_mixte(texte, erreurs)
+
+CODECS = {
+    'videotex': codecs.CodecInfo(
+        name = 'videotex',
+        encode = encoder_videotex,
+        decode = decoder_videotex,
+        incrementalencoder = EncodeurVideotex,
+        incrementaldecoder = DecodeurVideotex,
+        streamreader = LecteurVideotex,
+        streamwriter = EcrivainVideotex
+    ),
+    'minitel_mixte': codecs.CodecInfo(
+        name = 'minitel-mixte',
+        encode = encoder_mixte,
+        decode = decoder_mixte,
+        incrementalencoder = EncodeurMixte,
+        incrementaldecoder = DecodeurMixte,
+        streamreader = LecteurMixte,
+        streamwriter = EcrivainMixte
+    )
+}
+
+def rechercher(nom):
+    """Fonction de recherche de codec enregistrée auprès du module codecs
+
+    :param nom:
+        nom du codec normalisé par le module codecs (minuscules, tirets
+        remplacés par des soulignés)
+    :type nom:
+        une chaîne de caractères
+
+    :returns:
+        un objet CodecInfo ou None
+    """
+    return CODECS.get(nom.replace('-', '_'))
+
+codecs.register(rechercher)
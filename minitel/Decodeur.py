@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Decodeur est un module permettant de découper en séquences les
+caractères envoyés par le Minitel.
+
+Le Minitel envoie des séquences de longueur variable : un caractère simple,
+SS2 suivi d’un caractère (accents), SEP suivi d’un caractère (touches de
+fonction), ESC seul (touche Esc), ESC suivi d’un caractère ou une séquence
+CSI (touches du curseur). Le décodeur reçoit les octets par blocs de taille
+quelconque et conserve son état d’un bloc à l’autre. Il ne fait aucune
+entrée/sortie et peut donc servir aussi bien à la classe Minitel qu’à
+AsyncMinitel ou ServeurMinitel.
+"""
+
+from time import monotonic
+
+from minitel.Sequence import Sequence # Gestion des séquences de caractères
+
+from minitel.constantes import SS2, SEP, ESC
+
+# Temps d’attente après un ESC isolé avant de considérer qu’il s’agit de la
+# touche Esc et non du début d’une séquence
+ATTENTE_ESC = 0.1
+
+class Decodeur:
+    """Découpage incrémental des caractères reçus en séquences
+
+    Elle instaure les attributs suivants :
+
+    - attente_esc : temps d’attente en secondes après un ESC isolé
+    - echeance : instant (horloge monotonic) à partir duquel l’ESC isolé en
+      attente sera considéré comme complet, None s’il n’y en a pas
+    """
+    def __init__(self, attente_esc = ATTENTE_ESC):
+        """Constructeur
+
+        :param attente_esc:
+            temps d’attente en secondes après un ESC isolé
+        :type attente_esc:
+            un entier ou un flottant
+        """
+        assert isinstance(attente_esc, (int, float))
+
+        self.attente_esc = attente_esc
+        self.echeance = None
+
+        # Octets reçus ne formant pas encore une séquence complète
+        self._tampon = bytearray()
+
+    def decoder(self, octets, maintenant = None):
+        """Ajoute des octets reçus et retourne les séquences complètes
+
+        :param octets:
+            octets reçus du Minitel
+        :type octets:
+            un objet bytes ou bytearray
+
+        :param maintenant:
+            instant courant (horloge monotonic), None pour le lire
+        :type maintenant:
+            un flottant ou None
+
+        :returns:
+            la liste des objets Sequence complets, dans leur ordre d’arrivée
+        """
+        if maintenant == None:
+            maintenant = monotonic()
+
+        tampon = self._tampon
+        tampon += octets
+
+        sequences = []
+        debut = 0
+        taille = len(tampon)
+
+        while debut < taille:
+            premier = tampon[debut]
+            longueur = 1
+
+            if premier == SS2 or premier == SEP:
+                # Une séquence commençant par SS2 ou SEP a une longueur de 2
+                longueur = 2
+            elif premier == ESC:
+                if taille - debut == 1:
+                    # Un ESC isolé peut être la touche Esc ou le début d’une
+                    # séquence, on attend un peu avant de trancher
+                    if self.echeance == None:
+                        self.echeance = maintenant + self.attente_esc
+
+                    if maintenant < self.echeance:
+                        break
+                else:
+                    # Une séquence CSI (ESC, 0x5b) a une longueur de 3 ou 4
+                    longueur = 2
+                    if tampon[debut + 1] == 0x5b:
+                        longueur = 3
+                        if taille - debut > 2 and \
+                           tampon[debut + 2] in (0x32, 0x34):
+                            longueur = 4
+
+            # Attend la suite d’une séquence incomplète
+            if taille - debut < longueur:
+                break
+
+            sequences.append(Sequence(tampon[debut:debut + longueur]))
+            debut += longueur
+            self.echeance = None
+
+        del tampon[:debut]
+
+        return sequences
+
+    def expirer(self, maintenant = None):
+        """Retourne l’ESC isolé en attente si son échéance est atteinte
+
+        :param maintenant:
+            instant courant (horloge monotonic), None pour le lire
+        :type maintenant:
+            un flottant ou None
+
+        :returns:
+            la liste des objets Sequence devenus complets
+        """
+        return self.decoder(b'', maintenant)
+
+    def extraire(self):
+        """Retire et retourne les octets ne formant pas encore une séquence
+
+        :returns:
+            un objet bytes
+        """
+        octets = bytes(self._tampon)
+
+        self._tampon.clear()
+        self.echeance = None
+
+        return octets
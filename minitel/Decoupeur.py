@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Decoupeur est un module permettant de découper en commandes les octets
+envoyés au Minitel.
+
+C’est le pendant du module Decodeur pour le sens ordinateur vers Minitel :
+chaque commande (caractère, attribut, positionnement, déplacement…) est
+isolée et accompagnée de sa nature. Les octets peuvent être fournis par blocs
+de taille quelconque, une commande incomplète en fin de bloc étant conservée
+jusqu’au bloc suivant. Le découpeur ne fait aucune entrée/sortie.
+
+Les natures de commande sont les suivantes :
+
+- CARACTERE : un caractère affichable, éventuellement introduit par SS2
+- REPETITION : REP suivi du nombre de répétitions
+- ATTRIBUT : une couleur, une taille ou un effet (ESC suivi d’un code de
+  la table ATTRIBUTS)
+- POSITION : un positionnement absolu (US ligne colonne ou RS)
+- DEPLACEMENT : un déplacement relatif (BS, TAB, LF, VT ou CR)
+- PAGE : un effacement de l’écran (FF)
+- DEFINITION : une définition de caractères (US 0x23 et tout ce qui suit
+  jusqu’au prochain US), transmise telle quelle
+- CONTROLE : toute autre commande
+"""
+
+from minitel.Sequence import DIACRITIQUES
+
+from minitel.constantes import (SS2, SEP, ESC, US, RS, FF, REP, BS, TAB, LF,
+    VT, CR)
+
+CARACTERE = 'caractere'
+REPETITION = 'repetition'
+ATTRIBUT = 'attribut'
+POSITION = 'position'
+DEPLACEMENT = 'deplacement'
+PAGE = 'page'
+DEFINITION = 'definition'
+CONTROLE = 'controle'
+
+# Codes suivant ESC qui définissent un attribut et catégorie de l’attribut.
+# Deux attributs de même catégorie s’annulent : seul le dernier compte.
+ATTRIBUTS = {}
+ATTRIBUTS.update({0x40 + couleur: 'couleur' for couleur in range(8)})
+ATTRIBUTS.update({0x50 + couleur: 'fond' for couleur in range(8)})
+ATTRIBUTS.update({0x4c + taille: 'taille' for taille in range(4)})
+ATTRIBUTS.update({0x48: 'clignotement', 0x49: 'clignotement'})
+ATTRIBUTS.update({0x59: 'soulignement', 0x5a: 'soulignement'})
+ATTRIBUTS.update({0x5c: 'inversion', 0x5d: 'inversion'})
+
+# Valeur de chaque catégorie d’attribut après un positionnement ou un
+# effacement de l’écran
+ATTRIBUTS_DEFAUT = {
+    'couleur': 0x47,
+    'fond': 0x50,
+    'taille': 0x4c,
+    'clignotement': 0x49,
+    'soulignement': 0x59,
+    'inversion': 0x5c
+}
+
+# Longueur des commandes protocole selon l’octet suivant ESC
+LONGUEURS_PROTOCOLE = {0x39: 3, 0x3a: 4, 0x3b: 5}
+
+# Codes suivant SS2 qui annoncent un accent et donc un troisième octet
+ACCENTS = set(DIACRITIQUES.values())
+
+DEPLACEMENTS = {BS, TAB, LF, VT, CR}
+
+def longueur_commande(octets, position):
+    """Longueur de la commande commençant à une position donnée
+
+    Les commandes US 0x23 ne sont pas concernées : la définition de
+    caractères qu’elles introduisent se termine au prochain US.
+
+    :param octets:
+        octets à découper
+    :type octets:
+        un objet bytes ou bytearray
+
+    :param position:
+        position du premier octet de la commande
+    :type position:
+        un entier
+
+    :returns:
+        la longueur de la commande ou None si les octets disponibles ne
+        suffisent pas à la déterminer
+    """
+    taille = len(octets) - position
+    premier = octets[position]
+
+    if premier >= 0x20:
+        return 1
+
+    if premier == US:
+        return 3 if taille >= 3 else None
+
+    if premier == REP or premier == SEP:
+        return 2 if taille >= 2 else None
+
+    if premier == SS2:
+        if taille < 2:
+            return None
+
+        longueur = 3 if octets[position + 1] in ACCENTS else 2
+        return longueur if taille >= longueur else None
+
+    if premier != ESC:
+        return 1
+
+    if taille < 2:
+        return None
+
+    second = octets[position + 1]
+
+    if second in LONGUEURS_PROTOCOLE:
+        longueur = LONGUEURS_PROTOCOLE[second]
+        return longueur if taille >= longueur else None
+
+    if second == 0x5b:
+        # Séquence CSI : paramètres puis un octet final de 0x40 à 0x7e
+        for fin in range(position + 2, len(octets)):
+            if octets[fin] >= 0x40:
+                return fin - position + 1
+
+        return None
+
+    if second >= 0x20 and second <= 0x2f:
+        # Octets intermédiaires puis un octet final
+        for fin in range(position + 2, len(octets)):
+            if octets[fin] >= 0x30:
+                return fin - position + 1
+
+        return None
+
+    return 2
+
+class Decoupeur:
+    """Découpage incrémental des octets envoyés au Minitel en commandes
+
+    Elle instaure l’attribut suivant :
+
+    - definition : True si une définition de caractères est en cours
+    """
+    def __init__(self):
+        """Constructeur"""
+        self.definition = False
+
+        # Octets ne formant pas encore une commande complète
+        self._reste = b''
+
+    def decouper(self, octets):
+        """Ajoute des octets et retourne les commandes complètes
+
+        :param octets:
+            octets envoyés au Minitel
+        :type octets:
+            un objet bytes, bytearray ou memoryview
+
+        :returns:
+            la liste des commandes complètes sous forme de tuples (nature,
+            octets), dans leur ordre d’émission
+        """
+        if len(self._reste) > 0:
+            octets = self._reste + bytes(octets)
+            self._reste = b''
+        else:
+            octets = bytes(octets)
+
+        commandes = []
+        debut = 0
+        taille = len(octets)
+
+        while debut < taille:
+            # Une définition de caractères se poursuit jusqu’au prochain US
+            if self.definition:
+                fin = octets.find(US, debut)
+                if fin == -1:
+                    fin = taille
+                else:
+                    self.definition = False
+
+                if fin > debut:
+                    commandes.append((DEFINITION, octets[debut:fin]))
+
+                debut = fin
+                continue
+
+            premier = octets[debut]
+
+            if premier >= 0x20:
+                commandes.append((CARACTERE, octets[debut:debut + 1]))
+                debut += 1
+                continue
+
+            longueur = longueur_commande(octets, debut)
+            if longueur == None:
+                self._reste = octets[debut:]
+                break
+
+            commande = octets[debut:debut + longueur]
+            debut += longueur
+
+            if premier == US:
+                if commande[1] == 0x23:
+                    # Début d’une définition de caractères
+                    self.definition = True
+                    commandes.append((DEFINITION, commande))
+                else:
+                    commandes.append((POSITION, commande))
+            elif premier == RS:
+                commandes.append((POSITION, commande))
+            elif premier == FF:
+                commandes.append((PAGE, commande))
+            elif premier in DEPLACEMENTS:
+                commandes.append((DEPLACEMENT, commande))
+            elif premier == SS2:
+                commandes.append((CARACTERE, commande))
+            elif premier == REP:
+                commandes.append((REPETITION, commande))
+            elif premier == ESC and longueur == 2 and commande[1] in ATTRIBUTS:
+                commandes.append((ATTRIBUT, commande))
+            else:
+                commandes.append((CONTROLE, commande))
+
+        return commandes
+
+    def extraire(self):
+        """Retire et retourne les octets ne formant pas encore une commande
+
+        :returns:
+            un objet bytes
+        """
+        octets = self._reste
+        self._reste = b''
+
+        return octets
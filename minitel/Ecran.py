@@ -0,0 +1,811 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Ecran est un module permettant de suivre ce qui est affiché sur l’écran
+d’un Minitel.
+
+Le modèle d’écran est tenu à jour à partir des octets envoyés au Minitel :
+contenu de chaque case, position du curseur, attributs en vigueur (couleurs,
+taille, effets), jeu de caractères G0 ou G1 et visibilité du curseur.
+
+Il est prudent : tout ce qu’il ne peut déterminer avec certitude vaut None.
+C’est le cas au départ, après une commande dont il ne connaît pas l’effet
+ou lorsque le Minitel a pu afficher de lui-même les caractères tapés au
+clavier. Seul le mode Videotex est suivi, le modèle ignorant tout de l’écran
+dans les autres modes.
+"""
+
+from threading import RLock
+
+from minitel.Decoupeur import (Decoupeur, CARACTERE, REPETITION, ATTRIBUT,
+    POSITION, DEPLACEMENT, PAGE, DEFINITION, ATTRIBUTS, ATTRIBUTS_DEFAUT)
+
+from minitel.constantes import (ESC, US, RS, BS, TAB, LF, VT, CR, SO, SI,
+    CON, COF, CAN, NUL, BEL, AIGUILLAGE_ON, AIGUILLAGE_OFF, RCPT_ECRAN,
+    EMET_MODEM, START, STOP, ROULEAU)
+
+# Nombre de lignes de l’écran, ligne 0 (ligne d’état) comprise
+LIGNES = 25
+
+# Nombre de colonnes selon le mode
+COLONNES = {'VIDEOTEX': 40, 'MIXTE': 80, 'TELEINFORMATIQUE': 80}
+
+# Ordre des attributs dans une case de la grille
+ORDRE_ATTRIBUTS = ('couleur', 'fond', 'taille', 'clignotement',
+                   'soulignement', 'inversion')
+
+# Case vide telle que laissée par un effacement de l’écran
+CASE_VIDE = (b' ',) + tuple(
+    ATTRIBUTS_DEFAUT[categorie] for categorie in ORDRE_ATTRIBUTS
+) + ('G0',)
+
+# Commandes de changement de mode et mode obtenu
+CHANGEMENTS_MODE = {
+    bytes([ESC, 0x3a, 0x31, 0x7d]): 'TELEINFORMATIQUE',
+    bytes([ESC, 0x3a, 0x32, 0x7d]): 'MIXTE',
+    bytes([ESC, 0x3a, 0x32, 0x7e]): 'VIDEOTEX',
+    bytes([ESC, 0x5b, 0x3f, 0x7b]): 'VIDEOTEX'
+}
+
+# Commandes d’activation et de désactivation de l’écho clavier
+COMMANDES_ECHO = {
+    bytes([ESC, 0x3b, AIGUILLAGE_ON, RCPT_ECRAN, EMET_MODEM]): True,
+    bytes([ESC, 0x3b, AIGUILLAGE_OFF, RCPT_ECRAN, EMET_MODEM]): False
+}
+
+# Commandes d’activation et de désactivation du mode rouleau
+COMMANDES_ROULEAU = {
+    bytes([ESC, 0x3a, START, ROULEAU]): True,
+    bytes([ESC, 0x3a, STOP, ROULEAU]): False
+}
+
+# Commandes sans effet sur l’écran
+SANS_EFFET = {bytes([NUL]), bytes([BEL])}
+
+# Tailles de caractère et nombre de colonnes et de lignes occupées
+ENCOMBREMENTS = {0x4c: (1, 1), 0x4d: (1, 2), 0x4e: (2, 1), 0x4f: (2, 2)}
+
+def commande_position(colonne, ligne):
+    """Retourne la commande de positionnement absolu la plus courte
+
+    :returns:
+        un objet bytes (RS ou US ligne colonne)
+    """
+    if colonne == 1 and ligne == 1:
+        return bytes([RS])
+
+    return bytes([US, 0x40 + ligne, 0x40 + colonne])
+
+def _csi(nombre, final):
+    """Retourne une séquence CSI de déplacement (A, B, C ou D)"""
+    return b'\x1b[' + str(nombre).encode('ascii') + final
+
+def deplacement_vertical(ecart):
+    """Retourne le déplacement vertical relatif le plus court
+
+    :param ecart:
+        nombre de lignes, négatif vers le haut
+    :type ecart:
+        un entier
+
+    :returns:
+        un objet bytes
+    """
+    if ecart < 0:
+        return min(bytes([VT]) * -ecart, _csi(-ecart, b'A'), key = len)
+
+    if ecart > 0:
+        return min(bytes([LF]) * ecart, _csi(ecart, b'B'), key = len)
+
+    return b''
+
+def deplacement_lateral(ecart):
+    """Retourne le déplacement horizontal relatif le plus court ne dépendant
+    pas de la position du curseur
+
+    :param ecart:
+        nombre de colonnes, négatif vers la gauche
+    :type ecart:
+        un entier
+
+    :returns:
+        un objet bytes
+    """
+    if ecart < 0:
+        return min(bytes([BS]) * -ecart, _csi(-ecart, b'D'), key = len)
+
+    if ecart > 0:
+        return min(bytes([TAB]) * ecart, _csi(ecart, b'C'), key = len)
+
+    return b''
+
+def deplacement_horizontal(colonne, cible, cases = None, attributs = None,
+                           jeu = None):
+    """Retourne le déplacement horizontal relatif le plus court sur une ligne
+
+    Outre BS, TAB, CR et les séquences CSI, le curseur peut être avancé en
+    réécrivant les cases qui le séparent de la cible, si elles sont connues
+    et ont été écrites avec les attributs en vigueur.
+
+    :param colonne:
+        colonne de départ
+    :type colonne:
+        un entier
+
+    :param cible:
+        colonne d’arrivée
+    :type cible:
+        un entier
+
+    :param cases:
+        cases de la ligne, None pour ne pas réécrire de case
+    :type cases:
+        une liste de tuples ou None
+
+    :param attributs:
+        attributs en vigueur
+    :type attributs:
+        un dictionnaire
+
+    :param jeu:
+        jeu de caractères en vigueur
+    :type jeu:
+        une chaîne de caractères
+
+    :returns:
+        un objet bytes
+    """
+    def avancer(depuis):
+        """Chemins vers la droite depuis une colonne"""
+        chemins = [deplacement_lateral(cible - depuis)]
+
+        if cases != None:
+            reecriture = reecrire(cases, depuis, cible, attributs, jeu)
+            if reecriture != None:
+                chemins.append(reecriture)
+
+        return min(chemins, key = len)
+
+    if cible == colonne:
+        return b''
+
+    if cible > colonne:
+        return avancer(colonne)
+
+    chemins = [deplacement_lateral(cible - colonne)]
+
+    retour = bytes([CR])
+    if cible > 1:
+        retour += avancer(1)
+
+    chemins.append(retour)
+
+    return min(chemins, key = len)
+
+def reecrire(cases, debut, fin, attributs, jeu):
+    """Retourne les octets réécrivant des cases à l’identique
+
+    :param cases:
+        cases de la ligne
+    :type cases:
+        une liste de tuples
+
+    :param debut:
+        première colonne à réécrire
+    :type debut:
+        un entier
+
+    :param fin:
+        colonne suivant la dernière à réécrire
+    :type fin:
+        un entier
+
+    :param attributs:
+        attributs en vigueur
+    :type attributs:
+        un dictionnaire
+
+    :param jeu:
+        jeu de caractères en vigueur
+    :type jeu:
+        une chaîne de caractères
+
+    :returns:
+        un objet bytes ou None si une case n’est pas connue ou a été écrite
+        avec d’autres attributs
+    """
+    attendu = tuple(
+        attributs[categorie] for categorie in ORDRE_ATTRIBUTS
+    ) + (jeu,)
+
+    if None in attendu or attendu[2] != ATTRIBUTS_DEFAUT['taille']:
+        return None
+
+    octets = bytearray()
+    for case in cases[debut - 1:fin - 1]:
+        if case == None or case[1:] != attendu:
+            return None
+
+        octets += case[0]
+
+    return bytes(octets)
+
+class Ecran:
+    """Modèle de l’écran d’un Minitel
+
+    Une case de la grille est un tuple (octets, couleur, fond, taille,
+    clignotement, soulignement, inversion, jeu) : les octets du caractère
+    affiché, les codes des attributs avec lesquels il l’a été (voir la table
+    ATTRIBUTS du module Decoupeur) et le jeu de caractères. Une case dont le
+    contenu n’est pas connu vaut None.
+
+    Elle instaure les attributs suivants :
+
+    - mode : VIDEOTEX, MIXTE ou TELEINFORMATIQUE
+    - colonnes : nombre de colonnes de l’écran
+    - grille : liste de 25 lignes (de 0 à 24) contenant chacune une liste de
+      cases (la colonne 1 est à l’indice 0)
+    - ligne, colonne : position du curseur, None si elle n’est pas connue
+    - attributs : dictionnaire associant à chaque catégorie d’attribut le
+      code en vigueur, None s’il n’est pas connu
+    - jeu : G0, G1 ou None
+    - visible : True si le curseur est affiché, False s’il ne l’est pas,
+      None si ce n’est pas connu
+    - echo : True si le Minitel affiche de lui-même les caractères tapés au
+      clavier, False s’il ne le fait pas, None si ce n’est pas connu
+    - rouleau : True si le mode rouleau est actif, False s’il ne l’est pas,
+      None si ce n’est pas connu
+    - verrou : verrou à acquérir pour consulter le modèle de manière
+      cohérente lorsqu’il est partagé entre plusieurs threads, les méthodes
+      publiques l’acquérant d’elles-mêmes
+    """
+    def __init__(self, mode = 'VIDEOTEX', rouleau = None):
+        """Constructeur
+
+        :param mode:
+            mode dans lequel se trouve le Minitel
+        :type mode:
+            une chaîne de caractères
+
+        :param rouleau:
+            True si le mode rouleau est actif, False s’il ne l’est pas, None
+            si ce n’est pas connu
+        :type rouleau:
+            un booléen ou None
+        """
+        assert mode in COLONNES
+        assert rouleau in [True, False, None]
+
+        self.decoupeur = Decoupeur()
+        self.echo = None
+        self.rouleau = rouleau
+
+        # Le thread de réception d’un Minitel invalide le modèle pendant que
+        # d’autres threads lui transmettent ce qu’ils envoient
+        self.verrou = RLock()
+
+        self._changer_mode(mode)
+
+    def _changer_mode(self, mode):
+        """Passe dans un nouveau mode, tout l’écran devenant inconnu
+
+        :param mode:
+            nouveau mode
+        :type mode:
+            une chaîne de caractères
+        """
+        self.mode = mode
+        self.colonnes = COLONNES[mode]
+        self.grille = [[None] * self.colonnes for _ in range(LIGNES)]
+        self.ligne = None
+        self.colonne = None
+        self.visible = None
+        self._oublier_attributs()
+
+        # Insertion de caractères active (CSI 4 h)
+        self._insertion = False
+
+        # Dernier caractère affiché, pour REP
+        self._dernier = None
+
+        # Position, attributs et jeu à restaurer en sortant de la ligne 0
+        self._sauvegarde = None
+
+    def invalider(self):
+        """Oublie le contenu de l’écran et la position du curseur
+
+        À appeler lorsque le Minitel a pu modifier l’écran de lui-même, par
+        exemple en affichant les caractères tapés au clavier.
+        """
+        with self.verrou:
+            self.grille = [[None] * self.colonnes for _ in range(LIGNES)]
+            self.ligne = None
+            self.colonne = None
+            self._dernier = None
+
+    def saisie(self, octets):
+        """Prend en compte des octets reçus du clavier du Minitel
+
+        Si l’écho clavier n’est pas connu pour être désactivé, le Minitel a
+        pu afficher ces caractères et l’écran est donc invalidé.
+
+        :param octets:
+            octets reçus du Minitel
+        :type octets:
+            un objet bytes ou bytearray
+        """
+        if len(octets) > 0 and self.echo != False:
+            self.invalider()
+
+    def case(self, colonne, ligne):
+        """Retourne le contenu d’une case de l’écran
+
+        :param colonne:
+            colonne de la case (à partir de 1)
+        :type colonne:
+            un entier
+
+        :param ligne:
+            ligne de la case (0 à 24)
+        :type ligne:
+            un entier
+
+        :returns:
+            un tuple (octets, couleur, fond, taille, clignotement,
+            soulignement, inversion, jeu) ou None si le contenu n’est pas
+            connu
+        """
+        assert isinstance(colonne, int) and 1 <= colonne <= self.colonnes
+        assert isinstance(ligne, int) and 0 <= ligne < LIGNES
+
+        return self.grille[ligne][colonne - 1]
+
+    def inutile(self, commande):
+        """Indique si une commande ne changerait rien à l’écran
+
+        Seuls les attributs, la visibilité du curseur, le jeu de caractères
+        et le positionnement absolu sont examinés.
+
+        :param commande:
+            une commande complète
+        :type commande:
+            un objet bytes
+
+        :returns:
+            True si la commande peut ne pas être émise sans rien changer,
+            False sinon
+        """
+        with self.verrou:
+            return self._inutile(commande)
+
+    def _inutile(self, commande):
+        """Voir la méthode inutile, le verrou étant acquis"""
+        if self.mode != 'VIDEOTEX' or len(commande) == 0:
+            return False
+
+        premier = commande[0]
+
+        if len(commande) == 1:
+            if premier == CON or premier == COF:
+                return self.visible == (premier == CON)
+
+            if premier == SO or premier == SI:
+                return self.jeu == ('G1' if premier == SO else 'G0')
+
+            if premier == RS:
+                return self._defaut(1, 1)
+
+            return False
+
+        if premier == ESC and len(commande) == 2 and commande[1] in ATTRIBUTS:
+            return self.attributs[ATTRIBUTS[commande[1]]] == commande[1]
+
+        if premier == US and len(commande) == 3 and commande[1] > 0x40:
+            return self._defaut(commande[2] - 0x40, commande[1] - 0x40)
+
+        return False
+
+    def planifier(self, colonne, ligne, relatif = False):
+        """Retourne les octets amenant le curseur à une position au plus court
+
+        Un positionnement absolu (US, RS) remet les attributs à leur valeur
+        par défaut : il n’est remplacé par un déplacement relatif que si les
+        attributs en vigueur sont déjà ceux par défaut. À l’inverse, un
+        déplacement relatif n’est remplacé par un positionnement absolu que
+        dans ce même cas.
+
+        :param colonne:
+            colonne d’arrivée, ou écart si relatif vaut True
+        :type colonne:
+            un entier
+
+        :param ligne:
+            ligne d’arrivée, ou écart si relatif vaut True
+        :type ligne:
+            un entier
+
+        :param relatif:
+            True si les coordonnées sont relatives à la position du curseur
+        :type relatif:
+            un booléen
+
+        :returns:
+            un objet bytes ou None si la position du curseur n’est pas connue
+            et que le déplacement demandé est relatif
+        """
+        with self.verrou:
+            return self._planifier(colonne, ligne, relatif)
+
+    def _planifier(self, colonne, ligne, relatif):
+        """Voir la méthode planifier, le verrou étant acquis"""
+        if self.mode != 'VIDEOTEX' or self.ligne == None:
+            if relatif:
+                return None
+
+            return commande_position(colonne, ligne)
+
+        if relatif:
+            colonne += self.colonne
+            ligne += self.ligne
+
+        defaut = self.jeu == 'G0' and self.attributs == ATTRIBUTS_DEFAUT
+        absolu = commande_position(colonne, ligne)
+
+        # Les déplacements relatifs ne sont calculés qu’entre les lignes 1 à
+        # 24, sans passer par les bords de l’écran
+        if (self.ligne == 0 or not 1 <= ligne < LIGNES or
+            not 1 <= colonne <= self.colonnes):
+            if relatif:
+                return None
+
+            return absolu
+
+        if not relatif and not defaut:
+            return absolu
+
+        chemin = deplacement_vertical(ligne - self.ligne)
+        chemin += deplacement_horizontal(
+            self.colonne, colonne, self.grille[ligne], self.attributs,
+            self.jeu
+        )
+
+        if defaut and len(absolu) < len(chemin):
+            return absolu
+
+        return chemin
+
+    def _defaut(self, colonne, ligne):
+        """Indique si le curseur est à une position donnée avec les attributs
+        par défaut, c’est-à-dire dans l’état laissé par un positionnement
+        """
+        return (self.ligne == ligne and self.colonne == colonne and
+                self.jeu == 'G0' and self.attributs == ATTRIBUTS_DEFAUT)
+
+    def traiter(self, octets):
+        """Met à jour le modèle avec des octets envoyés au Minitel
+
+        :param octets:
+            octets envoyés au Minitel
+        :type octets:
+            un objet bytes, bytearray ou memoryview
+        """
+        with self.verrou:
+            self._traiter(octets)
+
+    def _traiter(self, octets):
+        """Voir la méthode traiter, le verrou étant acquis"""
+        for nature, commande in self.decoupeur.decouper(octets):
+            # En dehors du mode Videotex, seuls les changements de mode sont
+            # suivis
+            if commande in CHANGEMENTS_MODE:
+                self._changer_mode(CHANGEMENTS_MODE[commande])
+            elif self.mode != 'VIDEOTEX':
+                continue
+            elif nature == CARACTERE:
+                self._afficher(commande)
+            elif nature == REPETITION:
+                self._repeter(commande[1] - 0x40)
+            elif nature == ATTRIBUT:
+                self.attributs[ATTRIBUTS[commande[1]]] = commande[1]
+            elif nature == POSITION:
+                self._positionner(commande)
+            elif nature == DEPLACEMENT:
+                self._deplacer(commande[0])
+            elif nature == PAGE:
+                self._effacer_page()
+            elif nature == DEFINITION:
+                # La définition de caractères ne modifie pas l’écran
+                continue
+            else:
+                self._controler(commande)
+
+    def _oublier_attributs(self):
+        """Rend inconnus les attributs et le jeu de caractères"""
+        self.attributs = {categorie: None for categorie in ATTRIBUTS_DEFAUT}
+        self.jeu = None
+
+    def _reinitialiser_attributs(self):
+        """Remet les attributs et le jeu de caractères par défaut"""
+        self.attributs.update(ATTRIBUTS_DEFAUT)
+        self.jeu = 'G0'
+
+    def _afficher(self, caractere):
+        """Affiche un caractère à la position du curseur"""
+        self._dernier = caractere
+
+        if self.ligne == None:
+            self.invalider()
+            return
+
+        taille = self.attributs['taille']
+        largeur, hauteur = ENCOMBREMENTS.get(taille, (None, None))
+
+        case = (caractere,) + tuple(
+            self.attributs[categorie] for categorie in ORDRE_ATTRIBUTS
+        ) + (self.jeu,)
+
+        if None in case:
+            case = None
+
+        ligne = self.grille[self.ligne]
+        indice = self.colonne - 1
+
+        if self._insertion:
+            # Le reste de la ligne est décalé
+            for autre in range(indice, self.colonnes):
+                ligne[autre] = None
+
+        ligne[indice] = case
+
+        # Les cases recouvertes par un caractère agrandi ne sont pas connues
+        if largeur == None or largeur == 2:
+            if indice + 1 < self.colonnes:
+                ligne[indice + 1] = None
+
+        if (largeur == None or hauteur == 2) and self.ligne > 1:
+            self.grille[self.ligne - 1][indice] = None
+            if largeur != 1 and indice + 1 < self.colonnes:
+                self.grille[self.ligne - 1][indice + 1] = None
+
+        if largeur == None:
+            self.ligne = None
+            self.colonne = None
+            return
+
+        self._avancer(largeur)
+
+    def _repeter(self, nombre):
+        """Répète le dernier caractère affiché"""
+        if self._dernier == None:
+            self.invalider()
+            return
+
+        for _ in range(nombre):
+            self._afficher(self._dernier)
+
+    def _avancer(self, largeur):
+        """Avance le curseur après un caractère ou une tabulation"""
+        self.colonne += largeur
+
+        if self.colonne <= self.colonnes:
+            return
+
+        # Passage à la ligne suivante
+        if self.ligne == 0:
+            self.ligne = None
+            self.colonne = None
+        else:
+            self.colonne = 1
+            self._descendre()
+
+    def _descendre(self):
+        """Passe à la ligne suivante"""
+        if self.ligne < LIGNES - 1:
+            self.ligne += 1
+        elif self.rouleau == False:
+            self.ligne = 1
+        else:
+            # Le défilement de l’écran n’est pas suivi
+            self.invalider()
+
+    def _monter(self):
+        """Passe à la ligne précédente"""
+        if self.ligne > 1:
+            self.ligne -= 1
+        elif self.rouleau == False:
+            self.ligne = LIGNES - 1
+        else:
+            # Le défilement de l’écran n’est pas suivi
+            self.invalider()
+
+    def _positionner(self, commande):
+        """Traite un positionnement absolu (US ou RS)"""
+        if commande[0] == RS:
+            ligne, colonne = 1, 1
+        elif commande[1] >= 0x40:
+            ligne, colonne = commande[1] - 0x40, commande[2] - 0x40
+        else:
+            ligne, colonne = None, None
+
+        if ligne == 0 and self.ligne != 0:
+            # La ligne 0 est quittée par LF en retrouvant l’état antérieur
+            self._sauvegarde = (self.ligne, self.colonne,
+                                dict(self.attributs), self.jeu)
+        elif ligne != 0:
+            self._sauvegarde = None
+
+        if (ligne == None or ligne >= LIGNES or
+            colonne < 1 or colonne > self.colonnes):
+            ligne, colonne = None, None
+
+        self.ligne = ligne
+        self.colonne = colonne
+        self._reinitialiser_attributs()
+
+    def _deplacer(self, code):
+        """Traite un déplacement relatif (BS, TAB, LF, VT, CR)"""
+        if self.ligne == None:
+            return
+
+        if code == CR:
+            self.colonne = 1
+        elif code == TAB:
+            self._avancer(1)
+        elif code == BS:
+            if self.colonne > 1:
+                self.colonne -= 1
+            elif self.ligne == 0:
+                self.ligne = None
+                self.colonne = None
+            else:
+                self.colonne = self.colonnes
+                self._monter()
+        elif code == LF:
+            if self.ligne == 0:
+                self._quitter_ligne_zero()
+            else:
+                self._descendre()
+        elif code == VT:
+            if self.ligne == 0:
+                self.ligne = None
+                self.colonne = None
+            else:
+                self._monter()
+
+    def _quitter_ligne_zero(self):
+        """Quitte la ligne 0 en retrouvant l’état antérieur"""
+        if self._sauvegarde == None:
+            self.ligne = None
+            self.colonne = None
+            self._oublier_attributs()
+            return
+
+        self.ligne, self.colonne, self.attributs, self.jeu = self._sauvegarde
+        self._sauvegarde = None
+
+    def _effacer_page(self):
+        """Traite un effacement de l’écran (FF)"""
+        for ligne in range(1, LIGNES):
+            self.grille[ligne] = [CASE_VIDE] * self.colonnes
+
+        self.ligne = 1
+        self.colonne = 1
+        self._sauvegarde = None
+        self._reinitialiser_attributs()
+
+    def _effacer(self, ligne, debut, fin):
+        """Rend inconnu le contenu d’une partie de ligne effacée"""
+        for indice in range(debut - 1, fin):
+            self.grille[ligne][indice] = None
+
+    def _controler(self, commande):
+        """Traite toute autre commande"""
+        if commande in COMMANDES_ECHO:
+            self.echo = COMMANDES_ECHO[commande]
+            return
+
+        if commande in COMMANDES_ROULEAU:
+            self.rouleau = COMMANDES_ROULEAU[commande]
+            return
+
+        premier = commande[0]
+
+        if commande in SANS_EFFET:
+            return
+
+        if premier == CON or premier == COF:
+            self.visible = premier == CON
+        elif premier == SO or premier == SI:
+            self.jeu = 'G1' if premier == SO else 'G0'
+        elif premier == CAN:
+            if self.ligne == None:
+                self.invalider()
+            else:
+                self._effacer(self.ligne, self.colonne, self.colonnes)
+        elif premier == ESC and len(commande) > 2 and commande[1] == 0x5b:
+            self._csi(commande[2:-1], commande[-1])
+        elif premier == ESC and commande[1] in (0x39, 0x3a, 0x3b, 0x61):
+            # Les autres commandes protocole ne modifient pas l’écran
+            return
+        elif premier == ESC and len(commande) == 2:
+            # Attributs non suivis (masquage, incrustation…)
+            return
+        else:
+            # Commande dont l’effet n’est pas connu
+            self.invalider()
+            self._oublier_attributs()
+
+    def _csi(self, parametres, final):
+        """Traite une séquence CSI
+
+        :param parametres:
+            octets situés entre CSI et l’octet final
+        :type parametres:
+            un objet bytes
+
+        :param final:
+            octet final de la séquence
+        :type final:
+            un entier
+        """
+        if parametres == b'4' and final in (0x68, 0x6c):
+            # Début (h) ou fin (l) de l’insertion de caractères
+            self._insertion = final == 0x68
+            return
+
+        if parametres.isdigit():
+            nombre = int(parametres)
+        elif parametres == b'':
+            nombre = None
+        else:
+            self.invalider()
+            return
+
+        if self.ligne == None or self.ligne == 0:
+            self.invalider()
+            return
+
+        if final in (0x41, 0x42, 0x43, 0x44):
+            # Déplacements haut (A), bas (B), droite (C) et gauche (D)
+            nombre = 1 if nombre == None else nombre
+            if final == 0x41:
+                self.ligne -= nombre
+            elif final == 0x42:
+                self.ligne += nombre
+            elif final == 0x43:
+                self.colonne += nombre
+            else:
+                self.colonne -= nombre
+
+            if not (1 <= self.ligne < LIGNES and
+                    1 <= self.colonne <= self.colonnes):
+                self.ligne = None
+                self.colonne = None
+        elif final == 0x4a and nombre in (None, 0, 1):
+            # Effacement jusqu’à la fin (0) ou depuis le début (1) de l’écran
+            if nombre == 1:
+                for ligne in range(1, self.ligne):
+                    self._effacer(ligne, 1, self.colonnes)
+                self._effacer(self.ligne, 1, self.colonne)
+            else:
+                self._effacer(self.ligne, self.colonne, self.colonnes)
+                for ligne in range(self.ligne + 1, LIGNES):
+                    self._effacer(ligne, 1, self.colonnes)
+        elif final == 0x4b and nombre in (None, 0, 1, 2):
+            # Effacement de la fin, du début ou de toute la ligne
+            if nombre == 1:
+                self._effacer(self.ligne, 1, self.colonne)
+            elif nombre == 2:
+                self._effacer(self.ligne, 1, self.colonnes)
+            else:
+                self._effacer(self.ligne, self.colonne, self.colonnes)
+        elif final == 0x50 or final == 0x40:
+            # Suppression (P) ou insertion (@) de caractères : la fin de la
+            # ligne est décalée
+            self._effacer(self.ligne, self.colonne, self.colonnes)
+        elif final == 0x4c or final == 0x4d:
+            # Insertion (L) ou suppression (M) de lignes : la suite de
+            # l’écran est décalée
+            for ligne in range(self.ligne, LIGNES):
+                self._effacer(ligne, 1, self.colonnes)
+        else:
+            self.invalider()
@@ -9,7 +9,7 @@ from operator import itemgetter
 
 from minitel.constantes import ESC, SO, DC2, COULEURS_MINITEL
 from minitel.Sequence import Sequence
-from minitel.Minitel import Minitel
+from minitel.Minitel import MinitelBase
 from math import sqrt
 
 def _huit_niveaux(niveau):
@@ -180,7 +180,7 @@ class ImageMinitel:
         :type disjoint:
             un booléen
         """
-        assert isinstance(minitel, Minitel)
+        assert isinstance(minitel, MinitelBase)
         assert isinstance(disjoint, bool)
 
         self.minitel = minitel
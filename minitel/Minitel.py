@@ -4,16 +4,23 @@
 écrit en Python.
 """
 
-from serial import Serial      # Liaison physique avec le Minitel
-from threading import Thread   # Threads pour l’émission/réception
-from queue import Queue, Empty # Files de caractères pour l’émission/réception
+from abc import ABC, abstractmethod # Méthodes à implémenter par les pilotes
+from threading import Thread, Lock, Event # Threads pour l’émission/réception
+from queue import Queue, Empty # Files d’octets pour l’émission/réception
+from time import monotonic     # Horloge pour les délais
 
 from minitel.Sequence import Sequence # Gestion des séquences de caractères
-
-from minitel.constantes import (SS2, SEP, ESC, CSI, PRO1, PRO2, PRO3, MIXTE1,
+from minitel.Transport import Transport, ouvrir # Liaison avec le Minitel
+from minitel.Protocole import Protocole # Réponses aux commandes protocole
+from minitel.Profils import Profils # Identifications déjà connues
+from minitel.Decodeur import Decodeur # Découpage des caractères reçus
+from minitel.Ecran import (Ecran, deplacement_vertical,
+    deplacement_lateral) # Modèle de l’écran du Minitel
+
+from minitel.constantes import (SEP, ESC, CSI, PRO1, PRO2, PRO3, MIXTE1,
     MIXTE2, TELINFO, ENQROM, SOH, EOT, TYPE_MINITELS, STATUS_FONCTIONNEMENT,
     LONGUEUR_PRO2, STATUS_TERMINAL, PROG, START, STOP, LONGUEUR_PRO3,
-    RCPT_CLAVIER, ETEN, C0, MINUSCULES, RS, US, VT, LF, BS, TAB, CON, COF,
+    RCPT_CLAVIER, ETEN, C0, MINUSCULES, RS, US, LF, CON, COF,
     AIGUILLAGE_ON, AIGUILLAGE_OFF, RCPT_ECRAN, EMET_MODEM, FF, CAN, BEL, CR,
     SO, SI, B300, B1200, B4800, B9600, REP, COULEURS_MINITEL,
     CAPACITES_BASIQUES, CONSTRUCTEURS)
@@ -47,635 +54,529 @@ def normaliser_couleur(couleur):
 
     return None
 
-class Minitel:
-    """Une classe de pilotage du Minitel via un port série
-
-    Présentation
-    ============
+def encodage_fait(contenu):
+    """Indique si un contenu peut être envoyé sans conversion
 
-    La classe Minitel permet d’envoyer et de recevoir des séquences de
-    caractères vers et depuis un Minitel dans un programme écrit en Python.
-    Elle fonctionne via une liaison série entre l’ordinateur et le Minitel.
+    Un objet bytes ou une vue en lecture seule (par exemple une page d’un
+    fichier projeté en mémoire) contient des octets déjà encodés qui ne
+    changeront pas avant leur émission : il est transmis tel quel.
 
-    Par défaut, elle utilise /dev/ttyUSB0 comme périphérique. En effet, l’une
-    des manières les plus simples de relier un Minitel à un ordinateur
-    consiste à utiliser un câble USB-TTL 5v (PL2303) car la prise
-    péri-informatique du Minitel fonctionne en TTL (0v/5v) et non en RS232
-    (-12v/12v). Ce type de câble embarque un composant qui est reconnu
-    automatiquement par les noyaux Linux et est assigné à /dev/ttyUSB*. Sous
-    Android, le noyau Linux ne dispose pas du pilote en standard.
+    :param contenu:
+        le contenu à envoyer
 
-    Tant que le périphérique sélectionné est un périphérique série, cette
-    classe ne devrait pas poser de problème pour communiquer avec le Minitel.
-    Par exemple, il est tout à fait possible de créer un proxy série en
-    utilisant un Arduino relié en USB à l’ordinateur et dont certaines
-    broches seraient relié au Minitel.
+    :returns:
+        True si le contenu peut être envoyé sans conversion
+    """
+    return type(contenu) is bytes or (
+        type(contenu) is memoryview and contenu.readonly
+    )
 
-    La classe Minitel permet de déterminer la vitesse de fonctionnement du
-    Minitel, d’identifier le modèle, de le configurer et d’envoyer et recevoir
-    des séquences de caractères.
+# Vitesses possibles jusqu’au Minitel 2 et codes PRO2+PROG correspondants
+VITESSES = {300: B300, 1200: B1200, 4800: B4800, 9600: B9600}
 
-    Compte tenu de son fonctionnement en threads, le programme principal
-    utilisant cette classe n’a pas à se soucier d’être disponible pour recevoir
-    les séquences de caractères envoyées par le Minitel.
+# Dernière vitesse détectée ou programmée pour chaque périphérique. Un Minitel
+# conserve sa vitesse tant qu’il n’est pas éteint : c’est donc la première à
+# essayer lors d’une reconnexion. Seuls les transports stables y figurent, le
+# nom des autres ne servant qu’une fois.
+VITESSES_CONNUES = {}
 
-    Démarrage rapide
-    ================
+# Temps laissé au Minitel pour traiter une commande, en plus du temps de
+# transmission des caractères
+MARGE_REPONSE = 0.1
 
-    Le cycle de vie d’un objet Minitel consiste en la création, la
-    détermination de la vitesse du Minitel, de ses capacités, l’utilisation
-    du Minitel par l’application et la libération des ressources::
-        
-        from minitel.Minitel import Minitel
+def delai_reponse(vitesse, envoi, reception):
+    """Calcule le temps d’attente d’une réponse du Minitel.
 
-        minitel = Minitel()
+    Chaque caractère occupe 10 bits sur la liaison (1 bit de départ, 7 bits
+    de données, 1 bit de parité et 1 bit d’arrêt).
 
-        minitel.deviner_vitesse()
-        minitel.identifier()
+    :param vitesse:
+        vitesse de la liaison en bits par seconde
+    :type vitesse:
+        un entier
 
-        # ...
-        # Utilisation de l’objet minitel
-        # ...
+    :param envoi:
+        nombre de caractères de la commande
+    :type envoi:
+        un entier
 
-        minitel.close()
+    :param reception:
+        nombre de caractères de la réponse
+    :type reception:
+        un entier
 
+    :returns:
+        le temps d’attente en secondes
     """
-    def __init__(self, peripherique = '/dev/ttyUSB0'):
-        """Constructeur de Minitel
+    return (envoi + reception) * 10 / vitesse + MARGE_REPONSE
 
-        La connexion série est établie selon le standard de base du Minitel.
-        À l’allumage le Minitel est configuré à 1200 bps, 7 bits, parité paire,
-        mode Vidéotex.
+def ordre_vitesses(nom):
+    """Retourne les vitesses à essayer pour détecter celle d’un Minitel.
 
-        Cela peut ne pas correspondre à la configuration réelle du Minitel au
-        moment de l’exécution. Cela n’est toutefois pas un problème car la
-        connexion série peut être reconfigurée à tout moment.
+    La dernière vitesse connue pour le périphérique est essayée en premier,
+    puis les autres de la plus rapide à la plus lente.
 
-        :param peripherique:
-            Le périphérique sur lequel est connecté le Minitel.Par défaut, le
-            périphérique est /dev/ttyUSB0
-        :type peripherique:
-            String
-    
-        """
-        assert isinstance(peripherique, str)
+    :param nom:
+        nom du périphérique
+    :type nom:
+        une chaîne de caractères ou None
 
-        # Initialise l’état du Minitel
-        self.mode = 'VIDEOTEX'
-        self.vitesse = 1200
+    :returns:
+        une liste de vitesses en bits par seconde
+    """
+    vitesses = [9600, 4800, 1200, 300]
+
+    if nom in VITESSES_CONNUES:
+        vitesses.remove(VITESSES_CONNUES[nom])
+        vitesses.insert(0, VITESSES_CONNUES[nom])
+
+    return vitesses
+
+# Changements de mode : pour chaque couple (mode actuel, mode demandé), la
+# liste des appels à effectuer sous la forme (commande, longueur de la réponse,
+# réponse attendue). Il y a 9 cas possibles, mais seulement 6 sont pertinents.
+# Les cas demandant de passer de VIDEOTEX à VIDEOTEX, par exemple, ne donnent
+# lieu à aucune transaction avec le Minitel.
+#
+# Il n’existe pas de commande permettant de passer directement du mode
+# TéléInformatique au mode Mixte. On effectue donc la transition en deux
+# étapes en passant par le mode Videotex.
+TRANSITIONS_MODE = {
+    ('TELEINFORMATIQUE', 'VIDEOTEX'): [
+        ([CSI, 0x3f, 0x7b], 2, [SEP, 0x5e])
+    ],
+    ('TELEINFORMATIQUE', 'MIXTE'): [
+        ([CSI, 0x3f, 0x7b], 2, [SEP, 0x5e]),
+        ([PRO2, MIXTE1], 2, [SEP, 0x70])
+    ],
+    ('VIDEOTEX', 'MIXTE'): [
+        ([PRO2, MIXTE1], 2, [SEP, 0x70])
+    ],
+    ('VIDEOTEX', 'TELEINFORMATIQUE'): [
+        ([PRO2, TELINFO], 4, [CSI, 0x3f, 0x7a])
+    ],
+    ('MIXTE', 'VIDEOTEX'): [
+        ([PRO2, MIXTE2], 2, [SEP, 0x71])
+    ],
+    ('MIXTE', 'TELEINFORMATIQUE'): [
+        ([PRO2, TELINFO], 4, [CSI, 0x3f, 0x7a])
+    ]
+}
+
+# Commandes d’activation/désactivation de l’écho clavier
+COMMANDES_ECHO = {
+    True: [PRO3, AIGUILLAGE_ON, RCPT_ECRAN, EMET_MODEM],
+    False: [PRO3, AIGUILLAGE_OFF, RCPT_ECRAN, EMET_MODEM]
+}
+
+def appels_clavier(etendu, curseur, minuscule):
+    """Retourne les appels nécessaires à la configuration du clavier.
+
+    :param etendu:
+        True pour un clavier en mode étendu, False pour un clavier en mode
+        normal
+    :type etendu:
+        un booléen
+
+    :param curseur:
+        True si les touches du curseur doivent être gérées, False sinon
+    :type curseur:
+        un booléen
+
+    :param minuscule:
+        True si les touches alphabétiques doivent générer des minuscules
+    :type minuscule:
+        un booléen
 
-        # Initialise la liste des capacités du Minitel
-        self.capacite = CAPACITES_BASIQUES
+    :returns:
+        une liste de tuples (commande, longueur de la réponse, début de la
+        réponse)
+    """
+    # Les commandes clavier fonctionnent sur un principe de bascule
+    # start/stop
+    bascules = { True: START, False: STOP }
+
+    return [
+        ([PRO3, bascules[etendu   ], RCPT_CLAVIER, ETEN], LONGUEUR_PRO3, PRO3),
+        ([PRO3, bascules[curseur  ], RCPT_CLAVIER, C0  ], LONGUEUR_PRO3, PRO3),
+        ([PRO2, bascules[minuscule], MINUSCULES        ], LONGUEUR_PRO2, PRO2)
+    ]
+
+def appels_session(actuel, mode, etendu, curseur, minuscule, echo):
+    """Retourne les appels nécessaires à la préparation d’une session.
+
+    Les appels peuvent être envoyés en une seule fois au Minitel. Le
+    changement de mode est placé de sorte que toutes les commandes soient
+    reçues dans un mode qui les interprète : en dernier pour passer en mode
+    TéléInformatique, en premier dans les autres cas.
+
+    :param actuel:
+        mode actuel du Minitel
+    :type actuel:
+        une chaîne de caractères
+
+    :param mode:
+        mode souhaité (VIDEOTEX, MIXTE ou TELEINFORMATIQUE)
+    :type mode:
+        une chaîne de caractères
+
+    :param etendu:
+        True pour un clavier en mode étendu, False pour un clavier en mode
+        normal
+    :type etendu:
+        un booléen
+
+    :param curseur:
+        True si les touches du curseur doivent être gérées, False sinon
+    :type curseur:
+        un booléen
+
+    :param minuscule:
+        True si les touches alphabétiques doivent générer des minuscules
+    :type minuscule:
+        un booléen
+
+    :param echo:
+        True pour activer l’écho clavier, False pour le désactiver, None pour
+        ne pas y toucher
+    :type echo:
+        un booléen ou None
 
-        # Crée les deux files d’attente entrée/sortie
-        self.entree = Queue()
-        self.sortie = Queue()
+    :returns:
+        une liste de tuples (étape, commande, longueur de la réponse, début de
+        la réponse), l’étape valant 'mode', 'clavier' ou 'echo'
+    """
+    appels_mode = [
+        ('mode', commande, longueur, attendu)
+        for commande, longueur, attendu in TRANSITIONS_MODE.get(
+            (actuel, mode), []
+        )
+    ]
 
-        # Initialise la connexion avec le Minitel
-        self._minitel = Serial(
-            peripherique,
-            baudrate = 1200, # vitesse à 1200 bps, le standard Minitel
-            bytesize = 7,    # taille de caractère à 7 bits
-            parity   = 'E',  # parité paire
-            stopbits = 1,    # 1 bit d’arrêt
-            timeout  = 1,    # 1 bit de timeout
-            xonxoff  = 0,    # pas de contrôle logiciel
-            rtscts   = 0     # pas de contrôle matériel
+    appels = [
+        ('clavier', commande, longueur, motif)
+        for commande, longueur, motif in appels_clavier(
+            etendu, curseur, minuscule
         )
+    ]
 
-        # Initialise un drapeau pour l’arrêt des threads
-        # (les threads partagent les mêmes variables que le code principal)
-        self._continuer = True
+    if echo != None:
+        appels.append(('echo', COMMANDES_ECHO[echo], LONGUEUR_PRO3, PRO3))
 
-        # Crée les deux threads de lecture/écriture
-        self._threads = []
-        self._threads.append(Thread(None, self._gestion_entree, None, ()))
-        self._threads.append(Thread(None, self._gestion_sortie, None, ()))
+    if mode == 'TELEINFORMATIQUE':
+        return appels + appels_mode
 
-        # Démarre les deux threads de lecture/écriture
-        for thread in self._threads:
-            # Configure chaque thread en mode daemon
-            thread.setDaemon(True)
-            try:
-                # Lance le thread
-                thread.start()
-            except (KeyboardInterrupt, SystemExit):
-                self.close()
+    return appels_mode + appels
 
-    def close(self):
-        """Ferme la connexion avec le Minitel
+def analyser_identification(retour):
+    """Analyse la réponse d’un Minitel à la commande ENQROM.
 
-        Indique aux threads d’émission/réception qu’ils doivent s’arrêter et
-        attend leur arrêt. Comme les timeouts d’émission et de réception sont
-        réglés à 1 seconde, c’est le temps moyen que cette méthode mettra pour
-        s’exécuter.
-        """
-        # Indique aux threads qu’ils doivent arrêter toute activité
-        self._continuer = False
+    :param retour:
+        la réponse du Minitel à la commande PRO1 ENQROM
+    :type retour:
+        un objet Sequence
 
-        # Attend que tous les threads aient fini
-        for thread in self._threads:
-            thread.join()
+    :returns:
+        un nouveau dictionnaire des capacités du Minitel (voir
+        Minitel.identifier) ou None si la réponse n’est pas valide.
+    """
+    # Teste la validité de la réponse
+    if (retour.longueur != 5 or
+        retour.valeurs[0] != SOH or
+        retour.valeurs[4] != EOT):
+        return None
 
-        self._minitel.close()
+    # Les dictionnaires de référence sont copiés afin que chaque Minitel
+    # dispose de ses propres capacités
+    capacite = dict(CAPACITES_BASIQUES)
 
-    def _gestion_entree(self):
-        """Gestion des séquences de caractères envoyées depuis le Minitel
+    # Extrait les caractères d’identification
+    constructeur_minitel = chr(retour.valeurs[1])
+    type_minitel         = chr(retour.valeurs[2])
+    version_logiciel     = chr(retour.valeurs[3])
 
-        Cette méthode ne doit pas être appelée directement, elle est réservée
-        exclusivement à la classe Minitel. Elle boucle indéfiniment en tentant
-        de lire un caractère sur la connexion série.
-        """
-        # Ajoute à la file entree tout ce que le Minitel peut envoyer
-        while self._continuer:
-            # Attend un caractère pendant 1 seconde
-            caractere = self._minitel.read()
+    # Types de Minitel
+    if type_minitel in TYPE_MINITELS:
+        capacite = dict(TYPE_MINITELS[type_minitel])
 
-            if len(caractere) == 1:
-                self.entree.put(caractere)
+    if constructeur_minitel in CONSTRUCTEURS:
+        capacite['constructeur'] = CONSTRUCTEURS[constructeur_minitel]
 
-    def _gestion_sortie(self):
-        """Gestion des séquences de caractères envoyées vers le Minitel
+    capacite['version'] = version_logiciel
 
-        Cette méthode ne doit pas être appelée directement, elle est réservée
-        exclusivement à la classe Minitel. Elle boucle indéfiniment en tentant
-        de lire un caractère sur la file de sortie.
-        """
-        # Envoie au Minitel tout ce qui se trouve dans la file sortie et
-        # continue de le faire tant que le drapeau continuer est à vrai
-        while self._continuer or not self.sortie.empty():
-            # Attend un caractère pendant 1 seconde
-            try:
-                sortie_unicode = self.sortie.get(block = True, timeout = 1)
-                self._minitel.write(sortie_unicode.encode())
+    # Correction du constructeur
+    if constructeur_minitel == 'B' and type_minitel == 'v':
+        capacite['constructeur'] = 'Philips'
+    elif constructeur_minitel == 'C':
+        if version_logiciel in ['4', '5', ';', '<']:
+            capacite['constructeur'] = 'Telic ou Matra'
 
-                # Attend que le caractère envoyé au minitel ait bien été envoyé
-                # car la sortie est bufferisée
-                self._minitel.flush()
+    return capacite
 
-                # Permet à la méthode join de la file de fonctionner
-                self.sortie.task_done()
+def analyser_fonctionnement(retour):
+    """Déduit le mode écran de la réponse à la commande STATUS_FONCTIONNEMENT.
 
-            except Empty:
-                continue
+    :param retour:
+        la réponse du Minitel à la commande PRO1 STATUS_FONCTIONNEMENT
+    :type retour:
+        un objet Sequence
 
-    def envoyer(self, contenu):
-        """Envoi de séquence de caractères 
+    :returns:
+        VIDEOTEX, MIXTE ou TELEINFORMATIQUE
+    """
+    if retour.longueur != LONGUEUR_PRO2:
+        # Le Minitel est en mode Téléinformatique car il ne répond pas
+        # à une commande protocole
+        return 'TELEINFORMATIQUE'
+
+    if retour.valeurs[3] & 1 == 1:
+        # Le bit 1 du status fonctionnement indique le mode 80 colonnes
+        return 'MIXTE'
+
+    # Par défaut, on considère qu’on est en mode Vidéotex
+    return 'VIDEOTEX'
+
+# Commandes sans paramètre variable, précalculées une fois pour toutes sous
+# forme d’octets afin que les méthodes de MinitelBase n’aient plus qu’à les
+# émettre. Les couleurs sont indexées par toutes les valeurs acceptées par
+# normaliser_couleur.
+COMMANDES_CARACTERE = {
+    couleur: bytes([ESC, 0x40 + numero])
+    for couleur, numero in COULEURS_MINITEL.items()
+}
+
+COMMANDES_FOND = {
+    couleur: bytes([ESC, 0x50 + numero])
+    for couleur, numero in COULEURS_MINITEL.items()
+}
+
+COMMANDES_TAILLE = {
+    (largeur, hauteur): bytes([ESC, 0x4c + (hauteur - 1) + (largeur - 1) * 2])
+    for largeur in [1, 2] for hauteur in [1, 2]
+}
+
+COMMANDES_SOULIGNEMENT = {True: bytes([ESC, 0x5a]), False: bytes([ESC, 0x59])}
+COMMANDES_CLIGNOTEMENT = {True: bytes([ESC, 0x48]), False: bytes([ESC, 0x49])}
+COMMANDES_INVERSION = {True: bytes([ESC, 0x5d]), False: bytes([ESC, 0x5c])}
+COMMANDES_CURSEUR = {True: bytes([CON]), False: bytes([COF])}
+COMMANDES_SEMIGRAPHIQUE = {True: bytes([SO]), False: bytes([SI])}
+
+COMMANDES_EFFACEMENT = {
+    'tout': bytes([FF]),
+    'finligne': bytes([CAN]),
+    'finecran': bytes(CSI + [0x4a]),
+    'debutecran': bytes(CSI + [0x31, 0x4a]),
+    #'tout': bytes(CSI + [0x32, 0x4a]),
+    'debut_ligne': bytes(CSI + [0x31, 0x4b]),
+    'ligne': bytes(CSI + [0x32, 0x4b]),
+    'statut': bytes([US, 0x40, 0x41, CAN, LF]),
+    'vraimenttout': bytes([FF, US, 0x40, 0x41, CAN, LF])
+}
+
+# Positionnement absolu pour chaque ligne (0 à 24) et chaque colonne (1 à 80)
+COMMANDES_POSITION = {
+    (colonne, ligne): bytes([US, 0x40 + ligne, 0x40 + colonne])
+    for ligne in range(25) for colonne in range(1, 81)
+}
+COMMANDES_POSITION[(1, 1)] = bytes([RS])
+
+class MinitelBase(ABC):
+    """Classe de base des pilotes de Minitel
+
+    Cette classe regroupe toutes les commandes qui se contentent d’émettre une
+    séquence de caractères vers le Minitel sans attendre de réponse (couleurs,
+    positionnement, effets, effacement…). Elles reposent uniquement sur la
+    méthode envoyer que les classes dérivées doivent implémenter : une classe
+    qui ne le fait pas ne peut pas être instanciée.
+
+    Elle fournit aussi aux classes dérivées ce qui ne dépend pas de leur
+    manière de dialoguer avec le Minitel : la préparation des octets émis
+    (méthode _preparer) et l’exploitation des réponses d’identification et
+    de vitesse (méthodes _profil, _adopter_identification et
+    _adopter_vitesse).
+
+    Les classes Minitel (threads) et AsyncMinitel (asyncio) en dérivent et
+    partagent ainsi les mêmes commandes.
+
+    Si un modèle d’écran (un objet Ecran) est affecté à l’attribut ecran, les
+    classes dérivées lui transmettent tout ce qu’elles envoient et les
+    commandes de couleur, taille, effet, curseur, mode semi-graphique et
+    positionnement absolu ne sont pas émises lorsque le modèle montre
+    qu’elles ne changeraient rien.
+    """
+    # Modèle de l’écran du Minitel, None s’il n’est pas suivi
+    ecran = None
 
-        Envoie une séquence de caractère en direction du Minitel.
+    # Compresseur remplaçant les suites de caractères identiques par des
+    # commandes REP (un objet Compresseur), None pour ne pas compresser
+    compresseur = None
 
-        :param contenu:
-            Une séquence de caractères interprétable par la classe Sequence.
-        :type contenu:
-            un objet Sequence, une chaîne de caractères ou unicode, une liste,
-            un entier
-        """
-        # Convertit toute entrée en objet Sequence
-        if not isinstance(contenu, Sequence):
-            contenu = Sequence(contenu)
+    # Optimiseur appliqué aux octets émis (un objet Optimiseur), None pour
+    # émettre les octets tels quels
+    optimiseur = None
 
-        # Ajoute les caractères un par un dans la file d’attente d’envoi
-        for valeur in contenu.valeurs:
-            self.sortie.put(chr(valeur))
+    _mode = None
 
-    def recevoir(self, bloque = False, attente = None):
-        """Lit un caractère en provenance du Minitel
+    # Identifications déjà connues (un objet Profils), None pour ne pas les
+    # mémoriser
+    profils = None
 
-        Retourne un caractère présent dans la file d’attente de réception.
+    @property
+    def mode(self):
+        """Mode du Minitel : VIDEOTEX, MIXTE ou TELEINFORMATIQUE
 
-        :param bloque:
-            True pour attendre un caractère s’il n’y en a pas dans la
-            file d’attente de réception. False pour ne pas attendre et
-            retourner immédiatement.
-        :type bloque:
-            un booléen
+        Le compresseur et l’optimiseur ne s’appliquent qu’en mode VIDEOTEX,
+        les commandes REP, US et RS n’ayant pas le même sens dans les autres
+        modes. Ils sont réinitialisés à chaque changement de mode.
+        """
+        return self._mode
 
-        :param attente:
-            attente en secondes, valeurs en dessous de la seconde
-            acceptées. Valide uniquement en mode bloque = True
-            Si attente = None et bloque = True, alors on attend
-            indéfiniment qu'un caractère arrive. 
-        :type attente:
-            un entier, ou None
+    @mode.setter
+    def mode(self, mode):
+        if mode == self._mode:
+            return
 
-        :raise Empty: 
-            Lance une exception de type Empty si le bloque = True 
-            et que le temps d'attente a été dépassé
-        """
-        assert bloque in [True, False]
-        assert isinstance(attente, (int,float)) or attente == None
+        self._mode = mode
 
-        return self.entree.get(bloque, attente).decode()
+        if self.compresseur != None:
+            self.compresseur.recommencer()
 
-    def recevoir_sequence(self,bloque = True, attente=None):
-        """Lit une séquence en provenance du Minitel
+        if self.optimiseur != None:
+            self.optimiseur.recommencer()
 
-        Retourne un objet Sequence reçu depuis le Minitel. Cette fonction
-        analyse les envois du Minitel pour en faire une séquence consistante
-        du point de vue du Minitel. Par exemple, si le Minitel envoie un
-        caractère SS2, SEP ou ESC, celui-ci ne fait qu’annoncer une suite de
-        caractères désignant un résultat ou un caractère non existant dans la
-        norme ASCII. Par contre, le nombre de caractères pouvant être reçus
-        après des caractères spéciaux est normalisé. Cela permet de savoir
-        exactement le nombre de caractères qui vont constituer la séquence.
+    @abstractmethod
+    def envoyer(self, contenu):
+        """Envoi de séquence de caractères
 
-        C’est cette méthode qui doit être utilisée plutôt que la méthode
-        recevoir lorsqu’on dialogue avec le Minitel.
+        Cette méthode doit être implémentée par les classes dérivées. Un
+        objet bytes ou une vue (memoryview) en lecture seule est considéré
+        comme déjà encodé et doit être émis tel quel (voir encodage_fait).
 
-        :param bloque:
-            True pour attendre une séquence s’il n’y en a pas dans la
-            file d’attente de réception. False pour ne pas attendre et
-            retourner immédiatement.
-        :type bloque:
-            un booléen
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
+        """
 
-        :param attente:
-            attente en secondes, valeurs en dessous de la seconde
-            acceptées. Valide uniquement en mode bloque = True
-            Si attente = None et bloque = True, alors on attend
-            indéfiniment qu'un caractère arrive. 
-        :type attente:
-            un entier, ou None
+    def _preparer(self, contenu):
+        """Prépare une séquence de caractères à son émission
+
+        La séquence est encodée si nécessaire, transmise au modèle d’écran
+        puis compressée en mode VIDEOTEX. Les méthodes envoyer des classes dérivées n’ont plus
+        qu’à émettre le résultat.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
 
         :returns:
-            un objet Sequence
+            les octets à émettre, éventuellement aucun
         """
-        # Crée une séquence
-        sequence = Sequence()
+        # Des octets sont déjà encodés et immuables, toute autre entrée est
+        # convertie en objet Sequence
+        if not encodage_fait(contenu):
+            if not isinstance(contenu, Sequence):
+                contenu = Sequence(contenu)
 
-        # Ajoute le premier caractère lu à la séquence en mode bloquant
-        sequence.ajoute(self.recevoir(bloque = bloque, attente = attente))
-        assert sequence.longueur != 0
+            contenu = bytes(contenu.valeurs)
 
-        # Teste le caractère reçu
-        if sequence.valeurs[-1] in [SS2, SEP]:
-            # Une séquence commençant par SS2 ou SEP aura une longueur de 2
-            sequence.ajoute(self.recevoir(bloque = True))
-        elif sequence.valeurs[-1] == ESC:
-            # Les séquences ESC ont des tailles variables allant de 1 à 4
-            try:
-                # Essaie de lire un caractère avec un temps d’attente de 1/10s
-                # Cela permet de lire la touche la touche Esc qui envoie
-                # uniquement le code ESC sans rien après.
-                sequence.ajoute(self.recevoir(bloque = True, attente = 0.1))
-
-                # Une séquence CSI commence par ESC, 0x5b
-                if sequence.valeurs == CSI:
-                    # Une séquence CSI appelle au moins 1 caractère
-                    sequence.ajoute(self.recevoir(bloque = True))
-
-                    if sequence.valeurs[-1] in [0x32, 0x34]:
-                        # La séquence ESC, 0x5b, 0x32/0x34 appelle un dernier
-                        # caractère
-                        sequence.ajoute(self.recevoir(bloque = True))
-            except Empty:
-                # Si aucun caractère n’est survenu après 1/10s, on continue
-                pass
+        if len(contenu) == 0:
+            return b''
 
-        return sequence
+        if self.ecran != None:
+            self.ecran.traiter(contenu)
 
-    def appeler(self, contenu, attente):
-        """Envoie une séquence au Minitel et attend sa réponse.
+        if self.compresseur != None and self.mode == 'VIDEOTEX':
+            contenu = self.compresseur.compresser(contenu)
 
-        Cette méthode permet d’envoyer une commande au Minitel (configuration,
-        interrogation d’état) et d’attendre sa réponse. Cette fonction attend
-        au maximum 1 seconde avant d’abandonner. Dans ce cas, une séquence
-        vide est retournée.
+        return contenu
 
-        Avant de lancer la commande, la méthode vide la file d’attente en
-        réception.
+    def _nom_stable(self):
+        """Retourne le nom sous lequel mémoriser le Minitel
 
-        :param contenu:
-            Une séquence de caractères interprétable par la classe
-            Sequence
-        :type contenu:
-            un objet Sequence, une chaîne de caractères, une chaîne unicode
-            ou un entier
+        :returns:
+            un nom désignant toujours le même Minitel, None si le Minitel ne
+            doit pas être mémorisé
+        """
+        return None
 
-        :param attente:
-            Nombre de caractères attendu de la part du Minitel en
-            réponse à notre envoi.
-        :type attente:
-            un entier
+    def _profil(self):
+        """Retourne l’identification mémorisée du Minitel
 
         :returns:
-            un objet Sequence contenant la réponse du Minitel à la commande
-            envoyée.
+            un objet Sequence, None si le Minitel n’est pas connu
         """
-        assert isinstance(attente, int)
+        nom = self._nom_stable()
+        if self.profils == None or nom == None:
+            return None
 
-        # Vide la file d’attente en réception
-        self.entree = Queue()
+        return self.profils.lire(nom)
 
-        # Envoie la séquence
-        self.envoyer(contenu)
+    def _adopter_identification(self, identification, fonctionnement):
+        """Exploite les réponses à une demande d’identification
 
-        # Attend que toute la séquence ait été envoyée
-        self.sortie.join()
+        Les capacités et le mode du Minitel ne sont modifiés que si son
+        identification est valide. Elle est alors mémorisée.
 
-        # Tente de recevoir le nombre de caractères indiqué par le paramètre
-        # attente avec un délai d’1 seconde.
-        retour = Sequence()
-        for _ in range(0, attente):
-            try:
-                # Attend un caractère
-                entree_bytes = self.entree.get(block = True, timeout = 1)
-                retour.ajoute(entree_bytes.decode())
-            except Empty:
-                # Si un caractère n’a pas été envoyé en moins d’une seconde,
-                # on abandonne
-                break
+        :param identification:
+            réponse à la commande ENQROM
+        :type identification:
+            un objet Sequence
 
-        return retour
+        :param fonctionnement:
+            réponse à la demande de statut fonctionnement
+        :type fonctionnement:
+            un objet Sequence
+        """
+        capacite = analyser_identification(identification)
 
-    def definir_mode(self, mode = 'VIDEOTEX'):
-        """Définit le mode de fonctionnement du Minitel.
+        # Teste la validité de la réponse
+        if capacite == None:
+            return
 
-        Le Minitel peut fonctionner selon 3 modes : VideoTex (le mode standard
-        du Minitel, celui lors de l’allumage), Mixte ou TéléInformatique (un
-        mode 80 colonnes).
+        self.capacite = capacite
+        self.mode = analyser_fonctionnement(fonctionnement)
 
-        La méthode definir_mode prend en compte le mode courant du Minitel pour
-        émettre la bonne commande.
+        nom = self._nom_stable()
+        if self.profils != None and nom != None:
+            self.profils.enregistrer(nom, identification)
 
-        :param mode:
-            une valeur parmi les suivantes : VIDEOTEX,
-            MIXTE ou TELEINFORMATIQUE (la casse est importante).
-        :type mode:
-            une chaîne de caractères
+    def _adopter_vitesse(self, vitesse):
+        """Retient la vitesse du Minitel, y compris pour les connexions
+        suivantes
 
-        :returns:
-            False si le changement de mode n’a pu avoir lieu, True sinon.
+        :param vitesse:
+            vitesse en bits par seconde
+        :type vitesse:
+            un entier
         """
-        assert isinstance(mode, str)
+        self.vitesse = vitesse
 
-        # 3 modes sont possibles
-        if mode not in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']:
-            return False
+        nom = self._nom_stable()
+        if nom != None:
+            VITESSES_CONNUES[nom] = vitesse
 
-        # Si le mode demandé est déjà actif, ne fait rien
-        if self.mode == mode:
-            return True
+    def _envoyer_commande(self, commande):
+        """Envoie une commande sauf si elle ne changerait rien à l’écran
 
-        resultat = False
-
-        # Il y a 9 cas possibles, mais seulement 6 sont pertinents. Les cas
-        # demandant de passer de VIDEOTEX à VIDEOTEX, par exemple, ne donnent
-        # lieu à aucune transaction avec le Minitel
-        if self.mode == 'TELEINFORMATIQUE' and mode == 'VIDEOTEX':
-            retour = self.appeler([CSI, 0x3f, 0x7b], 2)
-            resultat = retour.egale([SEP, 0x5e])
-        elif self.mode == 'TELEINFORMATIQUE' and mode == 'MIXTE':
-            # Il n’existe pas de commande permettant de passer directement du
-            # mode TéléInformatique au mode Mixte. On effectue donc la
-            # transition en deux étapes en passant par le mode Videotex
-            retour = self.appeler([CSI, 0x3f, 0x7b], 2)
-            resultat = retour.egale([SEP, 0x5e])
-
-            if not resultat:
-                return False
+        :param commande:
+            une commande complète
+        :type commande:
+            un objet bytes
+        """
+        if self.ecran != None and self.ecran.inutile(commande):
+            return
 
-            retour = self.appeler([PRO2, MIXTE1], 2)
-            resultat = retour.egale([SEP, 0x70])
-        elif self.mode == 'VIDEOTEX' and mode == 'MIXTE':
-            retour = self.appeler([PRO2, MIXTE1], 2)
-            resultat = retour.egale([SEP, 0x70])
-        elif self.mode == 'VIDEOTEX' and mode == 'TELEINFORMATIQUE':
-            retour = self.appeler([PRO2, TELINFO], 4)
-            resultat = retour.egale([CSI, 0x3f, 0x7a])
-        elif self.mode == 'MIXTE' and mode == 'VIDEOTEX':
-            retour = self.appeler([PRO2, MIXTE2], 2)
-            resultat = retour.egale([SEP, 0x71])
-        elif self.mode == 'MIXTE' and mode == 'TELEINFORMATIQUE':
-            retour = self.appeler([PRO2, TELINFO], 4)
-            resultat = retour.egale([CSI, 0x3f, 0x7a])
-
-        # Si le changement a eu lieu, on garde le nouveau mode en mémoire
-        if resultat:
-            self.mode = mode
-
-        return resultat
+        self.envoyer(commande)
 
-    def identifier(self):
-        """Identifie le Minitel connecté.
+    def couleur(self, caractere = None, fond = None):
+        """Définit les couleurs utilisées pour les prochains caractères.
 
-        Cette méthode doit être appelée une fois la connexion établie avec le
-        Minitel afin de déterminer les fonctionnalités et caractéristiques
-        disponibles.
-
-        Aucune valeur n’est retournée. À la place, l’attribut capacite de
-        l’objet contient un dictionnaire de valeurs renseignant sur les
-        capacités du Minitel :
-
-        - capacite['nom'] -- Nom du Minitel (ex. Minitel 2)
-        - capacite['retournable'] -- Le Minitel peut-il être retourné et
-          servir de modem ? (True ou False)
-        - capacite['clavier'] -- Clavier (None, ABCD ou Azerty)
-        - capacite['vitesse'] -- Vitesse maxi en bps (1200, 4800 ou 9600)
-        - capacite['constructeur'] -- Nom du constructeur (ex. Philips)
-        - capacite['80colonnes'] -- Le Minitel peut-il afficher 80
-          colonnes ? (True ou False)
-        - capacite['caracteres'] -- Peut-on redéfinir des caractères ?
-          (True ou False)
-        - capacite['version'] -- Version du logiciel (une lettre)
-        """
-        self.capacite = CAPACITES_BASIQUES
-
-        # Émet la commande d’identification
-        retour = self.appeler([PRO1, ENQROM], 5)
-
-        # Teste la validité de la réponse
-        if (retour.longueur != 5 or
-            retour.valeurs[0] != SOH or
-            retour.valeurs[4] != EOT):
-            return
-
-        # Extrait les caractères d’identification
-        constructeur_minitel = chr(retour.valeurs[1])
-        type_minitel         = chr(retour.valeurs[2])
-        version_logiciel     = chr(retour.valeurs[3])
-
-        # Types de Minitel
-        if type_minitel in TYPE_MINITELS:
-            self.capacite = TYPE_MINITELS[type_minitel]
-
-        if constructeur_minitel in CONSTRUCTEURS:
-            self.capacite['constructeur'] = CONSTRUCTEURS[constructeur_minitel]
-
-        self.capacite['version'] = version_logiciel
-
-        # Correction du constructeur
-        if constructeur_minitel == 'B' and type_minitel == 'v':
-            self.capacite['constructeur'] = 'Philips'
-        elif constructeur_minitel == 'C':
-            if version_logiciel == ['4', '5', ';', '<']:
-                self.capacite['constructeur'] = 'Telic ou Matra'
-
-        # Détermine le mode écran dans lequel se trouve le Minitel
-        retour = self.appeler([PRO1, STATUS_FONCTIONNEMENT], LONGUEUR_PRO2)
-
-        if retour.longueur != LONGUEUR_PRO2:
-            # Le Minitel est en mode Téléinformatique car il ne répond pas
-            # à une commande protocole
-            self.mode = 'TELEINFORMATIQUE'
-        elif retour.valeurs[3] & 1 == 1:
-            # Le bit 1 du status fonctionnement indique le mode 80 colonnes
-            self.mode = 'MIXTE'
-        else:
-            # Par défaut, on considère qu’on est en mode Vidéotex
-            self.mode = 'VIDEOTEX'
-
-    def deviner_vitesse(self):
-        """Deviner la vitesse de connexion avec le Minitel.
-
-        Cette méthode doit être appelée juste après la création de l’objet
-        afin de déterminer automatiquement la vitesse de transmission sur
-        laquelle le Minitel est réglé.
-
-        Pour effectuer la détection, la méthode deviner_vitesse va tester les
-        vitesses 9600 bps, 4800 bps, 1200 bps et 300 bps (dans cet ordre) et
-        envoyer à chaque fois une commande PRO1 de demande de statut terminal.
-        Si le Minitel répond par un acquittement PRO2, on a détecté la vitesse.
-
-        En cas de détection, la vitesse est enregistré dans l’attribut vitesse
-        de l’objet.
-
-        :returns:
-            La méthode retourne la vitesse en bits par seconde ou -1 si elle
-            n’a pas pu être déterminée.
-        """
-        # Vitesses possibles jusqu’au Minitel 2
-        vitesses = [9600, 4800, 1200, 300]
-
-        for vitesse in vitesses:
-            # Configure le port série à la vitesse à tester
-            self._minitel.baudrate = vitesse
-
-            # Envoie une demande de statut terminal
-            retour = self.appeler([PRO1, STATUS_TERMINAL], LONGUEUR_PRO2)
-
-            # Le Minitel doit renvoyer un acquittement PRO2
-            if retour.longueur == LONGUEUR_PRO2:
-                self.vitesse = vitesse
-                return vitesse
-
-        # La vitesse n’a pas été trouvée
-        return -1
-
-    def definir_vitesse(self, vitesse):
-        """Programme le Minitel et le port série pour une vitesse donnée.
-
-        Pour changer la vitesse de communication entre l’ordinateur et le
-        Minitel, le développeur doit d’abord s’assurer que la connexion avec
-        le Minitel a été établie à la bonne vitesse (voir la méthode
-        deviner_vitesse).
-
-        Cette méthode ne doit être appelée qu’après que le Minitel ait été
-        identifié (voir la méthode identifier) car elle se base sur les
-        capacités détectées du Minitel.
-
-        La méthode envoie d’abord une commande de réglage de vitesse au Minitel
-        et, si celui-ci l’accepte, configure le port série à la nouvelle
-        vitesse.
-
-        :param vitesse:
-            vitesse en bits par seconde. Les valeurs acceptées sont 300, 1200,
-            4800 et 9600. La valeur 9600 n’est autorisée qu’à partir du Minitel
-            2
-        :type vitesse:
-            un entier
-
-        :returns:
-            True si la vitesse a pu être programmée, False sinon.
-        """
-        assert isinstance(vitesse, int)
-
-        # Vitesses possibles jusqu’au Minitel 2
-        vitesses = {300: B300, 1200: B1200, 4800: B4800, 9600: B9600}
-
-        # Teste la validité de la vitesse demandée
-        if vitesse not in vitesses or vitesse > self.capacite['vitesse']:
-            return False
-
-        # Envoie une commande protocole de programmation de vitesse
-        retour = self.appeler([PRO2, PROG, vitesses[vitesse]], LONGUEUR_PRO2)
-
-        # Le Minitel doit renvoyer un acquittement PRO2
-        if retour.longueur == LONGUEUR_PRO2:
-            # Si on peut lire un acquittement PRO2 avant d’avoir régler la
-            # vitesse du port série, c’est que le Minitel ne peut pas utiliser
-            # la vitesse demandée
-            return False
-
-        # Configure le port série à la nouvelle vitesse
-        self._minitel.baudrate = vitesse
-        self.vitesse = vitesse
-
-        return True
-
-    def configurer_clavier(self, etendu = False, curseur = False,
-                           minuscule = False):
-        """Configure le fonctionnement du clavier.
-
-        Configure le fonctionnement du clavier du Minitel. Cela impacte les
-        codes et caractères que le Minitel peut envoyer à l’ordinateur en
-        fonction des touches appuyées (touches alphabétiques, touches de
-        fonction, combinaisons de touches etc.).
-
-        La méthode renvoie True si toutes les commandes de configuration ont
-        correctement été traitées par le Minitel. Dès qu’une commande échoue,
-        la méthode arrête immédiatement et retourne False.
-
-        :param etendu:
-            True pour un clavier en mode étendu, False pour un clavier en mode
-            normal
-        :type etendu:
-            un booléen
-
-        :param curseur:
-            True si les touches du curseur doivent être gérées, False sinon
-        :type curseur:
-            un booléen
-
-        :param minuscule:
-            True si l’appui sur une touche alphabétique sans appui simultané
-            sur la touche Maj/Shift doit générer une minuscule, False s’il
-            doit générer une majuscule.
-        :type minuscule:
-            un booléen
-        """
-        assert etendu in [True, False]
-        assert curseur in [True, False]
-        assert minuscule in [True, False]
-
-        # Les commandes clavier fonctionnent sur un principe de bascule
-        # start/stop
-        bascules = { True: START, False: STOP }
-
-        # Crée les séquences des 3 appels en fonction des arguments
-        appels = [
-            ([PRO3, bascules[etendu   ], RCPT_CLAVIER, ETEN], LONGUEUR_PRO3),
-            ([PRO3, bascules[curseur  ], RCPT_CLAVIER, C0  ], LONGUEUR_PRO3),
-            ([PRO2, bascules[minuscule], MINUSCULES        ], LONGUEUR_PRO2)
-        ]
-
-        # Envoie les commandes une par une
-        for appel in appels:
-            commande = appel[0] # Premier élément du tuple = commande
-            longueur = appel[1] # Second élément du tuple = longueur réponse
-
-            retour = self.appeler(commande, longueur)
-
-            if retour.longueur != longueur:
-                return False
-
-        return True
-
-    def couleur(self, caractere = None, fond = None):
-        """Définit les couleurs utilisées pour les prochains caractères.
-
-        Les couleurs possibles sont noir, rouge, vert, jaune, bleu, magenta,
-        cyan, blanc et un niveau de gris de 0 à 7.        
+        Les couleurs possibles sont noir, rouge, vert, jaune, bleu, magenta,
+        cyan, blanc et un niveau de gris de 0 à 7.        
 
         Note:
         En Videotex, la couleur de fond ne s’applique qu’aux délimiteurs. Ces
@@ -703,15 +604,15 @@ class Minitel:
 
         # Définit la couleur d’avant-plan (la couleur du caractère)
         if caractere != None:
-            couleur = normaliser_couleur(caractere)
-            if couleur != None:
-                self.envoyer([ESC, 0x40 + couleur])
+            commande = COMMANDES_CARACTERE.get(caractere)
+            if commande != None:
+                self._envoyer_commande(commande)
 
         # Définit la couleur d’arrière-plan (la couleur de fond)
         if fond != None:
-            couleur = normaliser_couleur(fond)
-            if couleur != None:
-                self.envoyer([ESC, 0x50 + couleur])
+            commande = COMMANDES_FOND.get(fond)
+            if commande != None:
+                self._envoyer_commande(commande)
 
     def position(self, colonne, ligne, relatif = False):
         """Définit la position du curseur du Minitel
@@ -721,6 +622,14 @@ class Minitel:
         de se poser la question sur le mode de positionnement (relatif vs
         absolu) car le nombre de caractères générés peut aller de 1 à 5.
 
+        Si un modèle d’écran (attribut ecran) connaît la position du curseur,
+        le déplacement le moins coûteux est choisi quel que soit le mode :
+        RS, US, CR, suites de BS, TAB, VT ou LF, séquences CSI ou réécriture
+        à l’identique des cases séparant le curseur de sa destination. Un
+        positionnement absolu n’est remplacé par un déplacement relatif que
+        si les attributs en vigueur sont ceux par défaut, puisqu’il les
+        aurait réinitialisés.
+
         Sur le Minitel, la première colonne a la valeur 1. La première ligne
         a également la valeur 1 bien que la ligne 0 existe. Cette dernière
         correspond à la ligne d’état et possède un fonctionnement différent
@@ -747,37 +656,28 @@ class Minitel:
         assert isinstance(ligne, int)
         assert relatif in [True, False]
 
+        # Lorsque la position du curseur est connue, le déplacement le moins
+        # coûteux est choisi parmi toutes les possibilités
+        if self.ecran != None:
+            commande = self.ecran.planifier(colonne, ligne, relatif)
+            if commande != None:
+                self.envoyer(commande)
+                return
+
         if not relatif:
             # Déplacement absolu
-            if colonne == 1 and ligne == 1:
-                self.envoyer([RS])
-            else:
-                self.envoyer([US, 0x40 + ligne, 0x40 + colonne])
+            commande = COMMANDES_POSITION.get((colonne, ligne))
+            if commande == None:
+                commande = bytes(Sequence([US, 0x40 + ligne, 0x40 + colonne]))
+
+            self.envoyer(commande)
         else:
-            # Déplacement relatif par rapport à la position actuelle
-            if ligne != 0:
-                if ligne >= -4 and ligne <= -1:
-                    # Déplacement court en haut
-                    self.envoyer([VT]*-ligne)
-                elif ligne >= 1 and ligne <= 4:
-                    # Déplacement court en bas
-                    self.envoyer([LF]*ligne)
-                else:
-                    # Déplacement long en haut ou en bas
-                    direction = { True: 'B', False: 'A'}
-                    self.envoyer([CSI, str(ligne), direction[ligne < 0]])
-
-            if colonne != 0:
-                if colonne >= -4 and colonne <= -1:
-                    # Déplacement court à gauche
-                    self.envoyer([BS]*-colonne)
-                elif colonne >= 1 and colonne <= 4:
-                    # Déplacement court à droite
-                    self.envoyer([TAB]*colonne)
-                else:
-                    # Déplacement long à gauche ou à droite
-                    direction = { True: 'C', False: 'D'}
-                    self.envoyer([CSI, str(colonne), direction[colonne < 0]])
+            # Déplacement relatif par rapport à la position actuelle : les
+            # déplacements courts (VT, LF, BS, TAB) sont répétés tant qu’ils
+            # ne sont pas plus longs qu’une séquence CSI
+            self.envoyer(
+                deplacement_vertical(ligne) + deplacement_lateral(colonne)
+            )
 
     def taille(self, largeur = 1, hauteur = 1):
         """Définit la taille des prochains caractères
@@ -809,7 +709,7 @@ class Minitel:
         assert largeur in [1, 2]
         assert hauteur in [1, 2]
 
-        self.envoyer([ESC, 0x4c + (hauteur - 1) + (largeur - 1) * 2])
+        self._envoyer_commande(COMMANDES_TAILLE[(largeur, hauteur)])
 
     def effet(self, soulignement = None, clignotement = None, inversion = None):
         """Active ou désactive des effets
@@ -840,16 +740,16 @@ class Minitel:
         assert inversion in [True, False, None]
 
         # Gère le soulignement
-        soulignements = {True: [ESC, 0x5a], False: [ESC, 0x59], None: None}
-        self.envoyer(soulignements[soulignement])
+        if soulignement != None:
+            self._envoyer_commande(COMMANDES_SOULIGNEMENT[soulignement])
 
         # Gère le clignotement
-        clignotements = {True: [ESC, 0x48], False: [ESC, 0x49], None: None}
-        self.envoyer(clignotements[clignotement])
+        if clignotement != None:
+            self._envoyer_commande(COMMANDES_CLIGNOTEMENT[clignotement])
 
         # Gère l’inversion vidéo
-        inversions = {True: [ESC, 0x5d], False: [ESC, 0x5c], None: None}
-        self.envoyer(inversions[inversion])
+        if inversion != None:
+            self._envoyer_commande(COMMANDES_INVERSION[inversion])
 
     def curseur(self, visible):
         """Active ou désactive l’affichage du curseur
@@ -870,41 +770,45 @@ class Minitel:
         """
         assert visible in [True, False]
 
-        etats = {True: CON, False: COF}
-        self.envoyer([etats[visible]])
+        self._envoyer_commande(COMMANDES_CURSEUR[visible])
 
-    def echo(self, actif):
-        """Active ou désactive l’écho clavier
+    def afficher_trame(self, trame):
+        """Affiche une trame en n’émettant que ce qui a changé
 
-        Par défaut, le Minitel envoie tout caractère tapé au clavier à la fois
-        à l’écran et sur la prise péri-informatique. Cette astuce évite à
-        l’ordinateur de dévoir renvoyer à l’écran le dernière caractère tapé,
-        économisant ainsi de la bande passante.
+        La trame est comparée au modèle de l’écran (attribut ecran), créé au
+        premier appel si nécessaire. Tant que le modèle ignore le contenu de
+        l’écran, la trame est entièrement affichée.
 
-        Dans le cas où l’ordinateur propose une interface utilisateur plus
-        poussée, il est important de pouvoir contrôler exactement ce qui est
-        affiché par le Minitel.
+        Le modèle créé ici suppose que le Minitel est en mode page, son mode
+        par défaut. Une application utilisant le mode rouleau doit affecter
+        elle-même un objet Ecran à l’attribut ecran.
 
-        La méthode retourne True si la commande a bien été traitée par le
-        Minitel, False sinon.
+        :param trame:
+            l’écran souhaité
+        :type trame:
+            un objet Trame
+        """
+        if self.ecran == None:
+            self.ecran = Ecran(rouleau = False)
 
-        :param actif:
-            indique s’il faut activer l’écho (True) ou le désactiver (False)
-        :type actif:
-            un booléen
+        # Le modèle ne doit pas changer entre la comparaison et l’envoi
+        with self.ecran.verrou:
+            self.envoyer(trame.rendre(self.ecran))
 
-        :returns:
-            True si la commande a été acceptée par le Minitel, False sinon.
-        """
-        assert actif in [True, False]
+    def afficher_page(self, page, **valeurs):
+        """Affiche une page compilée en un seul envoi
 
-        actifs = {
-            True: [PRO3, AIGUILLAGE_ON, RCPT_ECRAN, EMET_MODEM],
-            False: [PRO3, AIGUILLAGE_OFF, RCPT_ECRAN, EMET_MODEM]
-        }
-        retour = self.appeler(actifs[actif], LONGUEUR_PRO3)
-        
-        return retour.longueur == LONGUEUR_PRO3
+        :param page:
+            la page compilée (voir le module Page)
+        :type page:
+            un objet Page
+
+        :param valeurs:
+            valeurs des emplacements de la page
+        :type valeurs:
+            des chaînes de caractères
+        """
+        self.envoyer(page.octets(**valeurs))
 
     def efface(self, portee = 'tout'):
         """Efface tout ou partie de l’écran
@@ -926,21 +830,9 @@ class Minitel:
         :type porte:
             une chaîne de caractères
         """
-        portees = {
-            'tout': [FF],
-            'finligne': [CAN],
-            'finecran': [CSI, 0x4a],
-            'debutecran': [CSI, 0x31, 0x4a],
-            #'tout': [CSI, 0x32, 0x4a],
-            'debut_ligne': [CSI, 0x31, 0x4b],
-            'ligne': [CSI, 0x32, 0x4b],
-            'statut': [US, 0x40, 0x41, CAN, LF],
-            'vraimenttout': [FF, US, 0x40, 0x41, CAN, LF]
-        }
-
-        assert portee in portees
-
-        self.envoyer(portees[portee])
+        assert portee in COMMANDES_EFFACEMENT
+
+        self.envoyer(COMMANDES_EFFACEMENT[portee])
 
     def repeter(self, caractere, longueur):
         """Répéter un caractère
@@ -967,14 +859,14 @@ class Minitel:
 
         Demande au Minitel d’émettre un bip
         """
-        self.envoyer([BEL])
+        self.envoyer(bytes([BEL]))
 
     def debut_ligne(self):
         """Retour en début de ligne
 
         Positionne le curseur au début de la ligne courante.
         """
-        self.envoyer([CR])
+        self.envoyer(bytes([CR]))
 
     def supprime(self, nb_colonne = None, nb_ligne = None):
         """Supprime des caractères après le curseur
@@ -1043,8 +935,7 @@ class Minitel:
         """
         assert actif in [True, False]
 
-        actifs = { True: SO, False: SI}
-        self.envoyer(actifs[actif])
+        self._envoyer_commande(COMMANDES_SEMIGRAPHIQUE[actif])
 
     def redefinir(self, depuis, dessins, jeu = 'G0'):
         """Redéfinit des caractères du Minitel
@@ -1140,3 +1031,1039 @@ class Minitel:
         else:
             self.envoyer([ESC, 0x29, 0x20, 0x43])
 
+class Minitel(MinitelBase):
+    """Une classe de pilotage du Minitel via un port série ou tout autre
+    transport
+
+    Présentation
+    ============
+
+    La classe Minitel permet d’envoyer et de recevoir des séquences de
+    caractères vers et depuis un Minitel dans un programme écrit en Python.
+    Elle fonctionne via une liaison série entre l’ordinateur et le Minitel.
+
+    Par défaut, elle utilise /dev/ttyUSB0 comme périphérique. En effet, l’une
+    des manières les plus simples de relier un Minitel à un ordinateur
+    consiste à utiliser un câble USB-TTL 5v (PL2303) car la prise
+    péri-informatique du Minitel fonctionne en TTL (0v/5v) et non en RS232
+    (-12v/12v). Ce type de câble embarque un composant qui est reconnu
+    automatiquement par les noyaux Linux et est assigné à /dev/ttyUSB*. Sous
+    Android, le noyau Linux ne dispose pas du pilote en standard.
+
+    Tant que le périphérique sélectionné est un périphérique série, cette
+    classe ne devrait pas poser de problème pour communiquer avec le Minitel.
+    Par exemple, il est tout à fait possible de créer un proxy série en
+    utilisant un Arduino relié en USB à l’ordinateur et dont certaines
+    broches seraient relié au Minitel.
+
+    La liaison peut également être n’importe quel objet Transport (voir le
+    module minitel.Transport) : socket TCP vers un serveur de terminaux,
+    pseudo-terminal ou transport en boucle pour les tests.
+
+    La classe Minitel permet de déterminer la vitesse de fonctionnement du
+    Minitel, d’identifier le modèle, de le configurer et d’envoyer et recevoir
+    des séquences de caractères.
+
+    Compte tenu de son fonctionnement en threads, le programme principal
+    utilisant cette classe n’a pas à se soucier d’être disponible pour recevoir
+    les séquences de caractères envoyées par le Minitel.
+
+    Démarrage rapide
+    ================
+
+    Le cycle de vie d’un objet Minitel consiste en la création, la
+    détermination de la vitesse du Minitel, de ses capacités, l’utilisation
+    du Minitel par l’application et la libération des ressources::
+        
+        from minitel.Minitel import Minitel
+
+        minitel = Minitel()
+
+        minitel.deviner_vitesse()
+        minitel.identifier()
+
+        # ...
+        # Utilisation de l’objet minitel
+        # ...
+
+        minitel.close()
+
+    """
+    def __init__(self, peripherique = '/dev/ttyUSB0', profils = None):
+        """Constructeur de Minitel
+
+        La connexion série est établie selon le standard de base du Minitel.
+        À l’allumage le Minitel est configuré à 1200 bps, 7 bits, parité paire,
+        mode Vidéotex.
+
+        Cela peut ne pas correspondre à la configuration réelle du Minitel au
+        moment de l’exécution. Cela n’est toutefois pas un problème car la
+        connexion série peut être reconfigurée à tout moment.
+
+        :param peripherique:
+            Le périphérique sur lequel est connecté le Minitel.Par défaut, le
+            périphérique est /dev/ttyUSB0. Une chaîne de la forme
+            tcp://hote:port désigne une connexion TCP. Un objet Transport
+            déjà ouvert peut aussi être fourni.
+        :type peripherique:
+            String ou un objet Transport
+
+        :param profils:
+            Les identifications de Minitel déjà connues, utilisées et
+            complétées par la méthode identifier.
+        :type profils:
+            un objet Profils ou None
+    
+        """
+        assert isinstance(peripherique, (str, Transport))
+        assert isinstance(profils, Profils) or profils == None
+
+        # Initialise l’état du Minitel
+        self.mode = 'VIDEOTEX'
+        self.vitesse = 1200
+
+        # Initialise la liste des capacités du Minitel
+        self.capacite = dict(CAPACITES_BASIQUES)
+        self.profils = profils
+
+        # Crée les deux files d’attente entrée/sortie
+        self.entree = Queue()
+        self.sortie = Queue()
+
+        # Octets reçus du Minitel mais pas encore lus par recevoir
+        self._tampon_entree = bytearray()
+
+        # Découpe les caractères reçus en séquences pour recevoir_sequence.
+        # Le temps d’attente après un ESC isolé est réglable par l’attribut
+        # attente_esc du décodeur
+        self.decodeur = Decodeur()
+        self._sequences = []
+
+        # Extrait les réponses aux commandes du flux reçu. Le verrou protège
+        # le moteur partagé entre le thread de réception et les appelants
+        self._protocole = Protocole()
+        self._verrou = Lock()
+
+        # Optimiseur appliqué aux octets émis (un objet Optimiseur), None pour
+        # émettre les octets tels quels. Il n’est valable qu’en mode Videotex.
+        self.optimiseur = None
+
+        # Compresseur remplaçant les suites de caractères identiques par des
+        # commandes REP (un objet Compresseur), None pour ne pas compresser
+        self.compresseur = None
+
+        # Initialise la connexion avec le Minitel
+        if isinstance(peripherique, str):
+            peripherique = ouvrir(peripherique)
+
+        self._minitel = peripherique
+
+        # Initialise un drapeau pour l’arrêt des threads
+        # (les threads partagent les mêmes variables que le code principal)
+        self._continuer = True
+
+        # Passe à False lorsque la liaison avec le Minitel est perdue
+        self.connecte = True
+
+        # Crée les deux threads de lecture/écriture
+        self._threads = []
+        self._threads.append(Thread(None, self._gestion_entree, None, ()))
+        self._threads.append(Thread(None, self._gestion_sortie, None, ()))
+
+        # Démarre les deux threads de lecture/écriture
+        for thread in self._threads:
+            # Configure chaque thread en mode daemon
+            thread.setDaemon(True)
+            try:
+                # Lance le thread
+                thread.start()
+            except (KeyboardInterrupt, SystemExit):
+                self.close()
+
+    def close(self, delai = None):
+        """Ferme la connexion avec le Minitel
+
+        Indique aux threads d’émission/réception qu’ils doivent s’arrêter et
+        attend leur arrêt. Les deux threads sont réveillés immédiatement : le
+        thread d’émission par un marqueur de fin placé dans la file sortie, le
+        thread de réception par l’annulation de la lecture en cours.
+
+        :param delai:
+            Si delai = None, tout ce qui se trouve dans la file sortie est
+            envoyé au Minitel avant la fermeture. Sinon, l’envoi se poursuit
+            pendant au plus delai secondes et ce qui n’a pu être envoyé est
+            abandonné (0 pour tout abandonner immédiatement).
+        :type delai:
+            un entier, un flottant ou None
+        """
+        assert isinstance(delai, (int, float)) or delai == None
+
+        if delai != None:
+            self._vider_sortie(delai)
+
+        # Indique aux threads qu’ils doivent arrêter toute activité
+        self._continuer = False
+        self.sortie.put(None)
+        self._minitel.annuler_lecture()
+
+        # Attend que tous les threads aient fini
+        for thread in self._threads:
+            thread.join()
+
+        self._minitel.close()
+
+    def _vider_sortie(self, delai):
+        """Laisse la file sortie se vider pendant un temps limité
+
+        Au-delà du délai, ce qui reste dans la file sortie est abandonné et la
+        méthode join de la file rend la main.
+
+        :param delai:
+            temps d’attente maximum en secondes
+        :type delai:
+            un entier ou un flottant
+        """
+        echeance = monotonic() + delai
+
+        with self.sortie.all_tasks_done:
+            while self.sortie.unfinished_tasks > 0:
+                reste = echeance - monotonic()
+                if reste <= 0:
+                    break
+
+                self.sortie.all_tasks_done.wait(reste)
+
+            # Abandonne ce qui n’a pas encore été récupéré par le thread
+            # d’émission
+            self.sortie.unfinished_tasks -= len(self.sortie.queue)
+            self.sortie.queue.clear()
+            self.sortie.not_full.notify_all()
+
+            if self.sortie.unfinished_tasks == 0:
+                self.sortie.all_tasks_done.notify_all()
+
+    def _gestion_entree(self):
+        """Gestion des séquences de caractères envoyées depuis le Minitel
+
+        Cette méthode ne doit pas être appelée directement, elle est réservée
+        exclusivement à la classe Minitel. Elle boucle indéfiniment en tentant
+        de lire la connexion série.
+
+        Dès qu’un caractère est disponible, tout ce que le Minitel a envoyé
+        est lu en une seule fois et ajouté à la file entree sous la forme d’un
+        unique bloc d’octets.
+        """
+        # Ajoute à la file entree tout ce que le Minitel peut envoyer
+        while self._continuer:
+            try:
+                # Attend un caractère pendant 1 seconde au plus, la lecture
+                # étant interrompue par la méthode close
+                octets = self._minitel.read()
+
+                if len(octets) == 0:
+                    continue
+
+                # Récupère d’un coup les caractères arrivés entre-temps
+                en_attente = self._minitel.in_waiting
+                if en_attente > 0:
+                    octets += self._minitel.read(en_attente)
+            except OSError:
+                # Liaison perdue (connexion fermée par l’autre extrémité,
+                # périphérique débranché…)
+                self._deconnecter()
+                return
+
+            # Les réponses aux commandes en cours sont retirées, le reste est
+            # destiné à la file entree
+            with self._verrou:
+                self._transmettre(self._protocole.traiter(octets))
+
+    def _deconnecter(self):
+        """Prend acte de la perte de la liaison avec le Minitel
+
+        Ce qui reste à envoyer est abandonné par le thread d’émission et un
+        marqueur de fin (None) placé dans la file entree réveille les appels
+        en attente d’un caractère, qui lèvent alors ConnectionError.
+        """
+        self.connecte = False
+        self.entree.put(None)
+
+    def _lire_entree(self, bloque, attente):
+        """Retire un bloc d’octets de la file entree
+
+        :raises ConnectionError:
+            si la liaison avec le Minitel est perdue
+        """
+        octets = self.entree.get(bloque, attente)
+
+        if octets == None:
+            # Le marqueur reste en place pour les appels suivants
+            self.entree.put(None)
+            raise ConnectionError('liaison avec le Minitel perdue')
+
+        return octets
+
+    def _transmettre(self, octets):
+        """Ajoute à la file entree les octets qui ne sont pas des réponses
+
+        Cette méthode doit être appelée avec le verrou du protocole acquis
+        afin de préserver l’ordre d’arrivée des caractères.
+
+        :param octets:
+            octets reçus ne faisant partie d’aucune réponse
+        :type octets:
+            un objet bytes ou bytearray
+        """
+        if len(octets) > 0:
+            self.entree.put(bytes(octets))
+
+            # Le Minitel a pu afficher lui-même les caractères tapés
+            if self.ecran != None:
+                self.ecran.saisie(octets)
+
+    def _gestion_sortie(self):
+        """Gestion des séquences de caractères envoyées vers le Minitel
+
+        Cette méthode ne doit pas être appelée directement, elle est réservée
+        exclusivement à la classe Minitel. Elle boucle indéfiniment en tentant
+        de lire la file de sortie.
+
+        Tout ce qui est en attente dans la file de sortie est retiré en une
+        seule fois et écrit sur la connexion série en un seul appel. La
+        connexion n’est vidée (flush) que lorsque la file est épuisée, ce qui
+        garantit que la méthode join de la file ne rend la main qu’une fois
+        les caractères réellement transmis.
+
+        Si un optimiseur est défini, chaque lot ainsi constitué est réécrit
+        par lui avant d’être écrit, en mode VIDEOTEX seulement.
+
+        Une fois la liaison perdue, tout ce qui arrive dans la file est
+        abandonné.
+        """
+        # Envoie au Minitel tout ce qui se trouve dans la file sortie jusqu’à
+        # rencontrer le marqueur de fin (None) placé par la méthode close
+        fin = False
+        while not fin:
+            # Attend un bloc d’octets
+            elements = [self.sortie.get(block = True)]
+
+            # Récupère en une seule fois tout ce qui reste dans la file
+            with self.sortie.mutex:
+                elements.extend(self.sortie.queue)
+                self.sortie.queue.clear()
+                self.sortie.not_full.notify_all()
+
+            # Ce qui suit le marqueur de fin n’est pas envoyé. Un bloc seul
+            # est écrit sans copie.
+            if None in elements:
+                fin = True
+                octets = b''.join(elements[:elements.index(None)])
+            elif len(elements) == 1:
+                octets = elements[0]
+            else:
+                octets = b''.join(elements)
+
+            # Le lot d’octets est réécrit sous une forme plus courte. Une
+            # commande incomplète est émise sans attendre le lot suivant.
+            optimiseur = self.optimiseur
+            if optimiseur != None and self.mode == 'VIDEOTEX':
+                octets = optimiseur.optimiser(octets)
+
+            try:
+                if self.connecte:
+                    self._minitel.write(octets)
+
+                    # Attend que les caractères envoyés au minitel aient bien
+                    # été envoyés car la sortie est bufferisée. Tant que la
+                    # file n’est pas vide, le prochain tour de boucle s’en
+                    # chargera.
+                    if self.sortie.empty():
+                        self._minitel.flush()
+            except OSError:
+                # Le thread de réception constatera lui aussi la perte de la
+                # liaison
+                pass
+
+            # Permet à la méthode join de la file de fonctionner
+            for _ in elements:
+                self.sortie.task_done()
+
+    def envoyer(self, contenu):
+        """Envoi de séquence de caractères 
+
+        Envoie une séquence de caractère en direction du Minitel.
+
+        La séquence est placée dans la file d’attente d’envoi sous la forme
+        d’un unique bloc d’octets. La méthode join de la file sortie permet
+        toujours d’attendre que tout ait été transmis au Minitel.
+
+        Si un compresseur est défini, les suites de caractères identiques
+        sont au préalable remplacées par des commandes REP, en mode VIDEOTEX
+        seulement.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
+        """
+        contenu = self._preparer(contenu)
+
+        if len(contenu) == 0:
+            return
+
+        # Ajoute la séquence dans la file d’attente d’envoi en un seul bloc
+        # d’octets déjà encodés
+        self.sortie.put(contenu)
+
+    def recevoir(self, bloque = False, attente = None):
+        """Lit un caractère en provenance du Minitel
+
+        Retourne un caractère présent dans la file d’attente de réception.
+
+        :param bloque:
+            True pour attendre un caractère s’il n’y en a pas dans la
+            file d’attente de réception. False pour ne pas attendre et
+            retourner immédiatement.
+        :type bloque:
+            un booléen
+
+        :param attente:
+            attente en secondes, valeurs en dessous de la seconde
+            acceptées. Valide uniquement en mode bloque = True
+            Si attente = None et bloque = True, alors on attend
+            indéfiniment qu'un caractère arrive. 
+        :type attente:
+            un entier, ou None
+
+        :raise Empty: 
+            Lance une exception de type Empty si le bloque = True 
+            et que le temps d'attente a été dépassé
+
+        :raise ConnectionError:
+            si la liaison avec le Minitel a été perdue
+        """
+        assert bloque in [True, False]
+        assert isinstance(attente, (int,float)) or attente == None
+
+        # Les séquences déjà découpées par recevoir_sequence mais non lues
+        # sont d’abord rendues caractère par caractère
+        if len(self._tampon_entree) == 0:
+            for sequence in self._sequences:
+                self._tampon_entree += bytes(sequence.valeurs)
+
+            self._sequences = []
+            self._tampon_entree += self.decodeur.extraire()
+
+        # La file entree contient des blocs d’octets, les caractères sont
+        # distribués un par un depuis le dernier bloc récupéré
+        if len(self._tampon_entree) == 0:
+            self._tampon_entree += self._lire_entree(bloque, attente)
+
+        caractere = self._tampon_entree[:1]
+        del self._tampon_entree[:1]
+
+        return caractere.decode()
+
+    def recevoir_sequence(self,bloque = True, attente=None):
+        """Lit une séquence en provenance du Minitel
+
+        Retourne un objet Sequence reçu depuis le Minitel. Cette fonction
+        analyse les envois du Minitel pour en faire une séquence consistante
+        du point de vue du Minitel. Par exemple, si le Minitel envoie un
+        caractère SS2, SEP ou ESC, celui-ci ne fait qu’annoncer une suite de
+        caractères désignant un résultat ou un caractère non existant dans la
+        norme ASCII. Par contre, le nombre de caractères pouvant être reçus
+        après des caractères spéciaux est normalisé. Cela permet de savoir
+        exactement le nombre de caractères qui vont constituer la séquence.
+
+        Le découpage est réalisé par l’objet Decodeur de l’attribut decodeur
+        sur des blocs entiers de caractères.
+
+        C’est cette méthode qui doit être utilisée plutôt que la méthode
+        recevoir lorsqu’on dialogue avec le Minitel.
+
+        :param bloque:
+            True pour attendre une séquence s’il n’y en a pas dans la
+            file d’attente de réception. False pour ne pas attendre et
+            retourner immédiatement.
+        :type bloque:
+            un booléen
+
+        :param attente:
+            attente en secondes, valeurs en dessous de la seconde
+            acceptées. Valide uniquement en mode bloque = True
+            Si attente = None et bloque = True, alors on attend
+            indéfiniment qu'un caractère arrive. Le délai porte sur l’appel
+            entier, même si les caractères arrivent un à un.
+        :type attente:
+            un entier, ou None
+
+        :returns:
+            un objet Sequence
+
+        :raise Empty:
+            Lance une exception de type Empty si aucune séquence complète
+            n’est arrivée dans le temps imparti. Les caractères d’une séquence
+            incomplète sont conservés pour l’appel suivant.
+
+        :raise ConnectionError:
+            si la liaison avec le Minitel a été perdue
+        """
+        assert bloque in [True, False]
+        assert isinstance(attente, (int,float)) or attente == None
+
+        # Les caractères déjà retirés de la file entree passent d’abord par
+        # le décodeur
+        if len(self._tampon_entree) > 0:
+            self._sequences += self.decodeur.decoder(self._tampon_entree)
+            self._tampon_entree = bytearray()
+
+        self._sequences += self.decodeur.expirer()
+
+        # Le délai d’attente porte sur l’ensemble de l’appel, quel que soit
+        # le nombre de blocs reçus entre-temps
+        fin = None
+        if bloque and attente != None:
+            fin = monotonic() + attente
+
+        while len(self._sequences) == 0:
+            if not bloque:
+                # Seuls les octets déjà arrivés sont décodés, même si un ESC
+                # isolé est en attente
+                octets = self._lire_entree(False, None)
+                self._sequences += self.decodeur.decoder(octets)
+                continue
+
+            # Un ESC isolé est en attente : on n’attend pas au-delà de son
+            # échéance
+            limite = fin
+            echeance = self.decodeur.echeance
+            if echeance != None and (limite == None or echeance < limite):
+                limite = echeance
+
+            try:
+                if limite == None:
+                    octets = self._lire_entree(True, None)
+                else:
+                    octets = self._lire_entree(
+                        True, max(0, limite - monotonic())
+                    )
+            except Empty:
+                octets = b''
+
+            self._sequences += self.decodeur.decoder(octets)
+
+            if (len(self._sequences) == 0 and fin != None and
+                monotonic() >= fin):
+                raise Empty
+
+        return self._sequences.pop(0)
+
+    def appeler(self, contenu, attente, motif = None, delai = 1):
+        """Envoie une séquence au Minitel et attend sa réponse.
+
+        Cette méthode permet d’envoyer une commande au Minitel (configuration,
+        interrogation d’état) et d’attendre sa réponse. Cette fonction attend
+        au maximum delai secondes avant d’abandonner. Dans ce cas, la réponse
+        incomplète, éventuellement vide, est retournée.
+
+        La réponse est reconnue dans le flux reçu grâce à son motif : les
+        caractères qui ne lui appartiennent pas (touches tapées au clavier
+        entre-temps) restent disponibles pour les méthodes recevoir et
+        recevoir_sequence.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe
+            Sequence
+        :type contenu:
+            un objet Sequence, une chaîne de caractères, une chaîne unicode
+            ou un entier
+
+        :param attente:
+            Nombre de caractères attendu de la part du Minitel en
+            réponse à notre envoi.
+        :type attente:
+            un entier
+
+        :param motif:
+            Début de la réponse attendue (PRO2, PRO3, SOH…). Si motif = None,
+            les attente prochains caractères reçus constituent la réponse.
+        :type motif:
+            un objet Sequence, une liste, un entier ou None
+
+        :param delai:
+            Temps d’attente maximum de la réponse en secondes, décompté une
+            fois la commande transmise.
+        :type delai:
+            un entier ou un flottant
+
+        :returns:
+            un objet Sequence contenant la réponse du Minitel à la commande
+            envoyée.
+        """
+        assert isinstance(attente, int)
+
+        reponses, _ = self.appeler_groupe([(contenu, attente, motif)], delai)
+
+        return reponses[0]
+
+    def appeler_groupe(self, appels, delai = 1):
+        """Envoie plusieurs commandes en une fois et attend leurs réponses.
+
+        Toutes les commandes sont transmises ensemble au Minitel, sans
+        attendre la réponse de chacune avant d’envoyer la suivante. Le Minitel
+        y répondant dans l’ordre, chaque réponse est attribuée à la première
+        commande en attente dont le motif correspond. Une seule attente est
+        ainsi subie pour l’ensemble du groupe.
+
+        :param appels:
+            liste de tuples (commande, longueur de la réponse, début de la
+            réponse), comme les paramètres contenu, attente et motif de la
+            méthode appeler
+        :type appels:
+            une liste de tuples
+
+        :param delai:
+            Temps d’attente maximum de l’ensemble des réponses en secondes,
+            décompté une fois les commandes transmises.
+        :type delai:
+            un entier ou un flottant
+
+        :returns:
+            un tuple (réponses, durée) où réponses est la liste des objets
+            Sequence reçus, dans l’ordre des commandes, et durée le temps
+            écoulé en secondes entre l’envoi et la dernière réponse
+        """
+        assert isinstance(appels, list)
+        assert isinstance(delai, (int, float))
+
+        debut = monotonic()
+
+        # Enregistre les requêtes avant l’envoi pour ne manquer aucune réponse
+        requetes = []
+        tout_recu = Event()
+
+        def verifier():
+            if all(requete.terminee for requete in requetes):
+                tout_recu.set()
+
+        sequence = Sequence()
+        with self._verrou:
+            for commande, attente, motif in appels:
+                assert isinstance(attente, int)
+
+                requetes.append(
+                    self._protocole.attendre(motif, attente, verifier)
+                )
+                sequence.ajoute(commande)
+
+            verifier()
+
+        # Envoie les commandes
+        self.envoyer(sequence)
+
+        # Attend que toutes les commandes aient été envoyées
+        self.sortie.join()
+
+        # Attend les réponses
+        tout_recu.wait(delai)
+
+        # Retire les requêtes qui n’ont pas abouti. Les caractères mis de côté
+        # pour elles et qui ne leur appartiennent pas sont rendus à la file
+        # entree
+        with self._verrou:
+            for requete in requetes:
+                self._protocole.annuler(requete)
+
+            self._transmettre(self._protocole.traiter(b''))
+
+        return [requete.sequence() for requete in requetes], monotonic() - debut
+
+    def definir_mode(self, mode = 'VIDEOTEX'):
+        """Définit le mode de fonctionnement du Minitel.
+
+        Le Minitel peut fonctionner selon 3 modes : VideoTex (le mode standard
+        du Minitel, celui lors de l’allumage), Mixte ou TéléInformatique (un
+        mode 80 colonnes).
+
+        La méthode definir_mode prend en compte le mode courant du Minitel pour
+        émettre la bonne commande.
+
+        :param mode:
+            une valeur parmi les suivantes : VIDEOTEX,
+            MIXTE ou TELEINFORMATIQUE (la casse est importante).
+        :type mode:
+            une chaîne de caractères
+
+        :returns:
+            False si le changement de mode n’a pu avoir lieu, True sinon.
+        """
+        assert isinstance(mode, str)
+
+        # 3 modes sont possibles
+        if mode not in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']:
+            return False
+
+        # Si le mode demandé est déjà actif, ne fait rien
+        if self.mode == mode:
+            return True
+
+        # Effectue les appels nécessaires au changement de mode
+        for commande, longueur, attendu in TRANSITIONS_MODE[(self.mode, mode)]:
+            retour = self.appeler(commande, longueur, attendu)
+
+            if not retour.egale(attendu):
+                return False
+
+        # Le changement a eu lieu, on garde le nouveau mode en mémoire
+        self.mode = mode
+
+        return True
+
+    def identifier(self):
+        """Identifie le Minitel connecté.
+
+        Cette méthode doit être appelée une fois la connexion établie avec le
+        Minitel afin de déterminer les fonctionnalités et caractéristiques
+        disponibles.
+
+        Aucune valeur n’est retournée. À la place, l’attribut capacite de
+        l’objet contient un dictionnaire de valeurs renseignant sur les
+        capacités du Minitel :
+
+        - capacite['nom'] -- Nom du Minitel (ex. Minitel 2)
+        - capacite['retournable'] -- Le Minitel peut-il être retourné et
+          servir de modem ? (True ou False)
+        - capacite['clavier'] -- Clavier (None, ABCD ou Azerty)
+        - capacite['vitesse'] -- Vitesse maxi en bps (1200, 4800 ou 9600)
+        - capacite['constructeur'] -- Nom du constructeur (ex. Philips)
+        - capacite['80colonnes'] -- Le Minitel peut-il afficher 80
+          colonnes ? (True ou False)
+        - capacite['caracteres'] -- Peut-on redéfinir des caractères ?
+          (True ou False)
+        - capacite['version'] -- Version du logiciel (une lettre)
+
+        Si l’identification du Minitel branché sur ce périphérique est connue
+        de l’attribut profils, une simple demande de statut vérifie sa
+        présence et son mode écran.
+        """
+        self.capacite = dict(CAPACITES_BASIQUES)
+
+        profil = self._profil()
+
+        if profil != None:
+            retour = self.appeler(
+                [PRO1, STATUS_FONCTIONNEMENT],
+                LONGUEUR_PRO2,
+                PRO2
+            )
+
+            if retour.longueur == LONGUEUR_PRO2:
+                self.capacite = analyser_identification(profil)
+                self.mode = analyser_fonctionnement(retour)
+                return
+
+        # Émet ensemble la commande d’identification et la demande du mode
+        # écran dans lequel se trouve le Minitel
+        (identification, fonctionnement), _ = self.appeler_groupe([
+            ([PRO1, ENQROM], 5, SOH),
+            ([PRO1, STATUS_FONCTIONNEMENT], LONGUEUR_PRO2, PRO2)
+        ])
+
+        self._adopter_identification(identification, fonctionnement)
+
+    def _nom_stable(self):
+        """Retourne le nom sous lequel mémoriser le Minitel
+
+        :returns:
+            le nom du transport s’il désigne toujours le même Minitel, None
+            sinon
+        """
+        if self._minitel.stable:
+            return self._minitel.nom
+
+        return None
+
+    def deviner_vitesse(self):
+        """Deviner la vitesse de connexion avec le Minitel.
+
+        Cette méthode doit être appelée juste après la création de l’objet
+        afin de déterminer automatiquement la vitesse de transmission sur
+        laquelle le Minitel est réglé.
+
+        Pour effectuer la détection, la méthode deviner_vitesse va tester les
+        vitesses 9600 bps, 4800 bps, 1200 bps et 300 bps (dans cet ordre) et
+        envoyer à chaque fois une commande PRO1 de demande de statut terminal.
+        Si le Minitel répond par un acquittement PRO2, on a détecté la vitesse.
+        La dernière vitesse connue pour le périphérique est essayée en premier.
+        Le temps d’attente de chaque essai dépend de la vitesse testée.
+
+        En cas de détection, la vitesse est enregistré dans l’attribut vitesse
+        de l’objet.
+
+        :returns:
+            La méthode retourne la vitesse en bits par seconde ou -1 si elle
+            n’a pas pu être déterminée.
+        """
+        for vitesse in ordre_vitesses(self._nom_stable()):
+            # Configure le port série à la vitesse à tester
+            self._minitel.baudrate = vitesse
+
+            # Envoie une demande de statut terminal
+            retour = self.appeler(
+                [PRO1, STATUS_TERMINAL],
+                LONGUEUR_PRO2,
+                PRO2,
+                delai_reponse(vitesse, 2, LONGUEUR_PRO2)
+            )
+
+            # Les caractères reçus à une mauvaise vitesse sont inexploitables
+            self._oublier_entree()
+
+            # Le Minitel doit renvoyer un acquittement PRO2
+            if retour.longueur == LONGUEUR_PRO2:
+                self._adopter_vitesse(vitesse)
+                return vitesse
+
+        # La vitesse n’a pas été trouvée
+        return -1
+
+    def _oublier_entree(self):
+        """Supprime les caractères reçus et non encore lus"""
+        with self._verrou:
+            self._tampon_entree = bytearray()
+            self._sequences = []
+            self.decodeur.extraire()
+            while True:
+                try:
+                    self.entree.get_nowait()
+                except Empty:
+                    break
+
+            # Le marqueur de perte de la liaison est conservé
+            if not self.connecte:
+                self.entree.put(None)
+
+    def definir_vitesse(self, vitesse):
+        """Programme le Minitel et le port série pour une vitesse donnée.
+
+        Pour changer la vitesse de communication entre l’ordinateur et le
+        Minitel, le développeur doit d’abord s’assurer que la connexion avec
+        le Minitel a été établie à la bonne vitesse (voir la méthode
+        deviner_vitesse).
+
+        Cette méthode ne doit être appelée qu’après que le Minitel ait été
+        identifié (voir la méthode identifier) car elle se base sur les
+        capacités détectées du Minitel.
+
+        La méthode envoie d’abord une commande de réglage de vitesse au Minitel
+        et, si celui-ci l’accepte, configure le port série à la nouvelle
+        vitesse.
+
+        :param vitesse:
+            vitesse en bits par seconde. Les valeurs acceptées sont 300, 1200,
+            4800 et 9600. La valeur 9600 n’est autorisée qu’à partir du Minitel
+            2
+        :type vitesse:
+            un entier
+
+        :returns:
+            True si la vitesse a pu être programmée, False sinon.
+        """
+        assert isinstance(vitesse, int)
+
+        # Teste la validité de la vitesse demandée
+        if vitesse not in VITESSES or vitesse > self.capacite['vitesse']:
+            return False
+
+        # Envoie une commande protocole de programmation de vitesse
+        retour = self.appeler(
+            [PRO2, PROG, VITESSES[vitesse]],
+            LONGUEUR_PRO2,
+            PRO2,
+            delai_reponse(self.vitesse, 3, LONGUEUR_PRO2)
+        )
+
+        # Le Minitel doit renvoyer un acquittement PRO2
+        if retour.longueur == LONGUEUR_PRO2:
+            # Si on peut lire un acquittement PRO2 avant d’avoir régler la
+            # vitesse du port série, c’est que le Minitel ne peut pas utiliser
+            # la vitesse demandée
+            return False
+
+        # Configure le port série à la nouvelle vitesse
+        self._minitel.baudrate = vitesse
+        self._adopter_vitesse(vitesse)
+
+        return True
+
+    def configurer_clavier(self, etendu = False, curseur = False,
+                           minuscule = False):
+        """Configure le fonctionnement du clavier.
+
+        Configure le fonctionnement du clavier du Minitel. Cela impacte les
+        codes et caractères que le Minitel peut envoyer à l’ordinateur en
+        fonction des touches appuyées (touches alphabétiques, touches de
+        fonction, combinaisons de touches etc.).
+
+        La méthode renvoie True si toutes les commandes de configuration ont
+        correctement été traitées par le Minitel, False sinon. Les commandes
+        sont envoyées en une seule fois.
+
+        :param etendu:
+            True pour un clavier en mode étendu, False pour un clavier en mode
+            normal
+        :type etendu:
+            un booléen
+
+        :param curseur:
+            True si les touches du curseur doivent être gérées, False sinon
+        :type curseur:
+            un booléen
+
+        :param minuscule:
+            True si l’appui sur une touche alphabétique sans appui simultané
+            sur la touche Maj/Shift doit générer une minuscule, False s’il
+            doit générer une majuscule.
+        :type minuscule:
+            un booléen
+        """
+        assert etendu in [True, False]
+        assert curseur in [True, False]
+        assert minuscule in [True, False]
+
+        # Crée les séquences des 3 appels en fonction des arguments
+        appels = appels_clavier(etendu, curseur, minuscule)
+
+        # Envoie les commandes en une fois
+        retours, _ = self.appeler_groupe(appels)
+
+        for (_, longueur, _), retour in zip(appels, retours):
+            if retour.longueur != longueur:
+                return False
+
+        return True
+
+    def echo(self, actif):
+        """Active ou désactive l’écho clavier
+
+        Par défaut, le Minitel envoie tout caractère tapé au clavier à la fois
+        à l’écran et sur la prise péri-informatique. Cette astuce évite à
+        l’ordinateur de dévoir renvoyer à l’écran le dernière caractère tapé,
+        économisant ainsi de la bande passante.
+
+        Dans le cas où l’ordinateur propose une interface utilisateur plus
+        poussée, il est important de pouvoir contrôler exactement ce qui est
+        affiché par le Minitel.
+
+        La méthode retourne True si la commande a bien été traitée par le
+        Minitel, False sinon.
+
+        :param actif:
+            indique s’il faut activer l’écho (True) ou le désactiver (False)
+        :type actif:
+            un booléen
+
+        :returns:
+            True si la commande a été acceptée par le Minitel, False sinon.
+        """
+        assert actif in [True, False]
+
+        retour = self.appeler(COMMANDES_ECHO[actif], LONGUEUR_PRO3, PRO3)
+        
+        return retour.longueur == LONGUEUR_PRO3
+
+    def initialiser(self, vitesse = None, mode = 'VIDEOTEX', etendu = False,
+                    curseur = False, minuscule = False, echo = None):
+        """Prépare une session avec le Minitel.
+
+        Cette méthode enchaîne deviner_vitesse, identifier, definir_vitesse,
+        definir_mode, configurer_clavier et echo en réduisant au minimum le
+        nombre d’allers-retours avec le Minitel : l’identification d’une part,
+        le changement de mode, la configuration du clavier et l’écho d’autre
+        part sont envoyés en une seule fois.
+
+        :param vitesse:
+            vitesse à programmer une fois le Minitel identifié, None pour
+            conserver la vitesse détectée
+        :type vitesse:
+            un entier ou None
+
+        :param mode:
+            une valeur parmi les suivantes : VIDEOTEX, MIXTE ou
+            TELEINFORMATIQUE (la casse est importante).
+        :type mode:
+            une chaîne de caractères
+
+        :param etendu:
+            True pour un clavier en mode étendu, False pour un clavier en mode
+            normal
+        :type etendu:
+            un booléen
+
+        :param curseur:
+            True si les touches du curseur doivent être gérées, False sinon
+        :type curseur:
+            un booléen
+
+        :param minuscule:
+            True si les touches alphabétiques doivent générer des minuscules
+        :type minuscule:
+            un booléen
+
+        :param echo:
+            True pour activer l’écho clavier, False pour le désactiver, None
+            pour ne pas y toucher
+        :type echo:
+            un booléen ou None
+
+        :returns:
+            un dictionnaire contenant :
+
+            - 'vitesse' -- la vitesse détectée ou programmée, -1 si le
+              Minitel n’a pas été détecté
+            - 'commandes' -- la liste des tuples (étape, réponse, succès) des
+              commandes de configuration envoyées, dans l’ordre d’envoi
+            - 'duree' -- le temps total de préparation en secondes
+        """
+        assert mode in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']
+        assert echo in [True, False, None]
+
+        debut = monotonic()
+        bilan = { 'vitesse': -1, 'commandes': [], 'duree': 0 }
+
+        # Le changement de vitesse du port série interdit de grouper la
+        # détection avec le reste
+        bilan['vitesse'] = self.deviner_vitesse()
+
+        if bilan['vitesse'] != -1:
+            self.identifier()
+
+            if vitesse != None and vitesse != self.vitesse and \
+               self.definir_vitesse(vitesse):
+                bilan['vitesse'] = vitesse
+
+            appels = appels_session(
+                self.mode, mode, etendu, curseur, minuscule, echo
+            )
+
+            retours, _ = self.appeler_groupe(
+                [(commande, longueur, motif)
+                 for _, commande, longueur, motif in appels]
+            )
+
+            for (etape, _, longueur, _), retour in zip(appels, retours):
+                bilan['commandes'].append(
+                    (etape, retour, retour.longueur == longueur)
+                )
+
+            # Le mode n’est pris en compte que si toutes les transitions ont
+            # été acquittées
+            if all(succes for etape, _, succes in bilan['commandes']
+                   if etape == 'mode'):
+                self.mode = mode
+
+        bilan['duree'] = monotonic() - debut
+
+        return bilan
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Optimiseur est un module permettant de réécrire les octets envoyés au
+Minitel sous une forme plus courte mais équivalente.
+
+Les éléments d’interface émettent volontiers des commandes redondantes : une
+couleur redéfinie avant chaque ligne alors qu’elle n’a pas changé, des effets
+aussitôt annulés, des positionnements immédiatement suivis d’autres
+positionnements. À 1200 bits par seconde, chaque octet économisé représente
+8 ms d’affichage en moins.
+
+L’optimiseur applique les règles suivantes :
+
+- un attribut (couleur, taille, effet) remplacé par un attribut de même
+  catégorie avant l’affichage de tout caractère est supprimé,
+- un attribut identique à celui déjà en vigueur est supprimé,
+- les attributs suivis d’un positionnement absolu (US, RS) ou d’un
+  effacement de l’écran (FF) sont supprimés, ces commandes remettant les
+  attributs à leur valeur par défaut,
+- un positionnement absolu immédiatement suivi d’un autre positionnement
+  absolu ou d’un effacement de l’écran est supprimé. Les déplacements
+  relatifs sont conservés car ils peuvent faire défiler l’écran en mode
+  rouleau,
+- une suite d’au moins 4 caractères identiques est remplacée par le
+  caractère suivi d’une commande REP.
+
+Il est prudent : dès qu’une commande dont l’effet sur les attributs n’est pas
+connu est rencontrée, plus aucun attribut n’est considéré comme en vigueur
+jusqu’au prochain positionnement absolu. Les définitions de caractères (US
+0x23) sont transmises telles quelles.
+
+Ces règles ne valent qu’en mode Videotex.
+
+Pour ne compresser que les suites de caractères identiques, sans autre
+réécriture, un objet Compresseur peut être affecté à l’attribut compresseur
+d’un Minitel. Cette compression est désactivée par défaut.
+"""
+
+from minitel.Decoupeur import (Decoupeur, CARACTERE, REPETITION, ATTRIBUT,
+    POSITION, DEPLACEMENT, PAGE, ATTRIBUTS, ATTRIBUTS_DEFAUT)
+
+from minitel.constantes import US, LF, REP, BEL, CON, COF
+
+# Nombre maximum de répétitions d’une commande REP
+REPETITIONS_MAX = 63
+
+# Commandes sans effet sur les attributs ni sur la position du curseur, qui
+# peuvent donc être émises avant les déplacements et attributs en attente
+NEUTRES = {bytes([BEL]), bytes([CON]), bytes([COF])}
+
+def repeter(commandes, maximum = REPETITIONS_MAX):
+    """Remplace les suites de caractères identiques par des commandes REP
+
+    Seuls les caractères d’un seul octet sont concernés : REP répète le
+    dernier caractère affiché, ce qui ne convient pas aux caractères
+    accentués introduits par SS2 dont la lettre est un octet à part.
+
+    :param commandes:
+        commandes découpées par un objet Decoupeur
+    :type commandes:
+        un itérable de tuples (nature, octets)
+
+    :param maximum:
+        nombre maximum de répétitions d’une commande REP (1 à 63)
+    :type maximum:
+        un entier
+
+    :returns:
+        un objet bytes
+    """
+    assert isinstance(maximum, int) and maximum >= 1 and maximum <= 63
+
+    sortie = bytearray()
+    caractere = None
+    nombre = 0
+
+    def vider():
+        """Émet la suite de caractères identiques en cours"""
+        sortie.extend(caractere)
+        reste = nombre - 1
+
+        while reste > 0:
+            repetitions = min(reste, maximum)
+
+            if repetitions > 2:
+                sortie.extend((REP, 0x40 + repetitions))
+            else:
+                sortie.extend(caractere * repetitions)
+
+            reste -= repetitions
+
+    for nature, octets in commandes:
+        if nature == CARACTERE and len(octets) == 1:
+            if octets == caractere:
+                nombre += 1
+                continue
+
+            if caractere != None:
+                vider()
+
+            caractere = octets
+            nombre = 1
+            continue
+
+        if caractere != None:
+            vider()
+            caractere = None
+
+        sortie.extend(octets)
+
+    if caractere != None:
+        vider()
+
+    return bytes(sortie)
+
+def compresser_repetitions(octets, maximum = REPETITIONS_MAX):
+    """Remplace les suites de caractères identiques par des commandes REP
+
+    :param octets:
+        octets à compresser, formant des commandes complètes
+    :type octets:
+        un objet bytes, bytearray ou memoryview
+
+    :param maximum:
+        nombre maximum de répétitions d’une commande REP (1 à 63)
+    :type maximum:
+        un entier
+
+    :returns:
+        un objet bytes
+    """
+    decoupeur = Decoupeur()
+
+    return repeter(decoupeur.decouper(octets), maximum) + decoupeur.extraire()
+
+class Compresseur:
+    """Compression des suites de caractères identiques d’un envoi à l’autre
+
+    Contrairement à la fonction compresser_repetitions, le compresseur
+    conserve d’un appel à l’autre l’état du découpage : une définition de
+    caractères ou une commande répartie sur plusieurs envois n’est jamais
+    prise pour du texte. Une commande incomplète est émise immédiatement,
+    sa fin étant reconnue à l’appel suivant.
+    """
+    def __init__(self, maximum = REPETITIONS_MAX):
+        """Constructeur
+
+        :param maximum:
+            nombre maximum de répétitions d’une commande REP (1 à 63)
+        :type maximum:
+            un entier
+        """
+        assert isinstance(maximum, int) and maximum >= 1 and maximum <= 63
+
+        self.maximum = maximum
+        self.recommencer()
+
+    def recommencer(self):
+        """Oublie la commande éventuellement en cours
+
+        À appeler lorsque le Minitel change de mode : les octets suivants ne
+        prolongent pas ceux déjà compressés.
+        """
+        self.decoupeur = Decoupeur()
+
+        # Début de commande déjà émis lors de l’appel précédent
+        self._reste = b''
+
+    def compresser(self, octets):
+        """Compresse un envoi
+
+        :param octets:
+            octets à envoyer au Minitel
+        :type octets:
+            un objet bytes, bytearray ou memoryview
+
+        :returns:
+            un objet bytes
+        """
+        emis = len(self._reste)
+        commandes = self.decoupeur.decouper(self._reste + bytes(octets))
+
+        # La commande incomplète est émise telle quelle mais conservée pour
+        # reconnaître sa fin
+        self._reste = self.decoupeur.extraire()
+
+        # Le début de commande déjà émis est retiré de ce qui est retourné,
+        # qu’il soit complété ou encore en attente
+        return (repeter(commandes, self.maximum) + self._reste)[emis:]
+
+class Optimiseur:
+    """Réécriture des octets envoyés au Minitel sous une forme plus courte
+
+    L’optimiseur conserve d’un appel à l’autre les attributs en vigueur sur
+    le Minitel. Il doit donc voir passer tout ce qui est envoyé au Minitel.
+
+    Elle instaure l’attribut suivant :
+
+    - attributs : dictionnaire associant à chaque catégorie d’attribut le
+      code en vigueur sur le Minitel ou None s’il n’est pas connu
+    """
+    def __init__(self):
+        """Constructeur"""
+        self.recommencer()
+
+    def recommencer(self):
+        """Oublie tout ce qui a été optimisé, comme un optimiseur neuf
+
+        À appeler lorsque le Minitel change de mode : les octets suivants ne
+        prolongent pas ceux déjà optimisés.
+        """
+        self.decoupeur = Decoupeur()
+
+        # Début de commande déjà émis lors de l’appel précédent
+        self._reste = b''
+
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        """Oublie les attributs en vigueur sur le Minitel
+
+        À appeler lorsque le Minitel a pu recevoir des octets sans qu’ils
+        passent par l’optimiseur.
+        """
+        self.attributs = {categorie: None for categorie in ATTRIBUTS_DEFAUT}
+
+        # Le curseur est sur la ligne 0 : un LF l’en fera sortir en
+        # restaurant des attributs inconnus
+        self._ligne_zero = False
+
+    def optimiser(self, octets):
+        """Optimise un bloc d’octets à envoyer au Minitel
+
+        Tout ce qui est reçu est émis : une commande incomplète en fin de bloc
+        est émise telle quelle, sans attendre sa fin. Elle est alors reconnue
+        au bloc suivant et sa fin émise telle quelle également.
+
+        :param octets:
+            octets à envoyer au Minitel
+        :type octets:
+            un objet bytes, bytearray ou memoryview
+
+        :returns:
+            un objet bytes
+        """
+        emis = len(self._reste)
+        commandes = self.decoupeur.decouper(self._reste + bytes(octets))
+        self._reste = self.decoupeur.extraire()
+
+        debut = b''
+        if emis > 0 and len(commandes) > 0:
+            # Fin de la commande dont le début a déjà été émis
+            nature, commande = commandes[0]
+            commandes = commandes[1:]
+            debut = commande[emis:]
+            emis = 0
+            self._appliquer(nature, commande)
+
+        return (debut + repeter(self._simplifier(commandes)) +
+                self._reste[emis:])
+
+    def _oublier(self, nature):
+        """Oublie les attributs après une commande dont l’effet n’est pas connu
+
+        Seuls un positionnement ou un LF font entrer ou sortir de la ligne 0.
+        """
+        ligne_zero = self._ligne_zero
+        self.reinitialiser()
+
+        if nature == POSITION:
+            self._ligne_zero = True
+        elif nature != DEPLACEMENT:
+            self._ligne_zero = ligne_zero
+
+    def _appliquer(self, nature, octets):
+        """Tient compte d’une commande émise telle quelle"""
+        if nature == ATTRIBUT:
+            self.attributs[ATTRIBUTS[octets[1]]] = octets[1]
+
+        elif nature == PAGE or (nature == POSITION and (octets[0] != US or
+                                                         octets[1] > 0x40)):
+            self._ligne_zero = False
+            self.attributs.update(ATTRIBUTS_DEFAUT)
+
+        elif nature == DEPLACEMENT and not (self._ligne_zero and
+                                            octets[0] == LF):
+            pass
+
+        elif nature != CARACTERE and nature != REPETITION:
+            self._oublier(nature)
+
+    def _simplifier(self, commandes):
+        """Supprime les commandes sans effet
+
+        :param commandes:
+            commandes découpées par le découpeur
+        :type commandes:
+            une liste de tuples (nature, octets)
+
+        :returns:
+            un générateur de tuples (nature, octets)
+        """
+        # Déplacements et attributs pas encore émis : ils ne le seront que
+        # si un caractère ou une autre commande les rend nécessaires
+        deplacements = []
+        attributs = {}
+
+        def vider():
+            """Émet les déplacements et attributs en attente"""
+            yield from deplacements
+            deplacements.clear()
+
+            for categorie, commande in attributs.items():
+                if self.attributs[categorie] != commande[1]:
+                    self.attributs[categorie] = commande[1]
+                    yield (ATTRIBUT, commande)
+
+            attributs.clear()
+
+        for nature, octets in commandes:
+            if nature == ATTRIBUT:
+                # Un attribut remplace le précédent de même catégorie
+                categorie = ATTRIBUTS[octets[1]]
+                attributs.pop(categorie, None)
+                attributs[categorie] = octets
+
+            elif nature == POSITION and (octets[0] != US or
+                                         octets[1] > 0x40):
+                # Un positionnement absolu hors de la ligne 0 rend inutiles
+                # les attributs et positionnements qui le précèdent
+                if all(autre == POSITION for autre, _ in deplacements):
+                    deplacements.clear()
+
+                attributs.clear()
+                deplacements.append((nature, octets))
+                self._ligne_zero = False
+                self.attributs.update(ATTRIBUTS_DEFAUT)
+
+            elif nature == PAGE:
+                deplacements.clear()
+                attributs.clear()
+                yield (nature, octets)
+                self._ligne_zero = False
+                self.attributs.update(ATTRIBUTS_DEFAUT)
+
+            elif nature == DEPLACEMENT and not (self._ligne_zero and
+                                                octets[0] == LF):
+                deplacements.append((nature, octets))
+
+            elif octets in NEUTRES:
+                yield (nature, octets)
+
+            else:
+                yield from vider()
+                yield (nature, octets)
+
+                # Commande dont l’effet sur les attributs n’est pas connu :
+                # ligne 0, sortie de la ligne 0, définition de caractères…
+                if nature != CARACTERE and nature != REPETITION:
+                    self._oublier(nature)
+
+        yield from vider()
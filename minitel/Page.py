@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Page est un module permettant de compiler un écran de Minitel en un bloc
+d’octets prêt à être envoyé.
+
+Afficher un écran à l’aide d’éléments d’interface ou d’une suite d’appels
+aux méthodes d’un Minitel coûte à chaque affichage la construction des
+séquences et la conversion des caractères. Pour un écran statique (accueil,
+menu, aide), ce travail peut être fait une fois pour toutes :
+
+- un objet CaptureMinitel se comporte comme un Minitel mais enregistre ce
+  qui lui est envoyé au lieu de l’émettre,
+- la méthode page de la capture retourne un objet Page, ensemble d’octets
+  déjà encodés et d’emplacements nommés pour les champs variables,
+- un objet Compilateur conserve les pages compilées en mémoire et, si un
+  dossier lui est donné, sur disque.
+
+Exemple::
+
+    compilateur = Compilateur('pages')
+
+    def accueil(minitel):
+        minitel.efface()
+        minitel.position(1, 1)
+        minitel.envoyer('Bonjour ')
+        minitel.emplacement('nom', 20)
+
+    page = compilateur.compiler('accueil', accueil)
+    minitel.afficher_page(page, nom = 'Marcel')
+
+Les emplacements ont une largeur fixe : la valeur qui y est placée est
+complétée par des espaces ou tronquée, ce qui préserve la mise en page du
+reste de l’écran.
+
+Une page est compilée pour un mode du Minitel (VIDEOTEX par défaut) : les
+valeurs des emplacements sont encodées selon ce mode et une même page
+compilée pour deux modes est conservée en deux exemplaires.
+"""
+
+import os
+import struct
+
+from minitel.Decoupeur import Decoupeur, CARACTERE
+from minitel.Minitel import MinitelBase, encodage_fait
+from minitel.Sequence import Sequence
+
+# Signature des fichiers de pages compilées
+SIGNATURE = b'PYMINITEL-PAGE\x02'
+
+# Modes pour lesquels une page peut être compilée, dans l’ordre de leur code
+# dans les fichiers de pages compilées
+MODES = ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']
+
+# Types de segment dans un fichier de page compilée
+SEGMENT_OCTETS = 0
+SEGMENT_EMPLACEMENT = 1
+
+# Extension des fichiers de pages compilées
+EXTENSION = '.page'
+
+# Les caractères de contrôle d’une valeur (saut de ligne, effacement…)
+# déplaceraient le curseur ou modifieraient l’écran : ils sont remplacés par
+# des espaces
+CONTROLES = {code: ' ' for code in range(0x20)}
+
+def cases_occupees(octets):
+    """Retourne le nombre de cases de l’écran occupées par des caractères
+
+    Un caractère introduit par SS2 ou encadré par SO et SI n’occupe qu’une
+    case, de même qu’un caractère accentué.
+
+    :param octets:
+        caractères encodés, sans commande de positionnement
+    :type octets:
+        un objet bytes ou bytearray
+
+    :returns:
+        un entier
+    """
+    return sum(
+        1 for nature, _ in Decoupeur().decouper(octets)
+        if nature == CARACTERE
+    )
+
+def remplir(texte, longueur, mode = 'VIDEOTEX'):
+    """Encode un texte sur exactement longueur cases
+
+    La largeur est mesurée sur les caractères encodés : un caractère que la
+    conversion développe en plusieurs caractères (… devient ...) occupe
+    plusieurs cases. Un caractère qui ne tient pas entièrement est omis, la
+    place restante étant complétée par des espaces.
+
+    :param texte:
+        texte à encoder, sans caractère de contrôle
+    :type texte:
+        une chaîne de caractères
+
+    :param longueur:
+        nombre de cases à occuper
+    :type longueur:
+        un entier positif
+
+    :param mode:
+        mode du Minitel, qui détermine l’encodage des caractères
+    :type mode:
+        une chaîne de caractères
+
+    :returns:
+        un objet bytes
+    """
+    # Un caractère ASCII occupe toujours une case
+    if texte.isascii():
+        return texte[:longueur].ljust(longueur).encode('ascii')
+
+    octets = bytearray()
+    occupees = 0
+    for caractere in texte:
+        encode = Sequence(caractere, mode).valeurs
+        largeur = cases_occupees(encode)
+
+        if occupees + largeur > longueur:
+            break
+
+        octets += encode
+        occupees += largeur
+
+    octets += b' ' * (longueur - occupees)
+
+    return bytes(octets)
+
+class Page:
+    """Un écran compilé
+
+    Une page est une suite de segments : des octets déjà encodés ou des
+    emplacements nommés, remplacés par une valeur lors de l’affichage.
+
+    Elle instaure les attributs suivants :
+
+    - segments : liste d’objets bytes et de tuples (nom, longueur)
+    - mode : mode du Minitel pour lequel la page a été compilée
+    - emplacements : dictionnaire associant à chaque nom d’emplacement sa
+      longueur en caractères
+    """
+    def __init__(self, segments, mode = 'VIDEOTEX'):
+        """Constructeur
+
+        :param segments:
+            octets déjà encodés et emplacements, dans leur ordre d’émission
+        :type segments:
+            une liste d’objets bytes et de tuples (nom, longueur)
+
+        :param mode:
+            mode du Minitel pour lequel la page a été compilée
+        :type mode:
+            une chaîne de caractères
+        """
+        assert isinstance(segments, list)
+        assert mode in MODES
+
+        self.segments = segments
+        self.mode = mode
+        self.emplacements = {}
+
+        for segment in segments:
+            if isinstance(segment, tuple):
+                nom, longueur = segment
+                self.emplacements[nom] = longueur
+
+        # Une page sans emplacement est envoyée telle quelle
+        if len(self.emplacements) == 0:
+            self._statique = b''.join(segments)
+        else:
+            self._statique = None
+
+    def octets(self, **valeurs):
+        """Retourne les octets de la page
+
+        Chaque emplacement reçoit la valeur de même nom, complétée par des
+        espaces ou tronquée pour occuper exactement le nombre de cases de
+        l’emplacement (voir la fonction remplir), encodée selon le mode de
+        la page. Un emplacement sans valeur est rempli d’espaces. Les caractères de contrôle d’une valeur sont
+        remplacés par des espaces.
+
+        :param valeurs:
+            valeurs des emplacements
+        :type valeurs:
+            des chaînes de caractères
+
+        :returns:
+            un objet bytes
+        """
+        if self._statique != None:
+            return self._statique
+
+        morceaux = []
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                morceaux.append(segment)
+                continue
+
+            nom, longueur = segment
+            texte = str(valeurs.get(nom, '')).translate(CONTROLES)
+            morceaux.append(remplir(texte, longueur, self.mode))
+
+        return b''.join(morceaux)
+
+    def enregistrer(self, chemin):
+        """Enregistre la page compilée dans un fichier
+
+        Le fichier est d’abord écrit sous un nom temporaire puis renommé :
+        un autre processus ne peut jamais lire une page à moitié écrite.
+
+        :param chemin:
+            chemin du fichier
+        :type chemin:
+            une chaîne de caractères
+        """
+        donnees = bytearray(SIGNATURE)
+        donnees += struct.pack('>BI', MODES.index(self.mode),
+                               len(self.segments))
+
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                donnees += struct.pack('>BI', SEGMENT_OCTETS, len(segment))
+                donnees += segment
+            else:
+                nom, longueur = segment
+                nom = nom.encode('utf-8')
+                donnees += struct.pack('>BH', SEGMENT_EMPLACEMENT, len(nom))
+                donnees += nom
+                donnees += struct.pack('>H', longueur)
+
+        temporaire = '%s.%d.tmp' % (chemin, os.getpid())
+        with open(temporaire, 'wb') as fichier:
+            fichier.write(donnees)
+
+        os.replace(temporaire, chemin)
+
+    @classmethod
+    def charger(cls, chemin):
+        """Charge une page compilée depuis un fichier
+
+        :param chemin:
+            chemin du fichier
+        :type chemin:
+            une chaîne de caractères
+
+        :returns:
+            un objet Page
+
+        :raises ValueError:
+            si le fichier n’est pas une page compilée
+        """
+        with open(chemin, 'rb') as fichier:
+            donnees = fichier.read()
+
+        if not donnees.startswith(SIGNATURE):
+            raise ValueError('%s n’est pas une page compilée' % chemin)
+
+        try:
+            position = len(SIGNATURE)
+            code, nombre = struct.unpack_from('>BI', donnees, position)
+            position += 5
+
+            if code >= len(MODES):
+                raise ValueError('mode inconnu')
+
+            segments = []
+            for _ in range(nombre):
+                (genre,) = struct.unpack_from('>B', donnees, position)
+                position += 1
+
+                if genre == SEGMENT_OCTETS:
+                    (taille,) = struct.unpack_from('>I', donnees, position)
+                    position += 4
+                    segments.append(donnees[position:position + taille])
+                    position += taille
+                elif genre == SEGMENT_EMPLACEMENT:
+                    (taille,) = struct.unpack_from('>H', donnees, position)
+                    position += 2
+                    nom = donnees[position:position + taille].decode('utf-8')
+                    position += taille
+                    (longueur,) = struct.unpack_from('>H', donnees, position)
+                    position += 2
+                    segments.append((nom, longueur))
+                else:
+                    raise ValueError('segment inconnu')
+        except (struct.error, UnicodeDecodeError, ValueError):
+            raise ValueError('%s est une page compilée invalide' % chemin)
+
+        if position != len(donnees):
+            raise ValueError('%s est une page compilée invalide' % chemin)
+
+        return cls(segments, MODES[code])
+
+class CaptureMinitel(MinitelBase):
+    """Un Minitel fictif qui enregistre ce qui lui est envoyé
+
+    Toutes les commandes de MinitelBase sont disponibles, ce qui permet de
+    lui confier des éléments d’interface pour leur affichage. Rien n’est
+    jamais reçu : les méthodes attendant une réponse du Minitel ne sont pas
+    disponibles.
+
+    Elle instaure les attributs suivants :
+
+    - mode : le mode supposé du Minitel (VIDEOTEX par défaut)
+    """
+    def __init__(self, mode = 'VIDEOTEX'):
+        """Constructeur
+
+        :param mode:
+            mode supposé du Minitel lors de l’affichage de la page
+        :type mode:
+            une chaîne de caractères
+        """
+        assert mode in MODES
+
+        self.mode = mode
+        self.effacer()
+
+    def effacer(self):
+        """Oublie tout ce qui a été enregistré"""
+        self._segments = []
+        self._octets = bytearray()
+
+    def envoyer(self, contenu):
+        """Enregistre une séquence de caractères
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
+        """
+        if not encodage_fait(contenu):
+            if not isinstance(contenu, Sequence):
+                contenu = Sequence(contenu)
+
+            contenu = contenu.valeurs
+
+        self._octets += contenu
+
+    def emplacement(self, nom, longueur):
+        """Réserve un emplacement pour un champ variable
+
+        L’emplacement commence à la position courante du curseur et occupe
+        toujours longueur caractères, avec les attributs en vigueur.
+
+        :param nom:
+            nom de l’emplacement, utilisé comme paramètre de Page.octets
+        :type nom:
+            une chaîne de caractères
+
+        :param longueur:
+            nombre de caractères de l’emplacement
+        :type longueur:
+            un entier positif
+        """
+        assert isinstance(nom, str) and nom.isidentifier()
+        assert isinstance(longueur, int) and 0 < longueur <= 80
+
+        if len(self._octets) > 0:
+            self._segments.append(bytes(self._octets))
+            self._octets = bytearray()
+
+        self._segments.append((nom, longueur))
+
+    def page(self):
+        """Retourne la page compilée à partir de ce qui a été enregistré
+
+        :returns:
+            un objet Page
+        """
+        segments = list(self._segments)
+        if len(self._octets) > 0:
+            segments.append(bytes(self._octets))
+
+        return Page(segments, self.mode)
+
+class Compilateur:
+    """Compilation et mise en cache de pages
+
+    Les pages sont identifiées par un nom et le mode pour lequel elles sont
+    compilées. Une page compilée est conservée en mémoire et, si un dossier est indiqué, enregistrée sur disque pour être
+    reprise telle quelle par les exécutions suivantes. Les fichiers d’un
+    dossier doivent être supprimés (voir la méthode invalider) lorsque la
+    construction d’une page change.
+
+    Elle instaure l’attribut suivant :
+
+    - dossier : dossier des pages compilées, None pour ne rien enregistrer
+    """
+    def __init__(self, dossier = None):
+        """Constructeur
+
+        :param dossier:
+            dossier des pages compilées, créé si nécessaire
+        :type dossier:
+            une chaîne de caractères ou None
+        """
+        assert dossier == None or isinstance(dossier, str)
+
+        self.dossier = dossier
+        self._pages = {}
+
+        if dossier != None:
+            os.makedirs(dossier, exist_ok = True)
+
+    def _chemin(self, nom, mode):
+        """Retourne le chemin du fichier d’une page compilée pour un mode"""
+        return os.path.join(self.dossier,
+                            '%s.%s%s' % (nom, mode.lower(), EXTENSION))
+
+    def compiler(self, nom, construction, mode = 'VIDEOTEX'):
+        """Retourne une page compilée, en la construisant si nécessaire
+
+        La fonction de construction reçoit un objet CaptureMinitel et y
+        affiche l’écran comme elle le ferait sur un Minitel. Elle n’est
+        appelée que si la page n’est ni en mémoire ni sur disque.
+
+        :param nom:
+            nom de la page, qui doit être un identifiant Python valide
+        :type nom:
+            une chaîne de caractères
+
+        :param construction:
+            fonction affichant l’écran sur le Minitel qu’elle reçoit
+        :type construction:
+            un appelable
+
+        :param mode:
+            mode supposé du Minitel lors de l’affichage de la page
+        :type mode:
+            une chaîne de caractères
+
+        :returns:
+            un objet Page
+        """
+        assert isinstance(nom, str) and nom.isidentifier()
+        assert callable(construction)
+        assert mode in MODES
+
+        if (nom, mode) in self._pages:
+            return self._pages[(nom, mode)]
+
+        page = None
+
+        if self.dossier != None:
+            try:
+                page = Page.charger(self._chemin(nom, mode))
+            except (OSError, ValueError):
+                # Page absente ou illisible : elle est reconstruite
+                page = None
+
+            # Un fichier d’un autre mode ne peut provenir que d’un renommage
+            if page != None and page.mode != mode:
+                page = None
+
+        if page == None:
+            capture = CaptureMinitel(mode)
+            construction(capture)
+            page = capture.page()
+
+            if self.dossier != None:
+                page.enregistrer(self._chemin(nom, mode))
+
+        self._pages[(nom, mode)] = page
+
+        return page
+
+    def invalider(self, nom = None):
+        """Oublie une page compilée ou toutes les pages, pour tous les modes
+
+        :param nom:
+            nom de la page, None pour toutes les pages
+        :type nom:
+            une chaîne de caractères ou None
+        """
+        if nom == None:
+            noms = set(nom for nom, _ in self._pages)
+            if self.dossier != None:
+                noms.update(
+                    fichier.split('.')[0]
+                    for fichier in os.listdir(self.dossier)
+                    if fichier.endswith(EXTENSION)
+                )
+        else:
+            noms = [nom]
+
+        for nom in noms:
+            for mode in MODES:
+                self._pages.pop((nom, mode), None)
+
+                if self.dossier != None:
+                    try:
+                        os.remove(self._chemin(nom, mode))
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Profils est un module permettant de mémoriser l’identification des
+Minitel déjà rencontrés.
+
+L’identification d’un Minitel (réponse à la commande PRO1 ENQROM) ne change
+pas tant que le même Minitel reste branché sur le même périphérique. La
+conserver évite de la redemander à chaque connexion : une simple demande de
+statut suffit alors à vérifier que le Minitel est toujours là.
+"""
+
+import os
+import json
+
+from minitel.Sequence import Sequence # Gestion des séquences de caractères
+
+class Profils:
+    """Un ensemble de profils de Minitel indexés par nom de périphérique
+
+    Les profils sont conservés en mémoire et, si un chemin est fourni,
+    enregistrés dans un fichier JSON à chaque modification.
+
+    Elle instaure les attributs suivants :
+
+    - chemin : chemin du fichier des profils ou None
+    - profils : dictionnaire associant à chaque nom de périphérique la liste
+      des codes de son identification
+    """
+    def __init__(self, chemin = None):
+        """Constructeur
+
+        :param chemin:
+            chemin du fichier dans lequel les profils sont conservés, None
+            pour ne les conserver qu’en mémoire
+        :type chemin:
+            une chaîne de caractères ou None
+        """
+        assert isinstance(chemin, str) or chemin == None
+
+        self.chemin = chemin
+        self.profils = {}
+
+        if chemin == None:
+            return
+
+        self.chemin = os.path.expanduser(chemin)
+
+        # Un fichier absent ou illisible équivaut à aucun profil connu
+        try:
+            with open(self.chemin, 'r') as fichier:
+                profils = json.load(fichier)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(profils, dict):
+            self.profils = profils
+
+    def lire(self, nom):
+        """Retourne l’identification mémorisée pour un périphérique
+
+        :param nom:
+            nom du périphérique
+        :type nom:
+            une chaîne de caractères
+
+        :returns:
+            un objet Sequence contenant la réponse à la commande ENQROM ou
+            None si le périphérique est inconnu
+        """
+        if nom not in self.profils:
+            return None
+
+        return Sequence(self.profils[nom])
+
+    def enregistrer(self, nom, identification):
+        """Mémorise l’identification d’un périphérique
+
+        :param nom:
+            nom du périphérique
+        :type nom:
+            une chaîne de caractères
+
+        :param identification:
+            réponse du Minitel à la commande ENQROM
+        :type identification:
+            un objet Sequence
+        """
+        assert isinstance(nom, str)
+        assert isinstance(identification, Sequence)
+
+        if self.profils.get(nom) == list(identification.valeurs):
+            return
+
+        self.profils[nom] = list(identification.valeurs)
+        self._sauvegarder()
+
+    def oublier(self, nom):
+        """Oublie le profil d’un périphérique
+
+        :param nom:
+            nom du périphérique
+        :type nom:
+            une chaîne de caractères
+        """
+        if self.profils.pop(nom, None) != None:
+            self._sauvegarder()
+
+    def _sauvegarder(self):
+        """Enregistre les profils dans le fichier
+
+        Le fichier est remplacé d’un seul coup afin qu’un autre processus ne
+        puisse jamais lire un fichier partiellement écrit.
+        """
+        if self.chemin == None:
+            return
+
+        dossier = os.path.dirname(self.chemin)
+        if dossier != '':
+            os.makedirs(dossier, exist_ok = True)
+
+        temporaire = self.chemin + '.tmp'
+        with open(temporaire, 'w') as fichier:
+            json.dump(self.profils, fichier)
+
+        os.replace(temporaire, self.chemin)
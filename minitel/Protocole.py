@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Protocole est un module permettant d’associer les réponses du Minitel aux
+commandes qui lui ont été envoyées.
+
+Le Minitel répond aux commandes protocole (PRO1, PRO2, PRO3) et aux
+changements de mode par des séquences reconnaissables (acquittements PRO2 ou
+PRO3, identification SOH…EOT, SEP, CSI). Ces réponses arrivent mêlées aux
+caractères tapés au clavier. La classe Protocole extrait du flux reçu les
+réponses attendues et laisse passer tout le reste, sans rien perdre.
+"""
+
+from minitel.Sequence import Sequence # Gestion des séquences de caractères
+
+class Requete:
+    """Une commande en attente de sa réponse
+
+    Elle instaure les attributs suivants :
+
+    - motif : début de la réponse attendue (vide pour accepter les prochains
+      caractères quels qu’ils soient)
+    - longueur : longueur totale de la réponse attendue
+    - echeance : instant au-delà duquel la réponse n’est plus attendue, à la
+      discrétion de l’appelant
+    - reponse : les octets de la réponse, None tant qu’aucun octet n’a été
+      reçu. Une réponse incomplète est fournie lors de l’annulation.
+    - terminee : True dès que la réponse complète a été reçue
+    """
+    def __init__(self, motif, longueur, rappel = None, echeance = None):
+        """Constructeur
+
+        :param motif:
+            début de la réponse attendue
+        :type motif:
+            un objet bytes
+
+        :param longueur:
+            longueur totale de la réponse attendue
+        :type longueur:
+            un entier
+
+        :param rappel:
+            fonction appelée sans argument lorsque la réponse est complète
+        :type rappel:
+            une fonction ou None
+
+        :param echeance:
+            instant au-delà duquel la réponse n’est plus attendue
+        :type echeance:
+            un flottant ou None
+        """
+        assert isinstance(motif, bytes)
+        assert isinstance(longueur, int) and longueur >= len(motif)
+
+        self.motif = motif
+        self.longueur = longueur
+        self.rappel = rappel
+        self.echeance = echeance
+        self.reponse = None
+        self.terminee = False
+
+    def sequence(self):
+        """Retourne la réponse reçue sous forme de Sequence
+
+        :returns:
+            un objet Sequence, vide si aucune réponse n’a été reçue
+        """
+        if self.reponse == None:
+            return Sequence()
+
+        return Sequence(self.reponse)
+
+class Protocole:
+    """Moteur d’association des réponses du Minitel aux requêtes
+
+    Les requêtes sont servies dans leur ordre d’enregistrement : une réponse
+    est attribuée à la plus ancienne requête en attente dont le motif
+    correspond. Les caractères ne correspondant à aucune requête sont rendus
+    à l’appelant pour être traités comme des frappes clavier.
+
+    Cette classe ne fait aucune entrée/sortie et n’utilise aucun verrou : elle
+    peut être utilisée aussi bien par la classe Minitel (threads, l’appelant
+    se chargeant du verrouillage) que par AsyncMinitel ou ServeurMinitel.
+    """
+    def __init__(self):
+        """Constructeur"""
+        self.requetes = []
+
+        # Octets reçus pouvant être le début d’une réponse attendue
+        self._tampon = bytearray()
+
+    def attendre(self, motif, longueur, rappel = None, echeance = None):
+        """Enregistre une requête en attente de réponse
+
+        :param motif:
+            début de la réponse attendue, None pour accepter les prochains
+            caractères quels qu’ils soient
+        :type motif:
+            un objet Sequence, une liste, un entier, une chaîne ou None
+
+        :param longueur:
+            longueur totale de la réponse attendue
+        :type longueur:
+            un entier
+
+        :param rappel:
+            fonction appelée sans argument lorsque la réponse est complète
+        :type rappel:
+            une fonction ou None
+
+        :param echeance:
+            instant au-delà duquel la réponse n’est plus attendue
+        :type echeance:
+            un flottant ou None
+
+        :returns:
+            un objet Requete
+        """
+        if motif == None:
+            motif = b''
+        else:
+            motif = bytes(Sequence(motif).valeurs)
+
+        requete = Requete(motif, longueur, rappel, echeance)
+        self.requetes.append(requete)
+
+        return requete
+
+    def annuler(self, requete):
+        """Retire une requête de la liste des requêtes en attente
+
+        Si le début de sa réponse était en cours de réception, il est confié
+        à la requête comme réponse incomplète.
+
+        :param requete:
+            la requête à annuler
+        :type requete:
+            un objet Requete
+        """
+        if requete not in self.requetes:
+            return
+
+        if len(self._tampon) > 0 and self._attribuer(0) == requete:
+            requete.reponse = bytes(self._tampon)
+            self._tampon.clear()
+
+        self.requetes.remove(requete)
+
+    def expirer(self, maintenant):
+        """Annule les requêtes dont l’échéance est dépassée
+
+        :param maintenant:
+            instant courant, sur la même horloge que les échéances
+        :type maintenant:
+            un flottant
+
+        :returns:
+            la liste des requêtes annulées
+        """
+        expirees = [
+            requete for requete in self.requetes
+            if requete.echeance != None and requete.echeance <= maintenant
+        ]
+
+        for requete in expirees:
+            self.annuler(requete)
+
+        return expirees
+
+    def _attribuer(self, debut):
+        """Recherche la requête à laquelle appartiennent les octets du tampon
+
+        :param debut:
+            position du premier octet à examiner dans le tampon
+        :type debut:
+            un entier
+
+        :returns:
+            la plus ancienne requête dont le motif correspond aux octets
+            disponibles (éventuellement de façon partielle) ou None
+        """
+        disponible = len(self._tampon) - debut
+
+        for requete in self.requetes:
+            taille = min(disponible, len(requete.motif))
+            if self._tampon[debut:debut + taille] == requete.motif[:taille]:
+                return requete
+
+        return None
+
+    def traiter(self, octets):
+        """Analyse des octets reçus du Minitel
+
+        Les réponses complètes sont attribuées à leur requête, dont la
+        fonction de rappel est appelée. Les débuts de réponse sont conservés
+        en attendant la suite.
+
+        Appeler cette méthode avec un objet vide permet de réexaminer les
+        octets conservés, par exemple après l’annulation d’une requête.
+
+        :param octets:
+            octets reçus du Minitel
+        :type octets:
+            un objet bytes ou bytearray
+
+        :returns:
+            les octets ne faisant partie d’aucune réponse, dans leur ordre
+            d’arrivée
+        """
+        self._tampon += octets
+        passe = bytearray()
+        debut = 0
+
+        while debut < len(self._tampon):
+            # Sans requête en attente, tout est transmis tel quel
+            if len(self.requetes) == 0:
+                passe += self._tampon[debut:]
+                debut = len(self._tampon)
+                break
+
+            requete = self._attribuer(debut)
+
+            if requete == None:
+                # Caractère ne faisant partie d’aucune réponse
+                passe.append(self._tampon[debut])
+                debut += 1
+                continue
+
+            if len(self._tampon) - debut < requete.longueur:
+                # Réponse incomplète, on attend la suite
+                break
+
+            # Réponse complète
+            fin = debut + requete.longueur
+            requete.reponse = bytes(self._tampon[debut:fin])
+            requete.terminee = True
+            self.requetes.remove(requete)
+            debut = fin
+
+            if requete.rappel != None:
+                requete.rappel()
+
+        del self._tampon[:debut]
+
+        return passe
@@ -29,12 +29,85 @@ UNICODEVERSAUTRE = {
     'à': '0E400F', 'è': '0E7F0F', 'é': '0E7B0F', 'ù': '0E7C0F'
 }
 
+# Diacritiques (caractères combinants unicode) que le standard VIDEOTEX sait
+# appliquer à une lettre, et code suivant SS2 correspondant
+DIACRITIQUES = {
+    '\u0300': 0x41, # accent grave
+    '\u0301': 0x42, # accent aigu
+    '\u0302': 0x43, # accent circonflexe
+    '\u0308': 0x48, # tréma
+    '\u0327': 0x4b  # cédille
+}
+
+class TableConversion(dict):
+    """Table de conversion unicode vers Minitel utilisable par str.translate
+
+    La table associe le code d’un caractère unicode à la chaîne dont les
+    caractères sont les valeurs à envoyer au Minitel (un caractère par
+    octet). Les caractères absents des tables de conversion spéciales sont
+    décomposés (NFKD) et réduits à la norme ASCII lors de leur première
+    rencontre, puis mémorisés. Si la table dispose de diacritiques, une lettre
+    ASCII portant l’un d’eux est convertie en SS2, diacritique, lettre.
+
+    Les majuscules accentuées sont traitées comme les minuscules : 'É' donne
+    SS2, accent aigu, 'E' (b'\\x19BE') et occupe une seule case. Auparavant,
+    la lettre était suivie d’un '?' remplaçant l’accent (b'E?'), ce qui
+    décalait la suite de l’affichage. Sans diacritiques (standards MIXTE et
+    TELEINFORMATIQUE), ce remplacement reste en vigueur.
+    """
+    def __init__(self, conversions, diacritiques = None):
+        """Constructeur
+
+        :param conversions:
+            table des caractères spéciaux et de leur équivalent en hexadécimal
+        :type conversions:
+            un dictionnaire
+
+        :param diacritiques:
+            table des caractères combinants et du code suivant SS2 qui les
+            introduit, None si le standard ne les gère pas
+        :type diacritiques:
+            un dictionnaire ou None
+        """
+        dict.__init__(self, {
+            ord(caractere): unhexlify(hexa).decode('latin-1')
+            for caractere, hexa in conversions.items()
+        })
+
+        self.diacritiques = diacritiques
+
+    def __missing__(self, code):
+        """Convertit et mémorise un caractère non encore rencontré"""
+        decompose = normalize('NFKD', chr(code))
+
+        if (self.diacritiques != None and len(decompose) == 2 and
+            decompose[0].isascii() and decompose[1] in self.diacritiques):
+            self[code] = (
+                chr(0x19) + chr(self.diacritiques[decompose[1]]) + decompose[0]
+            )
+        else:
+            self[code] = decompose.encode('ascii', 'replace').decode('ascii')
+
+        return self[code]
+
+# Tables de conversion compilées pour chaque standard
+TABLES_CONVERSION = {
+    'VIDEOTEX': TableConversion(UNICODEVERSVIDEOTEX, DIACRITIQUES),
+    'MIXTE': TableConversion(UNICODEVERSAUTRE)
+}
+TABLES_CONVERSION['TELEINFORMATIQUE'] = TABLES_CONVERSION['MIXTE']
+
 class Sequence:
     """Une classe représentant une séquence de valeurs
 
     Une Séquence est une suite de valeurs prêtes à être envoyées à un Minitel.
     Ces valeurs respectent la norme ASCII.
+
+    Les valeurs sont conservées dans un bytearray (attribut valeurs), ce qui
+    permet de les ajouter sur place et de les transmettre sans conversion.
     """
+    __slots__ = ('valeurs', 'standard')
+
     def __init__(self, valeur = None, standard = 'VIDEOTEX'):
         """Constructeur de Sequence
 
@@ -42,8 +115,8 @@ class Sequence:
             valeur à ajouter à la construction de l’objet. Si la valeur est à
             None, aucune valeur n’est ajoutée
         :type valeur:
-            une chaîne de caractères, un entier, une liste, une séquence ou
-            None
+            une chaîne de caractères, un entier, une liste, une séquence, des
+            octets ou None
 
         :param standard:
             standard à utiliser pour la conversion unicode vers Minitel. Les
@@ -52,86 +125,164 @@ class Sequence:
         :type standard:
             une chaîne de caractères
         """
-        assert valeur == None or \
-                isinstance(valeur, (list, int, str, Sequence))
+        assert valeur == None or isinstance(valeur, (
+            list, int, str, bytes, bytearray, memoryview, Sequence
+        ))
         assert standard in ['VIDEOTEX', 'MIXTE', 'TELEINFORMATIQUE']
 
-        self.valeurs = []
-        self.longueur = 0
+        self.valeurs = bytearray()
         self.standard = standard
 
         if valeur != None:
             self.ajoute(valeur)
-        
+
+    @property
+    def longueur(self):
+        """Nombre de valeurs de la séquence"""
+        return len(self.valeurs)
+
+    def __bytes__(self):
+        """Retourne les valeurs de la séquence sous forme d’octets
+
+        :returns:
+            un objet bytes
+        """
+        return bytes(self.valeurs)
+
+    def vue(self):
+        """Retourne une vue sur les valeurs de la séquence, sans copie
+
+        La séquence ne doit pas être agrandie tant que la vue est utilisée.
+
+        :returns:
+            un objet memoryview
+        """
+        return memoryview(self.valeurs)
+
     def ajoute(self, valeur):
         """Ajoute une valeur ou une séquence de valeurs
 
-        La valeur soumise est d’abord canonisée par la méthode canonise avant
-        d’être ajoutée à la séquence. Cela garantit que la séquence ne contient
-        que des entiers représentant des caractères de la norme ASCII.
+        La valeur soumise est d’abord canonisée avant d’être ajoutée à la
+        séquence. Cela garantit que la séquence ne contient que des entiers
+        représentant des caractères de la norme ASCII. L’ajout se fait sur
+        place, sans recopier les valeurs déjà présentes.
 
         :param valeur:
             valeur à ajouter
         :type valeur:
-            une chaîne de caractères, un entier, une liste ou une Séquence
+            une chaîne de caractères, un entier, une liste, une Séquence ou
+            des octets
         """
-        assert isinstance(valeur, (list, int, str, Sequence))
+        assert isinstance(valeur, (
+            list, int, str, bytes, bytearray, memoryview, Sequence
+        ))
 
-        self.valeurs += self.canonise(valeur)
-        self.longueur = len(self.valeurs)
+        self._etendre(self.valeurs, valeur)
 
     def canonise(self, valeur):
         """Canonise une séquence de caractères
 
         Si une liste est soumise, quelle que soit sa profondeur, elle sera
         remise à plat. Une liste peut donc contenir des chaînes de caractères,
-        des entiers ou des listes. Cette facilité permet la construction de
-        séquences de caractères plus aisée. Cela facilite également la
-        comparaison de deux séquences.
+        des entiers, des octets, des Séquences ou des listes. Cette facilité
+        permet la construction de séquences de caractères plus aisée. Cela
+        facilite également la comparaison de deux séquences.
 
         :param valeur:
             valeur à canoniser
         :type valeur:
-            une chaîne de caractères, un entier, une liste ou une Séquence
+            une chaîne de caractères, un entier, une liste, une Séquence ou
+            des octets
 
         :returns:
-            Une liste de profondeur 1 d’entiers représentant des valeurs à la
-            norme ASCII.
+            Un bytearray d’entiers représentant des valeurs à la norme ASCII.
+
+        :raises TypeError:
+            si une liste contient un élément d’un autre type
 
         Exemple::
             canonise(['dd', 32, ['dd', 32]]) retournera
-            [100, 100, 32, 100, 100, 32]
+            bytearray(b'dd dd ')
         """
-        assert isinstance(valeur, (list, int, str, Sequence))
+        assert isinstance(valeur, (
+            list, int, str, bytes, bytearray, memoryview, Sequence
+        ))
 
-        # Si la valeur est juste un entier, on le retient dans une liste
-        if isinstance(valeur, int):
-            return [valeur]
-
-        # Si la valeur est une Séquence, ses valeurs ont déjà été canonisées
-        if isinstance(valeur, Sequence):
-            return valeur.valeurs
-
-        # À ce point, le paramètre contient soit une chaîne de caractères, soit
-        # une liste. L’une ou l’autre est parcourable par une boucle for ... in
-        # Transforme récursivement chaque élément de la liste en entier
-        canonise = []
-        for element in valeur:
-            if isinstance(element, str):
-                # Cette boucle traite 2 cas : celui ou liste est une chaîne
-                # unicode et celui ou element est une chaîne de caractères
-                for caractere in element:
-                    for ascii in self.unicode_vers_minitel(caractere):
-                        canonise.append(ascii)
-            elif isinstance(element, int):
-                # Un entier a juste besoin d’être ajouté à la liste finale
-                canonise.append(element)
-            elif isinstance(element, list):
-                # Si l’élément est une liste, on la canonise récursivement
-                canonise = canonise + self.canonise(element)
+        canonise = bytearray()
+        self._etendre(canonise, valeur)
 
         return canonise
 
+    def _etendre(self, valeurs, valeur):
+        """Ajoute sur place une valeur canonisée à un bytearray
+
+        Les listes imbriquées sont parcourues à l’aide d’une pile plutôt que
+        par des appels récursifs concaténant des listes intermédiaires.
+
+        :param valeurs:
+            le bytearray à compléter
+        :type valeurs:
+            un bytearray
+
+        :param valeur:
+            valeur à canoniser
+        :type valeur:
+            une chaîne de caractères, un entier, une liste, une Séquence ou
+            des octets
+        """
+        if isinstance(valeur, int):
+            # Si la valeur est juste un entier, on l’ajoute
+            valeurs.append(valeur)
+        elif isinstance(valeur, Sequence):
+            # Les valeurs d’une Séquence ont déjà été canonisées
+            valeurs += valeur.valeurs
+        elif isinstance(valeur, (bytes, bytearray, memoryview)):
+            valeurs += valeur
+        elif isinstance(valeur, str):
+            valeurs += self._convertir(valeur)
+        else:
+            # Remet la liste à plat en conservant l’ordre des éléments
+            pile = [iter(valeur)]
+            while len(pile) > 0:
+                for element in pile[-1]:
+                    if isinstance(element, int):
+                        valeurs.append(element)
+                    elif isinstance(element, str):
+                        valeurs += self._convertir(element)
+                    elif isinstance(element, list):
+                        pile.append(iter(element))
+                        break
+                    elif isinstance(element, Sequence):
+                        valeurs += element.valeurs
+                    elif isinstance(element, (bytes, bytearray, memoryview)):
+                        valeurs += element
+                    else:
+                        raise TypeError(
+                            'type non accepté dans une séquence : %s'
+                            % type(element).__name__
+                        )
+                else:
+                    pile.pop()
+
+    def _convertir(self, chaine):
+        """Convertit une chaîne unicode en valeurs Minitel
+
+        :param chaine:
+            chaîne à convertir
+        :type chaine:
+            une chaîne de caractères
+
+        :returns:
+            un objet bytes
+        """
+        # Les chaînes purement ASCII n’ont besoin d’aucune conversion
+        if chaine.isascii():
+            return chaine.encode('ascii')
+
+        table = TABLES_CONVERSION[self.standard]
+
+        return chaine.translate(table).encode('latin-1')
+
     def unicode_vers_minitel(self, caractere):
         """Convertit un caractère unicode en son équivalent Minitel
 
@@ -146,14 +297,9 @@ class Sequence:
         """
         assert isinstance(caractere, str) and len(caractere) == 1
 
-        if self.standard == 'VIDEOTEX':
-            if caractere in UNICODEVERSVIDEOTEX:
-                return unhexlify(UNICODEVERSVIDEOTEX[caractere])
-        else:
-            if caractere in UNICODEVERSAUTRE:
-                return unhexlify(UNICODEVERSAUTRE[caractere])
+        table = TABLES_CONVERSION[self.standard]
 
-        return normalize('NFKD', caractere).encode('ascii', 'replace')
+        return table[ord(caractere)].encode('latin-1')
 
     def egale(self, sequence):
         """Teste l’égalité de 2 séquences
@@ -178,3 +324,39 @@ class Sequence:
 
         return self.valeurs == sequence.valeurs
 
+    def __eq__(self, autre):
+        """Teste l’égalité avec une autre séquence ou des octets
+
+        Aucune conversion n’est faite : une chaîne, un entier ou une liste
+        n’est jamais égal à une séquence, ce qui garantit que deux valeurs
+        égales ont la même empreinte. La méthode egale permet de comparer une
+        séquence à une valeur à convertir.
+
+        :param autre:
+            valeur à comparer
+        :type autre:
+            un objet Sequence, bytes ou bytearray
+
+        :returns:
+            True si les valeurs sont égales, False sinon
+        """
+        if isinstance(autre, Sequence):
+            return self.valeurs == autre.valeurs
+
+        if isinstance(autre, (bytes, bytearray)):
+            return bytes(self.valeurs) == autre
+
+        return NotImplemented
+
+    def __hash__(self):
+        """Empreinte de la séquence
+
+        L’empreinte ne dépend que des valeurs et vaut celle des octets
+        correspondants, ce qui permet d’utiliser des séquences comme clés de
+        dictionnaire. Une séquence servant de clé ne doit plus être modifiée.
+
+        :returns:
+            un entier
+        """
+        return hash(bytes(self.valeurs))
+
@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""ServeurMinitel est un module permettant de servir de nombreux Minitel
+depuis une seule boucle d’entrées/sorties, sans aucun thread.
+"""
+
+import errno
+import os
+import socket
+import sys
+import traceback
+from selectors import DefaultSelector, EVENT_READ, EVENT_WRITE
+from time import monotonic
+
+from minitel.Decodeur import Decodeur # Découpage des caractères reçus
+from minitel.Minitel import MinitelBase
+from minitel.Transport import Transport, TransportSerie, TransportSocket
+from minitel.ui.UI import UI
+
+from minitel.constantes import CAPACITES_BASIQUES
+
+# Temps en secondes pendant lequel une socket d’écoute n’est plus surveillée
+# après un échec d’accept, faute de descripteur de fichier par exemple
+PAUSE_ACCEPTATION = 1
+
+class SessionMinitel(MinitelBase):
+    """Une session avec un Minitel servi par un ServeurMinitel
+
+    Une session dispose de toutes les commandes d’émission de la classe
+    Minitel (couleur, position, efface…) et peut donc être confiée aux
+    éléments d’interface utilisateur (Conteneur, Menu…). Les caractères émis
+    sont accumulés et transmis par la boucle du serveur dès que le Minitel
+    peut les recevoir.
+
+    Les séquences reçues du Minitel sont transmises à l’application de la
+    session au fur et à mesure de leur arrivée.
+
+    Elle instaure les attributs suivants :
+
+    - serveur : le ServeurMinitel qui gère la session
+    - transport : la liaison avec le Minitel
+    - application : l’élément d’interface ou la fonction qui reçoit les
+      séquences en provenance du Minitel
+    - optimiseur : un objet Optimiseur réécrivant les octets émis, None pour
+      les émettre tels quels. Il n’est valable qu’en mode Videotex.
+    - compresseur : un objet Compresseur remplaçant les suites de caractères
+      identiques par des commandes REP, None pour ne pas compresser
+    """
+    def __init__(self, serveur, transport):
+        """Constructeur
+
+        :param serveur:
+            le serveur gérant la session
+        :type serveur:
+            un objet ServeurMinitel
+
+        :param transport:
+            la liaison avec le Minitel, qui doit disposer d’un descripteur de
+            fichier
+        :type transport:
+            un objet Transport
+        """
+        assert isinstance(serveur, ServeurMinitel)
+        assert isinstance(transport, Transport)
+
+        # Initialise l’état du Minitel
+        self.mode = 'VIDEOTEX'
+        self.vitesse = transport.baudrate
+        self.capacite = dict(CAPACITES_BASIQUES)
+
+        self.serveur = serveur
+        self.transport = transport
+        self.application = None
+        self.optimiseur = None
+        self.compresseur = None
+
+        # Le descripteur est utilisé directement et en mode non bloquant par
+        # la boucle du serveur
+        self._descripteur = transport.fileno()
+        os.set_blocking(self._descripteur, False)
+
+        # Octets en attente d’émission, les seconds devant encore passer par
+        # l’optimiseur
+        self._a_emettre = bytearray()
+        self._a_optimiser = bytearray()
+
+        # Découpe les octets reçus en séquences
+        self.decodeur = Decodeur()
+
+        self._fermeture = False
+
+    def envoyer(self, contenu):
+        """Envoi de séquence de caractères
+
+        Ajoute une séquence de caractères à celles en attente d’émission vers
+        le Minitel. L’émission effective est réalisée par la boucle du serveur.
+
+        :param contenu:
+            Une séquence de caractères interprétable par la classe Sequence.
+        :type contenu:
+            un objet Sequence, une chaîne de caractères ou unicode, une liste,
+            un entier, des octets
+        """
+        contenu = self._preparer(contenu)
+
+        if len(contenu) == 0:
+            return
+
+        if len(self._a_emettre) == 0 and len(self._a_optimiser) == 0:
+            self.serveur._surveiller(self, True)
+
+        if self.optimiseur != None:
+            self._a_optimiser += contenu
+        else:
+            self._a_emettre += contenu
+
+    def fermer(self):
+        """Termine la session
+
+        Les caractères encore en attente sont envoyés au Minitel avant la
+        fermeture de la liaison.
+        """
+        self._fermeture = True
+
+        if len(self._a_emettre) == 0 and len(self._a_optimiser) == 0:
+            self.serveur._retirer(self)
+
+    def _lire(self):
+        """Lit tout ce que le Minitel a envoyé et distribue les séquences
+
+        Cette méthode est appelée par la boucle du serveur lorsque des octets
+        sont disponibles.
+        """
+        try:
+            octets = os.read(self._descripteur, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            octets = b''
+
+        # Une lecture vide indique que le Minitel s’est déconnecté
+        if len(octets) == 0:
+            self.serveur._retirer(self)
+            return
+
+        # Le Minitel a pu afficher lui-même les caractères tapés
+        if self.ecran != None:
+            self.ecran.saisie(octets)
+
+        self._distribuer(self.decodeur.decoder(octets))
+
+    def _ecrire(self):
+        """Transmet au Minitel autant d’octets en attente que possible
+
+        Cette méthode est appelée par la boucle du serveur lorsque la liaison
+        peut accepter des octets. Tout ce qui a été envoyé depuis le dernier
+        appel passe d’abord en un seul lot par l’optimiseur.
+        """
+        if len(self._a_optimiser) > 0:
+            if self.optimiseur != None and self.mode == 'VIDEOTEX':
+                self._a_emettre += self.optimiseur.optimiser(self._a_optimiser)
+            else:
+                self._a_emettre += self._a_optimiser
+
+            self._a_optimiser.clear()
+
+        try:
+            del self._a_emettre[:os.write(self._descripteur, self._a_emettre)]
+        except BlockingIOError:
+            return
+        except OSError:
+            self.serveur._retirer(self)
+            return
+
+        if len(self._a_emettre) == 0:
+            if self._fermeture:
+                self.serveur._retirer(self)
+            else:
+                self.serveur._surveiller(self, False)
+
+    def _distribuer(self, sequences):
+        """Transmet des séquences reçues à l’application
+
+        :param sequences:
+            les séquences complètes découpées par le décodeur
+        :type sequences:
+            une liste d’objets Sequence
+        """
+        for sequence in sequences:
+            if self._fermeture:
+                return
+
+            if isinstance(self.application, UI):
+                self.application.gere_touche(sequence)
+            elif self.application != None:
+                self.application(sequence)
+
+class ServeurMinitel:
+    """Un serveur de Minitel multiplexant toutes les liaisons sur une seule
+    boucle
+
+    Présentation
+    ============
+
+    Le serveur accepte des connexions TCP et ouvre des ports série. Pour
+    chaque Minitel, il crée une SessionMinitel et appelle la fabrique
+    d’application fournie au constructeur. Celle-ci retourne :
+
+    - soit un élément d’interface (un Conteneur par exemple) : il est affiché
+      immédiatement puis sa méthode gere_touche reçoit chaque séquence,
+    - soit une fonction recevant chaque séquence en paramètre.
+
+    Toutes les entrées/sorties sont traitées par une unique boucle reposant
+    sur le module selectors, sans aucun thread.
+
+    Une exception levée par la fabrique ou par l’application d’une session
+    ne met fin qu’à cette session. Elle est transmise à la méthode
+    erreur_session, qui peut être redéfinie.
+
+    Démarrage rapide
+    ================
+
+    ::
+
+        from minitel.ServeurMinitel import ServeurMinitel
+        from minitel.ui.Conteneur import Conteneur
+
+        def accueil(session):
+            conteneur = Conteneur(session, 1, 1, 40, 24)
+            # ...
+            return conteneur
+
+        serveur = ServeurMinitel(accueil)
+        serveur.ecouter('0.0.0.0', 3615)
+        serveur.ouvrir_serie('/dev/ttyUSB0')
+        serveur.executer()
+    """
+    def __init__(self, application):
+        """Constructeur
+
+        :param application:
+            fabrique appelée avec la SessionMinitel de chaque nouveau Minitel
+            et retournant un élément d’interface ou une fonction
+        :type application:
+            une fonction
+        """
+        assert callable(application)
+
+        self.application = application
+        self.sessions = []
+
+        self._selecteur = DefaultSelector()
+        self._ecoutes = []
+        self._continuer = False
+
+        # Sockets d’écoute en pause et instant de leur reprise
+        self._reprises = {}
+
+    def ecouter(self, hote = '', port = 3615):
+        """Accepte les connexions TCP de Minitel sur une adresse donnée
+
+        :param hote:
+            adresse sur laquelle écouter, toutes par défaut
+        :type hote:
+            une chaîne de caractères
+
+        :param port:
+            port TCP sur lequel écouter
+        :type port:
+            un entier
+
+        :returns:
+            la socket d’écoute créée
+        """
+        assert isinstance(hote, str)
+        assert isinstance(port, int)
+
+        ecoute = socket.create_server((hote, port))
+        ecoute.setblocking(False)
+
+        self._ecoutes.append(ecoute)
+        self._selecteur.register(ecoute, EVENT_READ, self._accepter)
+
+        return ecoute
+
+    def ouvrir_serie(self, peripherique):
+        """Ouvre une session sur un Minitel relié par un port série
+
+        :param peripherique:
+            Le périphérique sur lequel est connecté le Minitel.
+        :type peripherique:
+            une chaîne de caractères
+
+        :returns:
+            la SessionMinitel créée
+        """
+        return self.ajouter(TransportSerie(peripherique, timeout = 0))
+
+    def ajouter(self, transport):
+        """Ouvre une session sur un transport déjà ouvert
+
+        :param transport:
+            la liaison avec le Minitel, qui doit disposer d’un descripteur de
+            fichier
+        :type transport:
+            un objet Transport
+
+        :returns:
+            la SessionMinitel créée
+
+        Si la fabrique d’application échoue, le transport est fermé et
+        l’exception est propagée.
+        """
+        session = SessionMinitel(self, transport)
+
+        # Démarre l’application de la session avant de l’enregistrer : une
+        # session dont l’application n’a pu démarrer n’est jamais servie
+        try:
+            session.application = self.application(session)
+
+            if isinstance(session.application, UI):
+                session.application.affiche()
+        except Exception:
+            transport.close()
+            raise
+
+        # L’application a pu fermer la session dès son démarrage
+        en_attente = len(session._a_emettre) > 0 or \
+                     len(session._a_optimiser) > 0
+
+        if session._fermeture and not en_attente:
+            transport.close()
+            return session
+
+        self.sessions.append(session)
+        self._selecteur.register(session._descripteur, EVENT_READ, session)
+
+        if en_attente:
+            self._surveiller(session, True)
+
+        return session
+
+    def _accepter(self, ecoute):
+        """Accepte une connexion TCP en attente
+
+        Un échec d’accept est transmis à la méthode erreur_session. Si la
+        connexion elle-même n’est pas en cause (trop de fichiers ouverts…),
+        la socket d’écoute est mise en pause pour ne pas boucler sur l’erreur.
+        """
+        try:
+            connexion, _ = ecoute.accept()
+        except BlockingIOError:
+            return
+        except OSError as erreur:
+            self.erreur_session(None, erreur)
+
+            if erreur.errno != errno.ECONNABORTED:
+                self._selecteur.unregister(ecoute)
+                self._reprises[ecoute] = monotonic() + PAUSE_ACCEPTATION
+
+            return
+
+        try:
+            self.ajouter(TransportSocket(connexion, timeout = 0))
+        except Exception as erreur:
+            self.erreur_session(None, erreur)
+
+    def erreur_session(self, session, erreur):
+        """Signale une exception ayant mis fin à une session
+
+        Par défaut, la trace de l’exception est écrite sur la sortie d’erreur.
+        Cette méthode peut être redéfinie pour la journaliser autrement.
+
+        :param session:
+            la session fermée, None si l’exception a empêché sa création
+        :type session:
+            un objet SessionMinitel ou None
+
+        :param erreur:
+            l’exception levée
+        :type erreur:
+            une exception
+        """
+        traceback.print_exception(
+            type(erreur), erreur, erreur.__traceback__, file = sys.stderr
+        )
+
+    def _isoler(self, session, traitement, *parametres):
+        """Exécute un traitement propre à une session
+
+        Une exception levée par le traitement ferme la session sans
+        interrompre la boucle du serveur.
+        """
+        try:
+            traitement(*parametres)
+        except Exception as erreur:
+            self._retirer(session)
+            self.erreur_session(session, erreur)
+
+    def _surveiller(self, session, ecriture):
+        """Indique si la boucle doit surveiller la possibilité d’écrire
+
+        :param session:
+            la session concernée
+        :type session:
+            un objet SessionMinitel
+
+        :param ecriture:
+            True si des octets sont en attente d’émission
+        :type ecriture:
+            un booléen
+        """
+        if session not in self.sessions:
+            return
+
+        evenements = EVENT_READ
+        if ecriture:
+            evenements |= EVENT_WRITE
+
+        self._selecteur.modify(session._descripteur, evenements, session)
+
+    def _retirer(self, session):
+        """Ferme une session et l’oublie
+
+        :param session:
+            la session à fermer
+        :type session:
+            un objet SessionMinitel
+        """
+        if session not in self.sessions:
+            return
+
+        self.sessions.remove(session)
+        self._selecteur.unregister(session._descripteur)
+        session.transport.close()
+
+    def executer(self):
+        """Boucle principale du serveur
+
+        Cette méthode ne rend la main qu’après un appel à la méthode arreter.
+        """
+        self._continuer = True
+
+        while self._continuer:
+            # Le délai d’attente est borné par la prochaine échéance ESC et
+            # par la reprise des sockets d’écoute en pause
+            echeances = [
+                session.decodeur.echeance for session in self.sessions
+                if session.decodeur.echeance != None
+            ]
+            echeances += self._reprises.values()
+
+            attente = None
+            if len(echeances) > 0:
+                attente = max(0, min(echeances) - monotonic())
+
+            for cle, evenements in self._selecteur.select(attente):
+                if not isinstance(cle.data, SessionMinitel):
+                    cle.data(cle.fileobj)
+                    continue
+
+                session = cle.data
+                if evenements & EVENT_WRITE:
+                    self._isoler(session, session._ecrire)
+
+                if evenements & EVENT_READ and session in self.sessions:
+                    self._isoler(session, session._lire)
+
+            # Reprend la surveillance des sockets d’écoute en pause
+            maintenant = monotonic()
+            for ecoute, reprise in list(self._reprises.items()):
+                if reprise <= maintenant:
+                    del self._reprises[ecoute]
+                    self._selecteur.register(ecoute, EVENT_READ,
+                                             self._accepter)
+
+            # Traite les ESC isolés dont l’échéance est atteinte
+            for session in list(self.sessions):
+                echeance = session.decodeur.echeance
+                if echeance != None and echeance <= maintenant:
+                    self._isoler(
+                        session, session._distribuer,
+                        session.decodeur.expirer(maintenant)
+                    )
+
+    def arreter(self):
+        """Demande l’arrêt de la boucle principale
+
+        Peut être appelée depuis une application de session.
+        """
+        self._continuer = False
+
+    def close(self):
+        """Ferme toutes les sessions et les sockets d’écoute"""
+        for session in list(self.sessions):
+            self._retirer(session)
+
+        for ecoute in self._ecoutes:
+            if ecoute in self._reprises:
+                del self._reprises[ecoute]
+            else:
+                self._selecteur.unregister(ecoute)
+
+            ecoute.close()
+
+        self._ecoutes = []
+        self._selecteur.close()
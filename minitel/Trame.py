@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Trame est un module permettant de décrire un écran complet de Minitel et
+de ne transmettre que ce qui diffère de l’écran affiché.
+
+L’application décrit dans une Trame l’écran souhaité, case par case
+(caractère et attributs), puis la confie à la méthode afficher_trame d’un
+Minitel. Celle-ci compare la trame au modèle de l’écran (un objet Ecran) et
+n’émet que les cases qui ont changé, en choisissant les déplacements les
+plus courts et en ne redéfinissant que les attributs nécessaires.
+
+Note:
+En Videotex, la couleur de fond ne s’applique qu’aux délimiteurs (espace et
+caractères semi-graphiques). Comme pour la méthode couleur, une couleur de
+fond donnée à une lettre ne s’affiche que si un délimiteur de cette couleur
+la précède sur la ligne.
+"""
+
+from minitel.Decoupeur import Decoupeur, CARACTERE, ATTRIBUTS_DEFAUT
+from minitel.Ecran import (Ecran, LIGNES, COLONNES, ORDRE_ATTRIBUTS,
+    CASE_VIDE, ENCOMBREMENTS, commande_position, deplacement_vertical,
+    deplacement_horizontal)
+from minitel.Optimiseur import compresser_repetitions
+from minitel.Sequence import Sequence
+
+from minitel.constantes import ESC, FF, SO, SI, COULEURS_MINITEL
+
+class Trame:
+    """Un écran complet de Minitel décrit case par case
+
+    Les cases ont le même format que celles de la classe Ecran : un tuple
+    (octets, couleur, fond, taille, clignotement, soulignement, inversion,
+    jeu). Seules les lignes 1 à 24 sont affichées, la ligne 0 (ligne d’état)
+    n’est pas concernée.
+
+    Elle instaure les attributs suivants :
+
+    - colonnes : nombre de colonnes (40 ou 80)
+    - grille : liste de 25 lignes contenant chacune une liste de cases (la
+      colonne 1 est à l’indice 0)
+    """
+    def __init__(self, colonnes = 40):
+        """Constructeur
+
+        La trame est initialement vide : des espaces avec les attributs par
+        défaut, comme après un effacement de l’écran.
+
+        :param colonnes:
+            nombre de colonnes (40 en Videotex, 80 en mode mixte)
+        :type colonnes:
+            un entier
+        """
+        assert colonnes in COLONNES.values()
+
+        self.colonnes = colonnes
+        self.effacer()
+
+    def effacer(self):
+        """Vide la trame"""
+        self.grille = [[CASE_VIDE] * self.colonnes for _ in range(LIGNES)]
+
+    def copie(self):
+        """Retourne une copie de la trame
+
+        :returns:
+            un objet Trame
+        """
+        trame = Trame(self.colonnes)
+        trame.grille = [list(ligne) for ligne in self.grille]
+
+        return trame
+
+    def case(self, colonne, ligne):
+        """Retourne le contenu d’une case
+
+        :param colonne:
+            colonne de la case (à partir de 1)
+        :type colonne:
+            un entier
+
+        :param ligne:
+            ligne de la case (1 à 24)
+        :type ligne:
+            un entier
+
+        :returns:
+            un tuple (octets, couleur, fond, taille, clignotement,
+            soulignement, inversion, jeu)
+        """
+        assert isinstance(colonne, int) and 1 <= colonne <= self.colonnes
+        assert isinstance(ligne, int) and 1 <= ligne < LIGNES
+
+        return self.grille[ligne][colonne - 1]
+
+    def ecrire(self, colonne, ligne, texte, couleur = 'blanc', fond = 'noir',
+               clignotement = False, soulignement = False, inversion = False,
+               semigraphique = False):
+        """Écrit un texte dans la trame
+
+        Le texte est converti selon le standard Videotex. Ce qui dépasse de
+        la ligne est ignoré.
+
+        :param colonne:
+            colonne du premier caractère (à partir de 1)
+        :type colonne:
+            un entier
+
+        :param ligne:
+            ligne du texte (1 à 24)
+        :type ligne:
+            un entier
+
+        :param texte:
+            texte à écrire ou, en semi-graphique, caractères semi-graphiques
+        :type texte:
+            une chaîne de caractères
+
+        :param couleur:
+            couleur des caractères (voir la méthode couleur de Minitel)
+        :type couleur:
+            une chaîne de caractères ou un entier
+
+        :param fond:
+            couleur de fond
+        :type fond:
+            une chaîne de caractères ou un entier
+
+        :param clignotement:
+            True pour faire clignoter les caractères
+        :type clignotement:
+            un booléen
+
+        :param soulignement:
+            True pour souligner les caractères (disjoindre en semi-graphique)
+        :type soulignement:
+            un booléen
+
+        :param inversion:
+            True pour inverser les couleurs
+        :type inversion:
+            un booléen
+
+        :param semigraphique:
+            True pour écrire des caractères semi-graphiques (jeu G1)
+        :type semigraphique:
+            un booléen
+        """
+        assert isinstance(colonne, int) and 1 <= colonne <= self.colonnes
+        assert isinstance(ligne, int) and 1 <= ligne < LIGNES
+        assert isinstance(texte, str)
+        assert couleur in COULEURS_MINITEL
+        assert fond in COULEURS_MINITEL
+        assert clignotement in [True, False]
+        assert soulignement in [True, False]
+        assert inversion in [True, False]
+        assert semigraphique in [True, False]
+
+        attributs = (
+            0x40 + COULEURS_MINITEL[couleur],
+            0x50 + COULEURS_MINITEL[fond],
+            ATTRIBUTS_DEFAUT['taille'],
+            0x48 if clignotement else 0x49,
+            0x5a if soulignement else 0x59,
+            0x5d if inversion else 0x5c,
+            'G1' if semigraphique else 'G0'
+        )
+
+        # Chaque caractère Videotex (simple ou introduit par SS2) occupe une
+        # case
+        commandes = Decoupeur().decouper(bytes(Sequence(texte)))
+        cases = self.grille[ligne]
+
+        for nature, octets in commandes:
+            if colonne > self.colonnes:
+                break
+
+            if nature != CARACTERE:
+                continue
+
+            cases[colonne - 1] = (octets,) + attributs
+            colonne += 1
+
+    def rendre(self, ecran):
+        """Retourne les octets transformant l’écran en cette trame
+
+        Deux stratégies sont comparées : compléter l’écran tel qu’il est ou
+        l’effacer (FF) puis écrire les cases non vides. La plus courte est
+        retenue.
+
+        :param ecran:
+            le modèle de l’écran actuellement affiché, qui n’est pas modifié
+        :type ecran:
+            un objet Ecran
+
+        :returns:
+            un objet bytes
+        """
+        assert isinstance(ecran, Ecran)
+        assert ecran.colonnes == self.colonnes
+
+        if ecran.mode != 'VIDEOTEX':
+            return b''
+
+        complement = _Rendu(self, ecran.grille, ecran.ligne, ecran.colonne,
+                            ecran.attributs, ecran.jeu).octets()
+
+        vide = [[CASE_VIDE] * self.colonnes for _ in range(LIGNES)]
+        effacement = bytes([FF]) + _Rendu(self, vide, 1, 1, ATTRIBUTS_DEFAUT,
+                                          'G0').octets()
+
+        if len(effacement) < len(complement):
+            return effacement
+
+        return complement
+
+class _Rendu:
+    """Construction des octets transformant une grille en une trame
+
+    Le curseur et les attributs sont simulés au fur et à mesure des octets
+    produits afin de n’émettre que les commandes nécessaires.
+    """
+    def __init__(self, trame, grille, ligne, colonne, attributs, jeu):
+        self.trame = trame
+        self.grille = grille
+        self.ligne = ligne
+        self.colonne = colonne
+        self.attributs = dict(attributs)
+        self.jeu = jeu
+        self.sortie = bytearray()
+
+    def octets(self):
+        """Retourne les octets transformant la grille en la trame
+
+        :returns:
+            un objet bytes
+        """
+        colonnes = self.trame.colonnes
+
+        for ligne in range(1, LIGNES):
+            actuelle = self.grille[ligne]
+            souhaitee = self.trame.grille[ligne]
+
+            if actuelle == souhaitee:
+                continue
+
+            for indice in range(colonnes):
+                case = souhaitee[indice]
+                if case == actuelle[indice]:
+                    continue
+
+                self._aller(ligne, indice + 1)
+                self._attributs(case)
+                self.sortie += case[0]
+                self._avancer(case[3])
+
+        return compresser_repetitions(self.sortie)
+
+    def _aller(self, ligne, colonne):
+        """Amène le curseur à une position par le plus court chemin
+
+        Les déplacements relatifs sont préférés à coût égal car ils ne
+        modifient pas les attributs. Ils peuvent réécrire des cases de la
+        trame à l’identique.
+        """
+        if self.ligne == ligne and self.colonne == colonne:
+            return
+
+        absolu = commande_position(colonne, ligne)
+
+        if self.ligne != None and self.ligne > 0:
+            relatif = deplacement_vertical(ligne - self.ligne)
+            relatif += deplacement_horizontal(
+                self.colonne, colonne, self.trame.grille[ligne],
+                self.attributs, self.jeu
+            )
+
+            if len(relatif) <= len(absolu):
+                self.sortie += relatif
+                self.ligne = ligne
+                self.colonne = colonne
+                return
+
+        self.sortie += absolu
+        self.attributs = dict(ATTRIBUTS_DEFAUT)
+        self.jeu = 'G0'
+        self.ligne = ligne
+        self.colonne = colonne
+
+    def _attributs(self, case):
+        """Émet les attributs de la case qui diffèrent de ceux en vigueur"""
+        for indice, categorie in enumerate(ORDRE_ATTRIBUTS):
+            code = case[indice + 1]
+            if self.attributs[categorie] != code:
+                self.sortie += bytes([ESC, code])
+                self.attributs[categorie] = code
+
+        if self.jeu != case[7]:
+            self.sortie.append(SO if case[7] == 'G1' else SI)
+            self.jeu = case[7]
+
+    def _avancer(self, taille):
+        """Avance le curseur après l’écriture d’un caractère"""
+        largeur, _ = ENCOMBREMENTS[taille]
+        self.colonne += largeur
+
+        if self.colonne <= self.trame.colonnes:
+            return
+
+        # Passé la fin de la ligne, le curseur va au début de la suivante.
+        # Après la dernière ligne, la position n’est plus considérée comme
+        # connue, ce qui impose un positionnement absolu.
+        if self.ligne < LIGNES - 1:
+            self.ligne += 1
+            self.colonne = 1
+        else:
+            self.ligne = None
+            self.colonne = None
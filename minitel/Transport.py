@@ -0,0 +1,488 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Transport est un module regroupant les différentes liaisons physiques ou
+logiques permettant de dialoguer avec un Minitel.
+
+Chaque transport offre le sous-ensemble de l’interface de PySerial utilisé par
+la classe Minitel (read, write, flush, close, in_waiting, baudrate, timeout).
+Un même objet Minitel peut ainsi piloter un vrai Minitel relié par un port
+série, un Minitel accessible au travers d’une passerelle TCP, un émulateur
+branché sur un pseudo-terminal ou une doublure de test reliée en boucle.
+"""
+
+import os
+import socket
+from abc import ABC, abstractmethod
+from fcntl import ioctl
+from select import select
+from struct import pack, unpack
+from termios import FIONREAD
+from tty import setraw
+from urllib.parse import urlsplit
+
+from serial import Serial
+
+def _octets_disponibles(descripteur):
+    """Retourne le nombre d’octets pouvant être lus sans attente.
+
+    :param descripteur:
+        descripteur de fichier à interroger
+    :type descripteur:
+        un entier
+
+    :returns:
+        le nombre d’octets en attente de lecture
+    """
+    return unpack('I', ioctl(descripteur, FIONREAD, pack('I', 0)))[0]
+
+def _attendre_lecture(descripteur, reveil, timeout):
+    """Attend que des octets soient disponibles sur un descripteur
+
+    L’attente est interrompue dès qu’un octet est écrit dans le tube de
+    réveil.
+
+    :param descripteur:
+        descripteur de fichier à surveiller
+    :type descripteur:
+        un entier
+
+    :param reveil:
+        descripteur de lecture du tube de réveil
+    :type reveil:
+        un entier
+
+    :param timeout:
+        temps d’attente maximum en secondes
+    :type timeout:
+        un entier, un flottant ou None
+
+    :returns:
+        True si des octets sont disponibles, False si le délai a expiré ou si
+        l’attente a été interrompue
+    """
+    prets, _, _ = select([descripteur, reveil], [], [], timeout)
+
+    if reveil in prets:
+        os.read(reveil, 64)
+        return False
+
+    return len(prets) > 0
+
+class Transport(ABC):
+    """Classe de base des transports
+
+    Un transport est un canal d’octets bidirectionnel entre l’ordinateur et un
+    Minitel. Les classes dérivées doivent implémenter les méthodes read, write,
+    fileno, close et la propriété in_waiting, faute de quoi elles ne peuvent
+    pas être instanciées.
+
+    Tous les transports fournis reposent sur un descripteur de fichier (port
+    série, socket, pseudo-terminal, paire de sockets locales) et peuvent donc
+    être surveillés par select ou confiés à ServeurMinitel.
+
+    Elle instaure les attributs suivants :
+
+    - nom : nom du transport (chemin du périphérique, adresse distante…)
+    - stable : True si le nom désigne toujours le même Minitel d’une
+      connexion à l’autre (port série, hôte auquel on se connecte), False
+      s’il est propre à cette connexion (connexion acceptée, pseudo-terminal,
+      transport en boucle). Seuls les transports stables voient leur vitesse
+      et leur identification mémorisées.
+    - timeout : temps d’attente maximum en secondes lors d’une lecture
+    - baudrate : vitesse de la liaison en bits par seconde. Seuls les
+      transports série en tiennent réellement compte, les autres se contentent
+      de mémoriser la valeur.
+    """
+    def __init__(self, nom, timeout = 1, stable = True):
+        """Constructeur
+
+        :param nom:
+            nom du transport
+        :type nom:
+            une chaîne de caractères
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+
+        :param stable:
+            True si le nom désigne toujours le même Minitel
+        :type stable:
+            un booléen
+        """
+        assert isinstance(nom, str)
+        assert isinstance(timeout, (int, float)) or timeout == None
+        assert stable in [True, False]
+
+        self.nom = nom
+        self.stable = stable
+        self.timeout = timeout
+        self._baudrate = 1200
+
+    @property
+    def baudrate(self):
+        """Vitesse de la liaison en bits par seconde"""
+        return self._baudrate
+
+    @baudrate.setter
+    def baudrate(self, vitesse):
+        self._baudrate = vitesse
+
+    @property
+    @abstractmethod
+    def in_waiting(self):
+        """Nombre d’octets pouvant être lus sans attente"""
+
+    @abstractmethod
+    def read(self, taille = 1):
+        """Lit des octets en provenance du Minitel
+
+        Attend au plus timeout secondes l’arrivée d’un premier octet.
+
+        :param taille:
+            nombre maximum d’octets à lire
+        :type taille:
+            un entier positif
+
+        :returns:
+            les octets lus, éventuellement aucun si le délai est dépassé
+        """
+
+    @abstractmethod
+    def write(self, donnees):
+        """Écrit des octets à destination du Minitel
+
+        :param donnees:
+            les octets à écrire
+        :type donnees:
+            un objet bytes, bytearray ou memoryview
+        """
+
+    def flush(self):
+        """Attend que les octets écrits aient été transmis"""
+        pass
+
+    def annuler_lecture(self):
+        """Interrompt la lecture en cours
+
+        La lecture en cours, ou à défaut la prochaine, rend immédiatement la
+        main sans attendre le délai timeout. Par défaut, rien n’est fait et la
+        lecture se termine à l’expiration du délai.
+        """
+        pass
+
+    @abstractmethod
+    def fileno(self):
+        """Retourne le descripteur de fichier sous-jacent au transport
+
+        Le descripteur est celui sur lequel transitent les octets : il peut
+        être surveillé par select et lu ou écrit directement.
+
+        :returns:
+            un descripteur de fichier (entier)
+        """
+
+    @abstractmethod
+    def close(self):
+        """Ferme le transport"""
+
+class TransportSerie(Transport):
+    """Transport par port série
+
+    C’est le transport historique de PyMinitel. La connexion est établie selon
+    le standard de base du Minitel : 1200 bps, 7 bits, parité paire.
+    """
+    def __init__(self, peripherique = '/dev/ttyUSB0', timeout = 1):
+        """Constructeur
+
+        :param peripherique:
+            Le périphérique sur lequel est connecté le Minitel.
+        :type peripherique:
+            une chaîne de caractères
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+        """
+        Transport.__init__(self, peripherique, timeout)
+
+        self._serie = Serial(
+            peripherique,
+            baudrate = 1200, # vitesse à 1200 bps, le standard Minitel
+            bytesize = 7,    # taille de caractère à 7 bits
+            parity   = 'E',  # parité paire
+            stopbits = 1,    # 1 bit d’arrêt
+            timeout  = timeout,
+            xonxoff  = 0,    # pas de contrôle logiciel
+            rtscts   = 0     # pas de contrôle matériel
+        )
+
+    @property
+    def baudrate(self):
+        """Vitesse du port série en bits par seconde"""
+        return self._serie.baudrate
+
+    @baudrate.setter
+    def baudrate(self, vitesse):
+        self._serie.baudrate = vitesse
+
+    @property
+    def in_waiting(self):
+        return self._serie.in_waiting
+
+    def read(self, taille = 1):
+        return self._serie.read(taille)
+
+    def write(self, donnees):
+        self._serie.write(donnees)
+
+    def flush(self):
+        self._serie.flush()
+
+    def annuler_lecture(self):
+        self._serie.cancel_read()
+
+    def fileno(self):
+        return self._serie.fileno()
+
+    def close(self):
+        self._serie.close()
+
+class TransportSocket(Transport):
+    """Transport par socket TCP
+
+    Ce transport permet de dialoguer avec un Minitel placé derrière un serveur
+    de terminaux ou une passerelle Minitel sur IP. Les octets sont échangés
+    tels quels, sans aucun protocole supplémentaire.
+    """
+    def __init__(self, hote, port = None, timeout = 1):
+        """Constructeur
+
+        :param hote:
+            nom ou adresse de l’hôte auquel se connecter, ou bien une socket
+            déjà connectée (par exemple issue d’un accept)
+        :type hote:
+            une chaîne de caractères ou un objet socket
+
+        :param port:
+            port TCP auquel se connecter, ignoré si hote est une socket
+        :type port:
+            un entier ou None
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+        """
+        # Le port distant d’une connexion acceptée change à chaque connexion
+        if isinstance(hote, socket.socket):
+            self._socket = hote
+            hote, port = hote.getpeername()[:2]
+            stable = False
+        else:
+            assert isinstance(hote, str)
+            assert isinstance(port, int)
+            self._socket = socket.create_connection((hote, port))
+            stable = True
+
+        # Une adresse IPv6 est placée entre crochets, comme pour ouvrir
+        if ':' in hote:
+            hote = '[%s]' % hote
+
+        nom = 'tcp://%s:%d' % (hote, port)
+
+        Transport.__init__(self, nom, timeout, stable)
+
+        # Les commandes Minitel sont courtes, il ne faut pas les retarder
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Tube permettant d’interrompre une lecture en cours
+        self._reveil = os.pipe()
+
+    @property
+    def in_waiting(self):
+        return _octets_disponibles(self._socket.fileno())
+
+    def read(self, taille = 1):
+        if not _attendre_lecture(self.fileno(), self._reveil[0], self.timeout):
+            return b''
+
+        try:
+            octets = self._socket.recv(taille)
+        except BlockingIOError:
+            return b''
+
+        if len(octets) == 0:
+            raise ConnectionError('connexion fermée par ' + self.nom)
+
+        return octets
+
+    def write(self, donnees):
+        self._socket.sendall(donnees)
+
+    def annuler_lecture(self):
+        os.write(self._reveil[1], b'\0')
+
+    def fileno(self):
+        return self._socket.fileno()
+
+    def close(self):
+        self._socket.close()
+        os.close(self._reveil[0])
+        os.close(self._reveil[1])
+
+class TransportPty(Transport):
+    """Transport par pseudo-terminal
+
+    Ce transport crée un pseudo-terminal dont le côté esclave peut être ouvert
+    par un émulateur de Minitel ou par un autre programme comme s’il
+    s’agissait d’un port série. Le chemin du côté esclave est disponible dans
+    l’attribut nom.
+    """
+    def __init__(self, timeout = 1):
+        """Constructeur
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+        """
+        self._maitre, self._esclave = os.openpty()
+
+        # Le pseudo-terminal ne doit ni interpréter ni renvoyer les octets
+        setraw(self._esclave)
+
+        Transport.__init__(self, os.ttyname(self._esclave), timeout, False)
+
+        # Tube permettant d’interrompre une lecture en cours
+        self._reveil = os.pipe()
+
+    @property
+    def in_waiting(self):
+        return _octets_disponibles(self._maitre)
+
+    def read(self, taille = 1):
+        if not _attendre_lecture(self._maitre, self._reveil[0], self.timeout):
+            return b''
+
+        return os.read(self._maitre, taille)
+
+    def write(self, donnees):
+        donnees = memoryview(donnees)
+        while len(donnees) > 0:
+            donnees = donnees[os.write(self._maitre, donnees):]
+
+    def annuler_lecture(self):
+        os.write(self._reveil[1], b'\0')
+
+    def fileno(self):
+        return self._maitre
+
+    def close(self):
+        os.close(self._maitre)
+        os.close(self._esclave)
+        os.close(self._reveil[0])
+        os.close(self._reveil[1])
+
+class TransportBoucle(TransportSocket):
+    """Transport local en boucle
+
+    Un transport en boucle est toujours créé par paire à l’aide de la méthode
+    paire : ce qui est écrit sur l’un des transports peut être lu sur l’autre.
+    L’un est confié à l’objet Minitel ou à ServeurMinitel, l’autre joue le
+    rôle du Minitel (test, mesure de performances sans matériel…).
+
+    Les deux transports reposent sur une paire de sockets locales, ils
+    disposent donc d’un vrai descripteur de fichier. La fermeture de l’un est
+    signalée à l’autre par une ConnectionError lors de la lecture suivante.
+    """
+    def __init__(self, extremite, nom = 'boucle', timeout = 1):
+        """Constructeur
+
+        Il est préférable d’utiliser la méthode paire qui crée et relie deux
+        transports.
+
+        :param extremite:
+            une extrémité d’une paire de sockets locales
+        :type extremite:
+            un objet socket
+
+        :param nom:
+            nom du transport
+        :type nom:
+            une chaîne de caractères
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+        """
+        assert isinstance(extremite, socket.socket)
+
+        Transport.__init__(self, nom, timeout, False)
+
+        self._socket = extremite
+
+        # Tube permettant d’interrompre une lecture en cours
+        self._reveil = os.pipe()
+
+    @classmethod
+    def paire(cls, timeout = 1):
+        """Crée deux transports en boucle reliés l’un à l’autre
+
+        :param timeout:
+            temps d’attente maximum en secondes lors d’une lecture
+        :type timeout:
+            un entier, un flottant ou None
+
+        :returns:
+            un tuple de deux objets TransportBoucle
+        """
+        premiere, seconde = socket.socketpair()
+
+        return (
+            cls(premiere, 'boucle:0', timeout),
+            cls(seconde, 'boucle:1', timeout)
+        )
+
+def ouvrir(peripherique):
+    """Ouvre le transport correspondant à une désignation de périphérique
+
+    Les désignations reconnues sont les suivantes :
+
+    - tcp://hote:port pour une connexion TCP, une adresse IPv6 devant être
+      placée entre crochets (tcp://[::1]:3615),
+    - tout autre chaîne est considérée comme le chemin d’un port série.
+
+    :param peripherique:
+        désignation du périphérique
+    :type peripherique:
+        une chaîne de caractères
+
+    :returns:
+        un objet Transport
+
+    :raises ValueError:
+        si une adresse TCP n’indique pas d’hôte ou de port valide
+    """
+    assert isinstance(peripherique, str)
+
+    if peripherique.startswith('tcp://'):
+        adresse = urlsplit(peripherique)
+
+        try:
+            port = adresse.port
+        except ValueError:
+            port = None
+
+        if not adresse.hostname or port == None:
+            raise ValueError(
+                'adresse TCP invalide (tcp://hote:port attendu) : '
+                + peripherique
+            )
+
+        return TransportSocket(adresse.hostname, port)
+
+    return TransportSerie(peripherique)
@@ -1,5 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__all__ = ["Minitel", "Sequence"]
+# Enregistre les codecs videotex et minitel-mixte
+from minitel import CodecVideotex
+
+__all__ = ["Minitel", "AsyncMinitel", "Bibliotheque", "CodecVideotex",
+           "Decodeur", "Decoupeur", "Ecran", "Optimiseur", "Page", "Profils",
+           "Protocole", "Sequence", "ServeurMinitel", "Trame", "Transport"]
 
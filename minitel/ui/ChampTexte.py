@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """Classe de gestion de champ texte"""
 
-from .UI import UI
+from .UI import UI, touche
 from ..constantes import (
     GAUCHE, DROITE, CORRECTION, ACCENT_AIGU, ACCENT_GRAVE, ACCENT_CIRCONFLEXE, 
     ACCENT_TREMA, ACCENT_CEDILLE
@@ -71,7 +71,7 @@ class ChampTexte(UI):
         - GAUCHE, DROITE, pour se déplacer dans le champ,
         - CORRECTION, pour supprimer le caractère à gauche du curseur,
         - ACCENT_AIGU, ACCENT_GRAVE, ACCENT_CIRCONFLEXE, ACCENT_TREMA,
-        - ACCENT_CEDILLE,
+          ACCENT_CEDILLE, appliqués au caractère suivant,
         - les caractères de la norme ASCII pouvant être tapés sur un clavier
           de Minitel.
 
@@ -83,50 +83,21 @@ class ChampTexte(UI):
         :returns:
             True si la touche a été gérée par le champ texte, False sinon.
         """
-        if sequence.egale(GAUCHE):
-            self.accent = None
-            self.curseur_gauche()
-            return True        
-        elif sequence.egale(DROITE):
-            self.accent = None
-            self.curseur_droite()
-            return True        
-        elif sequence.egale(CORRECTION):
-            self.accent = None
-            if self.curseur_gauche():
-                self.valeur = (self.valeur[0:self.curseur_x] +
-                               self.valeur[self.curseur_x + 1:])
-                self.affiche()
-            return True        
-        elif (sequence.egale(ACCENT_AIGU) or
-              sequence.egale(ACCENT_GRAVE) or
-              sequence.egale(ACCENT_CIRCONFLEXE) or
-              sequence.egale(ACCENT_TREMA)):
-            self.accent = sequence
+        # Touches déclarées par les méthodes décorées
+        if UI.gere_touche(self, sequence):
             return True
-        elif sequence.egale([ACCENT_CEDILLE, 'c']):
-            self.accent = None
-            self.valeur = (self.valeur[0:self.curseur_x] +
-                           'ç' +
-                           self.valeur[self.curseur_x:])
-            self.curseur_droite()
-            self.affiche()
-            return True
-        elif chr(sequence.valeurs[0]) in CARACTERES_MINITEL:
-            caractere = '' + chr(sequence.valeurs[0])
-            if self.accent != None:
-                if caractere in 'aeiou':
-                    if self.accent.egale(ACCENT_AIGU):
-                        caractere = 'áéíóú'['aeiou'.index(caractere)]
-                    elif self.accent.egale(ACCENT_GRAVE):
-                        caractere = 'àèìòù'['aeiou'.index(caractere)]
-                    elif self.accent.egale(ACCENT_CIRCONFLEXE):
-                        caractere = 'âêîôû'['aeiou'.index(caractere)]
-                    elif self.accent.egale(ACCENT_TREMA):
-                        caractere = 'äëïöü'['aeiou'.index(caractere)]
 
+        if chr(sequence.valeurs[0]) in CARACTERES_MINITEL:
+            octets = bytes(sequence.valeurs)
+
+            # L’accent en attente est composé avec le caractère par le codec
+            # videotex
+            if self.accent != None:
+                octets = bytes(self.accent.valeurs) + octets
                 self.accent = None
 
+            caractere = octets.decode('videotex', 'ignore')
+
             self.valeur = (self.valeur[0:self.curseur_x] +
                            caractere +
                            self.valeur[self.curseur_x:])
@@ -136,6 +107,37 @@ class ChampTexte(UI):
 
         return False
 
+    @touche(GAUCHE)
+    def gere_gauche(self, sequence):
+        """Déplace le curseur vers la gauche (touche GAUCHE)"""
+        self.accent = None
+        self.curseur_gauche()
+        return True
+
+    @touche(DROITE)
+    def gere_droite(self, sequence):
+        """Déplace le curseur vers la droite (touche DROITE)"""
+        self.accent = None
+        self.curseur_droite()
+        return True
+
+    @touche(CORRECTION)
+    def gere_correction(self, sequence):
+        """Supprime le caractère à gauche du curseur (touche CORRECTION)"""
+        self.accent = None
+        if self.curseur_gauche():
+            self.valeur = (self.valeur[0:self.curseur_x] +
+                           self.valeur[self.curseur_x + 1:])
+            self.affiche()
+        return True
+
+    @touche(ACCENT_AIGU, ACCENT_GRAVE, ACCENT_CIRCONFLEXE, ACCENT_TREMA,
+            ACCENT_CEDILLE)
+    def gere_accent(self, sequence):
+        """Mémorise l’accent à appliquer sur le prochain caractère"""
+        self.accent = sequence
+        return True
+
     def curseur_gauche(self):
         """Déplace le curseur d’un caractère sur la gauche
 
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """Classe permettant de regrouper des éléments d’interface utilisateur"""
 
-from .UI import UI
+from .UI import UI, touche
 from ..Sequence import Sequence
 from ..constantes import ENTREE, MAJ_ENTREE
 
@@ -120,23 +120,24 @@ class Conteneur(UI):
 
         # Si l’élément actif n’a pas traité la séquence, regarde si le
         # conteneur peut la traiter
+        return UI.gere_touche(self, sequence)
+
+    @touche(ENTREE)
+    def gere_entree(self, sequence):
+        """Passe à l’élément suivant (touche ENTREE)"""
+        self.element_actif.gere_depart()
+        self.suivant()
+        self.element_actif.gere_arrivee()
+        return True
+
+    @touche(MAJ_ENTREE)
+    def gere_maj_entree(self, sequence):
+        """Passe à l’élément précédent (touches MAJ ENTREE)"""
+        self.element_actif.gere_depart()
+        self.precedent()
+        self.element_actif.gere_arrivee()
+        return True
 
-        # La touche entrée permet de passer au champ suivant
-        if sequence.egale(ENTREE):
-            self.element_actif.gere_depart()
-            self.suivant()
-            self.element_actif.gere_arrivee()
-            return True
-
-        # La combinaison Majuscule + entrée permet de passer au champ précédent
-        if sequence.egale(MAJ_ENTREE):
-            self.element_actif.gere_depart()
-            self.precedent()
-            self.element_actif.gere_arrivee()
-            return True
-
-        return False
-            
     def affiche(self):
         """Affichage du conteneur et de ses éléments
 
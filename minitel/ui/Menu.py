@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """Classe de gestion de menu"""
-from .UI import UI
+from .UI import UI, touche
 from ..constantes import HAUT, BAS
 from ..Sequence import Sequence
 
@@ -66,7 +66,7 @@ class Menu(UI):
 
         Cette méthode est appelée automatiquement par la méthode executer.
 
-        Les touches gérées par la classe ChampTexte sont HAUT et BAS pour se
+        Les touches gérées par la classe Menu sont HAUT et BAS pour se
         déplacer dans le menu.
 
         Un bip est émis si on appuie sur la touche HAUT (respectivement BAS)
@@ -79,29 +79,33 @@ class Menu(UI):
             un objet Sequence
 
         :returns:
-            True si la touche a été gérée par le champ texte, False sinon.
+            True si la touche a été gérée par le menu, False sinon.
         """
         assert isinstance(sequence, Sequence)
 
-        if sequence.egale(HAUT):
-            selection = self.option_precedente(self.selection)
-            if selection == None:
-                self.minitel.bip()
-            else:
-                self.change_selection(selection)
+        return UI.gere_touche(self, sequence)
 
-            return True
+    @touche(HAUT)
+    def gere_haut(self, sequence):
+        """Sélectionne l’option précédente (touche HAUT)"""
+        selection = self.option_precedente(self.selection)
+        if selection == None:
+            self.minitel.bip()
+        else:
+            self.change_selection(selection)
 
-        if sequence.egale(BAS):
-            selection = self.option_suivante(self.selection)
-            if selection == None:
-                self.minitel.bip()
-            else:
-                self.change_selection(selection)
+        return True
 
-            return True
+    @touche(BAS)
+    def gere_bas(self, sequence):
+        """Sélectionne l’option suivante (touche BAS)"""
+        selection = self.option_suivante(self.selection)
+        if selection == None:
+            self.minitel.bip()
+        else:
+            self.change_selection(selection)
 
-        return False
+        return True
 
     def affiche(self):
         """Affiche le menu complet"""
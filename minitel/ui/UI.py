@@ -2,7 +2,32 @@
 # -*- coding: utf-8 -*-
 """Base pour la création d’une interface utilisateur pour le Minitel"""
 
-from ..Minitel import Minitel,Empty
+from ..Minitel import MinitelBase, Empty
+from ..Sequence import Sequence
+
+def touche(*sequences):
+    """Associe des touches à une méthode de gestion
+
+    Ce décorateur déclare les séquences clavier traitées par une méthode d’un
+    élément d’interface. La méthode reçoit la séquence en paramètre et
+    retourne True si elle l’a prise en charge, False sinon. Exemple ::
+
+        class Liste(UI):
+            @touche(HAUT)
+            def gere_haut(self, sequence):
+                ...
+                return True
+
+    :param sequences:
+        les séquences associées à la méthode
+    :type sequences:
+        des objets Sequence, des listes, des entiers ou des chaînes
+    """
+    def associer(methode):
+        methode.sequences_touche = [Sequence(sequence) for sequence in sequences]
+        return methode
+
+    return associer
 
 class UI:
     """Classe de base pour la création d’élément d’interface utilisateur
@@ -27,7 +52,25 @@ class UI:
     - gere_arrivee : gestion de l’activation de l’élément
     - gere_depart : gestion de la désactivation de l’élément
 
+    Les touches gérées par un élément sont déclarées en décorant ses méthodes
+    avec touche. La table touches de chaque classe, qui associe chaque
+    séquence au nom de sa méthode, est construite une fois pour toutes à la
+    création de la classe et complète celle de la classe parente.
     """
+    # Touches gérées par la classe : séquence → nom de la méthode
+    touches = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """Construit la table des touches d’une classe dérivée"""
+        super().__init_subclass__(**kwargs)
+
+        touches = dict(cls.touches)
+        for nom, methode in vars(cls).items():
+            for sequence in getattr(methode, 'sequences_touche', []):
+                touches[sequence] = nom
+
+        cls.touches = touches
+
     def __init__(self, minitel, posx, posy, largeur, hauteur, couleur):
         """Constructeur
 
@@ -35,7 +78,7 @@ class UI:
             L’objet auquel envoyer les commandes et recevoir les appuis de
             touche.
         :type minitel:
-            un objet Minitel
+            un objet Minitel ou tout objet dérivé de MinitelBase
 
         :param posx:
             Coordonnée x de l’élément
@@ -62,7 +105,7 @@ class UI:
         :type couleur:
             un entier ou une chaîne de caractères
         """
-        assert isinstance(minitel, Minitel)
+        assert isinstance(minitel, MinitelBase)
         assert posx > 0 and posx <= 80
         assert posy > 0 and posy <= 24
         assert largeur > 0 and largeur + posx - 1 <= 80
@@ -116,18 +159,15 @@ class UI:
             self.minitel.position(self.posx, ligne)
             self.minitel.repeter(' ', self.largeur)
 
-    # Désactive un faux positif. Il est normal que cette méthode n’utilise
-    # pas l’argument sequence et qu’elle soit une méthode plutôt qu’une
-    # fonction
-    # pylint: disable-msg=W0613,R0201
     def gere_touche(self, sequence):
         """Gère une touche
 
         Cette méthode est appelée automatiquement par la méthode executer dès
         qu’une séquence est disponible au traitement.
 
-        Pour tout élément interactif, cette méthode doit être surchargée car
-        elle ne traite aucune touche par défaut et renvoie donc False.
+        Par défaut, la séquence est recherchée dans la table touches de la
+        classe et confiée à la méthode correspondante. Si aucune méthode n’y
+        est associée, False est renvoyé.
 
         :param sequence:
             la séquence de caractères en provenance du Minitel que l’élément
@@ -140,7 +180,12 @@ class UI:
             l’élément (True) ou si l’élément n’a pas pu traitée la touche
             (False).
         """
-        return False
+        methode = self.touches.get(sequence)
+
+        if methode == None:
+            return False
+
+        return getattr(self, methode)(sequence)
 
     def gere_arrivee(self):
         """Gère l’activation de l’élément
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications de la classe AsyncMinitel à l’aide d’un serveur TCP local
+jouant le rôle du Minitel"""
+
+import asyncio
+import unittest
+from queue import Empty
+
+from minitel.AsyncMinitel import AsyncMinitel
+from minitel.Minitel import VITESSES_CONNUES
+from minitel.Optimiseur import Compresseur
+
+# Acquittement d’une demande de statut terminal
+STATUT_TERMINAL = b'\x1b\x3a\x71\x40'
+
+class TestAsyncMinitel(unittest.TestCase):
+    def executer(self, session, minitel_distant):
+        """Exécute une session face à un Minitel simulé
+
+        :param session:
+            coroutine recevant l’objet AsyncMinitel
+        :param minitel_distant:
+            coroutine recevant les flux du côté du Minitel
+        """
+        async def principal():
+            serveur = await asyncio.start_server(minitel_distant,
+                                                 '127.0.0.1', 0)
+            port = serveur.sockets[0].getsockname()[1]
+
+            try:
+                minitel = await AsyncMinitel.connecter('127.0.0.1', port)
+                try:
+                    return await session(minitel)
+                finally:
+                    await minitel.close()
+            finally:
+                serveur.close()
+                await serveur.wait_closed()
+
+        return asyncio.run(principal())
+
+    def test_envoi_compresse(self):
+        recus = []
+
+        async def distant(lecteur, ecrivain):
+            recus.append(await lecteur.readexactly(3))
+            ecrivain.close()
+
+        async def session(minitel):
+            minitel.compresseur = Compresseur()
+            minitel.envoyer('a' * 10)
+            await minitel.vider()
+            await asyncio.sleep(0.1)
+
+        self.executer(session, distant)
+
+        self.assertEqual(recus, [b'a\x12\x49'])
+
+    def test_deviner_vitesse(self):
+        async def distant(lecteur, ecrivain):
+            ecrivain.write(b'ab')
+            await lecteur.readexactly(3)
+            ecrivain.write(STATUT_TERMINAL)
+            await ecrivain.drain()
+            await lecteur.read(1)
+            ecrivain.close()
+
+        async def session(minitel):
+            premiere = await minitel.recevoir_sequence(1)
+
+            # La séquence déjà découpée mais non lue est oubliée comme tout
+            # ce qui a été reçu avant ou pendant la détection
+            vitesse = await minitel.deviner_vitesse()
+
+            with self.assertRaises(Empty):
+                await minitel.recevoir_sequence(0.2)
+
+            connue = VITESSES_CONNUES.pop(minitel.nom, None)
+
+            return bytes(premiere.valeurs), vitesse, connue
+
+        self.assertEqual(self.executer(session, distant), (b'a', 9600, 9600))
+
+    def test_connexion_fermee(self):
+        # La fermeture de la connexion se distingue d’un simple délai dépassé
+        async def distant(lecteur, ecrivain):
+            ecrivain.write(b'a\x1b')
+            await ecrivain.drain()
+            ecrivain.close()
+
+        async def session(minitel):
+            minitel.decodeur.attente_esc = 0.05
+            sequences = [
+                bytes((await minitel.recevoir_sequence(1)).valeurs),
+                bytes((await minitel.recevoir_sequence(1)).valeurs),
+            ]
+
+            with self.assertRaises(ConnectionError):
+                await minitel.recevoir_sequence(1)
+
+            with self.assertRaises(ConnectionError):
+                await minitel.recevoir(1)
+
+            retour = await minitel.appeler([0x1b, 0x39, 0x70], 4, delai = 1)
+
+            return sequences, retour.longueur
+
+        self.assertEqual(self.executer(session, distant), ([b'a', b'\x1b'], 0))
+
+if __name__ == '__main__':
+    unittest.main()
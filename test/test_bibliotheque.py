@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Bibliotheque"""
+
+import os
+import tempfile
+import unittest
+
+from minitel.Bibliotheque import Bibliotheque, assembler, pages_vdt
+from minitel.Page import CaptureMinitel
+
+PAGES = {
+    'accueil': b'\x0c\x1f\x41\x41Bonjour',
+    'aide': b'\x0c' + bytes(range(0x20, 0x7f)) * 10,
+    'vide': b'',
+    'été': b'\x19\x42e',
+}
+
+class TestBibliotheque(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.chemin = os.path.join(self.dossier.name, 'pages.bib')
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_aller_retour(self):
+        assembler(self.chemin, PAGES)
+        bibliotheque = Bibliotheque(self.chemin)
+
+        self.assertEqual(len(bibliotheque), len(PAGES))
+        self.assertEqual(sorted(bibliotheque.noms()), sorted(PAGES))
+
+        for nom, octets in PAGES.items():
+            page = bibliotheque.page(nom)
+            self.assertTrue(page.readonly)
+            self.assertEqual(bytes(page), octets)
+            page.release()
+
+        self.assertNotIn('absente', bibliotheque)
+        with self.assertRaises(KeyError):
+            bibliotheque.page('absente')
+
+        bibliotheque.fermer()
+
+    def test_pages_vdt(self):
+        for nom, octets in PAGES.items():
+            with open(os.path.join(self.dossier.name, nom + '.vdt'),
+                      'wb') as fichier:
+                fichier.write(octets)
+
+        assembler(self.chemin, pages_vdt(self.dossier.name))
+        bibliotheque = Bibliotheque(self.chemin)
+
+        self.assertEqual(sorted(bibliotheque.noms()), sorted(PAGES))
+        bibliotheque.fermer()
+
+    def test_afficher(self):
+        assembler(self.chemin, PAGES)
+        bibliotheque = Bibliotheque(self.chemin)
+        capture = CaptureMinitel()
+
+        bibliotheque.afficher(capture, 'accueil')
+
+        self.assertEqual(capture.page().octets(), PAGES['accueil'])
+        bibliotheque.fermer()
+
+    def test_fermeture_avec_vue(self):
+        assembler(self.chemin, PAGES)
+        bibliotheque = Bibliotheque(self.chemin)
+        page = bibliotheque.page('aide')
+
+        with self.assertRaises(BufferError):
+            bibliotheque.fermer()
+
+        # La bibliothèque reste utilisable
+        self.assertEqual(bytes(bibliotheque.page('vide')), b'')
+
+        page.release()
+        bibliotheque.fermer()
+
+    def test_doublon(self):
+        with self.assertRaises(ValueError):
+            assembler(self.chemin, [('a', b'1'), ('a', b'2')])
+
+        self.assertEqual(os.listdir(self.dossier.name), [])
+
+    def test_fichier_invalide(self):
+        assembler(self.chemin, PAGES)
+
+        with open(self.chemin, 'r+b') as fichier:
+            fichier.truncate(os.path.getsize(self.chemin) - 1)
+
+        with self.assertRaises(ValueError):
+            Bibliotheque(self.chemin)
+
+        with open(self.chemin, 'wb') as fichier:
+            fichier.write(b'pas une bibliotheque' * 4)
+
+        with self.assertRaises(ValueError):
+            Bibliotheque(self.chemin)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module CodecVideotex"""
+
+import codecs
+import random
+import unittest
+
+import minitel.CodecVideotex # Enregistre les codecs
+from minitel.Sequence import Sequence
+
+# Textes composés de caractères ayant un équivalent dans chaque standard
+TEXTES = {
+    'videotex': 'Opéra à 5 £, Noël à Ébène : ç ô ù ß œ Œ °±¼½¾ ←↑→↓',
+    'minitel-mixte': 'Opéra à 5 £ : ç ù',
+}
+
+class TestCodecVideotex(unittest.TestCase):
+    def test_aller_retour(self):
+        for codec, texte in TEXTES.items():
+            self.assertEqual(texte.encode(codec).decode(codec), texte)
+
+    def test_comme_sequence(self):
+        texte = TEXTES['videotex']
+
+        self.assertEqual(texte.encode('videotex'),
+                         bytes(Sequence(texte).valeurs))
+
+    def test_decoupage_indifferent(self):
+        hasard = random.Random(6)
+
+        for codec, texte in TEXTES.items():
+            octets = texte.encode(codec)
+
+            for _ in range(100):
+                decodeur = codecs.getincrementaldecoder(codec)()
+                morceaux = []
+                debut = 0
+                while debut < len(octets):
+                    fin = debut + hasard.randint(1, 3)
+                    morceaux.append(decodeur.decode(octets[debut:fin]))
+                    debut = fin
+
+                morceaux.append(decodeur.decode(b'', True))
+
+                self.assertEqual(''.join(morceaux), texte)
+
+    def test_accent_sans_lettre_accentuee(self):
+        # Le Minitel ignore un accent qu’il ne peut pas placer
+        self.assertEqual(b'\x19\x41q'.decode('videotex'), 'q')
+
+    def test_erreurs(self):
+        with self.assertRaises(UnicodeDecodeError):
+            b'a\x19\x7fb'.decode('videotex')
+
+        self.assertEqual(b'a\x19\x7fb'.decode('videotex', 'replace'),
+                         'a�b')
+        self.assertEqual(b'a\x19\x7fb'.decode('videotex', 'ignore'), 'ab')
+
+    def test_sequence_incomplete(self):
+        decodeur = codecs.getincrementaldecoder('videotex')()
+
+        self.assertEqual(decodeur.decode(b'a\x19\x42'), 'a')
+        self.assertEqual(decodeur.decode(b'e'), 'é')
+
+        with self.assertRaises(UnicodeDecodeError):
+            decodeur.decode(b'\x19', True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Decodeur"""
+
+import random
+import unittest
+
+from minitel.Decodeur import Decodeur
+
+# Touches simples, accent, touche de fonction, touches du curseur et CSI
+# longs, ESC suivi d’un caractère
+FLUX = b'ab\x19\x42e\x13\x41\x1b[A\x1b[2P\x1b[4hc\x1bxd\x13\x46'
+
+ATTENDU = [b'a', b'b', b'\x19\x42', b'e', b'\x13\x41', b'\x1b[A',
+           b'\x1b[2P', b'\x1b[4h', b'c', b'\x1bx', b'd', b'\x13\x46']
+
+def valeurs(sequences):
+    """Retourne les octets de chaque séquence"""
+    return [bytes(sequence.valeurs) for sequence in sequences]
+
+class TestDecodeur(unittest.TestCase):
+    def test_decoupage(self):
+        self.assertEqual(valeurs(Decodeur().decoder(FLUX, 0)), ATTENDU)
+
+    def test_decoupage_indifferent(self):
+        hasard = random.Random(4)
+
+        for _ in range(200):
+            decodeur = Decodeur()
+            sequences = []
+            debut = 0
+            while debut < len(FLUX):
+                fin = debut + hasard.randint(1, 4)
+                sequences += decodeur.decoder(FLUX[debut:fin], 0)
+                debut = fin
+
+            self.assertEqual(valeurs(sequences), ATTENDU)
+
+    def test_esc_isole(self):
+        decodeur = Decodeur(attente_esc = 0.1)
+
+        self.assertEqual(valeurs(decodeur.decoder(b'a\x1b', 10)), [b'a'])
+        self.assertEqual(decodeur.echeance, 10.1)
+        self.assertEqual(decodeur.expirer(10.05), [])
+        self.assertEqual(valeurs(decodeur.expirer(10.1)), [b'\x1b'])
+        self.assertEqual(decodeur.echeance, None)
+
+    def test_esc_complete_avant_echeance(self):
+        decodeur = Decodeur(attente_esc = 0.1)
+        decodeur.decoder(b'\x1b', 10)
+
+        self.assertEqual(valeurs(decodeur.decoder(b'[C', 10.05)), [b'\x1b[C'])
+        self.assertEqual(decodeur.echeance, None)
+
+    def test_extraire(self):
+        decodeur = Decodeur()
+        decodeur.decoder(b'\x1b[2', 0)
+
+        self.assertEqual(decodeur.extraire(), b'\x1b[2')
+        self.assertEqual(decodeur.extraire(), b'')
+
+if __name__ == '__main__':
+    unittest.main()
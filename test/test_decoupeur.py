@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Decoupeur"""
+
+import random
+import unittest
+
+from minitel.Decoupeur import (Decoupeur, CARACTERE, REPETITION, ATTRIBUT,
+    POSITION, DEPLACEMENT, PAGE, DEFINITION, CONTROLE)
+
+# Une commande de chaque nature, dont des commandes de longueur variable
+FLUX = (
+    b'\x0c' b'a' b'\x19\x42e' b'\x19\x23' b'\x12\x43' b'\x1bA' b'\x1b\x5d'
+    b'\x1f\x41\x41' b'\x1e' b'\x0a\x08' b'\x1b[2J' b'\x1b[12;4H'
+    b'\x1b\x3a\x6a\x43' b'\x1b\x28\x20\x42' b'\x14'
+    b'\x1f\x23\x20\x20\x20\x20\x20\x20' b'\x1f\x41\x41' b'z'
+)
+
+ATTENDU = [
+    (PAGE, b'\x0c'), (CARACTERE, b'a'), (CARACTERE, b'\x19\x42e'),
+    (CARACTERE, b'\x19\x23'), (REPETITION, b'\x12\x43'),
+    (ATTRIBUT, b'\x1bA'), (ATTRIBUT, b'\x1b\x5d'),
+    (POSITION, b'\x1f\x41\x41'), (POSITION, b'\x1e'),
+    (DEPLACEMENT, b'\x0a'), (DEPLACEMENT, b'\x08'),
+    (CONTROLE, b'\x1b[2J'), (CONTROLE, b'\x1b[12;4H'),
+    (CONTROLE, b'\x1b\x3a\x6a\x43'), (CONTROLE, b'\x1b\x28\x20\x42'),
+    (CONTROLE, b'\x14'),
+    (DEFINITION, b'\x1f\x23\x20'), (DEFINITION, b'\x20' * 5),
+    (POSITION, b'\x1f\x41\x41'), (CARACTERE, b'z'),
+]
+
+def regrouper(commandes):
+    """Réunit les morceaux consécutifs d’une définition de caractères, dont
+    le découpage dépend de celui des octets"""
+    resultat = []
+    for nature, octets in commandes:
+        if nature == DEFINITION and len(resultat) > 0 and \
+           resultat[-1][0] == DEFINITION and \
+           not octets.startswith(b'\x1f\x23'):
+            resultat[-1] = (DEFINITION, resultat[-1][1] + octets)
+        else:
+            resultat.append((nature, octets))
+
+    return resultat
+
+class TestDecoupeur(unittest.TestCase):
+    def test_natures(self):
+        decoupeur = Decoupeur()
+
+        self.assertEqual(decoupeur.decouper(FLUX), ATTENDU)
+        self.assertFalse(decoupeur.definition)
+        self.assertEqual(decoupeur.extraire(), b'')
+
+    def test_decoupage_indifferent(self):
+        hasard = random.Random(7)
+
+        for _ in range(200):
+            decoupeur = Decoupeur()
+            commandes = []
+            debut = 0
+            while debut < len(FLUX):
+                fin = debut + hasard.randint(1, 5)
+                commandes += decoupeur.decouper(FLUX[debut:fin])
+                debut = fin
+
+            self.assertEqual(regrouper(commandes), regrouper(ATTENDU))
+
+    def test_commande_incomplete(self):
+        decoupeur = Decoupeur()
+
+        self.assertEqual(decoupeur.decouper(b'a\x1b[1'), [(CARACTERE, b'a')])
+        self.assertEqual(decoupeur.extraire(), b'\x1b[1')
+        self.assertEqual(decoupeur.decouper(b'H'), [(CARACTERE, b'H')])
+
+    def test_vue_memoire(self):
+        self.assertEqual(Decoupeur().decouper(memoryview(FLUX)), ATTENDU)
+
+if __name__ == '__main__':
+    unittest.main()
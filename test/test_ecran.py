@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Ecran"""
+
+import random
+import threading
+import unittest
+
+from minitel.Ecran import Ecran, CASE_VIDE
+from minitel.Sequence import Sequence
+
+# Flux affichant du texte en plusieurs endroits de l’écran
+FLUX = (
+    b'\x0c\x1f\x43\x45\x1bBBonjour\x1f\x45\x41' + b'-' + b'\x12\x67' +
+    bytes(Sequence('Été')) + b'\x0a\x0d\x1b\x4dX\x1f\x40\x41statut\x0a' +
+    b'\x08\x08\x1b\x5dinverse'
+)
+
+def etat(ecran):
+    """Retourne tout ce que le modèle sait de l’écran"""
+    return (ecran.grille, ecran.ligne, ecran.colonne, ecran.attributs,
+            ecran.jeu)
+
+class TestEcran(unittest.TestCase):
+    def test_texte(self):
+        ecran = Ecran()
+        ecran.traiter(b'\x0c\x1f\x43\x45\x1bBab')
+
+        self.assertEqual((ecran.ligne, ecran.colonne), (3, 7))
+        self.assertEqual(ecran.case(5, 3)[:3], (b'a', 0x42, 0x50))
+        self.assertEqual(ecran.case(1, 1), CASE_VIDE)
+
+    def test_repetition(self):
+        ecran = Ecran()
+        ecran.traiter(b'\x0cx\x12\x44')
+
+        self.assertEqual(ecran.colonne, 6)
+        self.assertEqual(ecran.case(5, 1)[0], b'x')
+
+    def test_inconnu_au_depart(self):
+        ecran = Ecran()
+
+        self.assertEqual(ecran.ligne, None)
+        self.assertEqual(ecran.case(1, 1), None)
+        self.assertFalse(ecran.inutile(b'\x1bG'))
+
+    def test_inutile(self):
+        ecran = Ecran()
+        ecran.traiter(b'\x0c\x1bA')
+
+        self.assertTrue(ecran.inutile(b'\x1bA'))
+        self.assertFalse(ecran.inutile(b'\x1bB'))
+        self.assertFalse(ecran.inutile(b'\x1e'))
+
+    def test_saisie(self):
+        ecran = Ecran()
+        ecran.traiter(b'\x0c')
+        ecran.saisie(b'a')
+
+        self.assertEqual(ecran.ligne, None)
+
+        ecran.traiter(b'\x0c')
+        ecran.echo = False
+        ecran.saisie(b'a')
+
+        self.assertEqual(ecran.ligne, 1)
+
+    def test_planifier(self):
+        ecran = Ecran()
+        ecran.traiter(b'\x0c\x1f\x45\x45')
+
+        self.assertEqual(ecran.planifier(1, 5), b'\x0d')
+        self.assertEqual(ecran.planifier(5, 6), b'\x0a')
+        self.assertEqual(ecran.planifier(5, 5), b'')
+
+    def test_decoupage_indifferent(self):
+        attendu = Ecran()
+        attendu.traiter(FLUX)
+        hasard = random.Random(3)
+
+        for _ in range(100):
+            ecran = Ecran()
+            debut = 0
+            while debut < len(FLUX):
+                fin = debut + hasard.randint(1, 5)
+                ecran.traiter(FLUX[debut:fin])
+                debut = fin
+
+            self.assertEqual(etat(ecran), etat(attendu))
+
+    def test_invalidation_concurrente(self):
+        # Le thread de réception d’un Minitel invalide le modèle pendant que
+        # l’application lui transmet ce qu’elle envoie
+        ecran = Ecran()
+        fin = threading.Event()
+        erreurs = []
+
+        def invalider():
+            while not fin.is_set():
+                ecran.saisie(b'a')
+
+        thread = threading.Thread(target = invalider)
+        thread.start()
+
+        try:
+            for _ in range(2000):
+                ecran.traiter(b'\x0c\x1f\x43\x45abc\x0a\x08d\x12\x43')
+                ecran.planifier(3, 4)
+                ecran.inutile(b'\x1bA')
+        except Exception as erreur:
+            erreurs.append(erreur)
+        finally:
+            fin.set()
+            thread.join()
+
+        self.assertEqual(erreurs, [])
+
+if __name__ == '__main__':
+    unittest.main()
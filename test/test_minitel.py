@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications de la classe Minitel à l’aide de transports en boucle ou
+de sockets locales"""
+
+import socket
+import threading
+import time
+import unittest
+
+from queue import Empty
+from select import select
+
+from minitel.Minitel import Minitel, MinitelBase, VITESSES_CONNUES
+from minitel.Optimiseur import Compresseur, Optimiseur
+from minitel.Transport import (Transport, TransportBoucle, TransportSocket,
+                               ouvrir)
+
+class TestMinitel(unittest.TestCase):
+    def test_envoi_reception(self):
+        local, distant = TransportBoucle.paire()
+        minitel = Minitel(local)
+
+        try:
+            minitel.envoyer('abc')
+            minitel.sortie.join()
+            self.assertEqual(distant.read(10), b'abc')
+
+            distant.write(b'\x13\x41x')
+            self.assertEqual(
+                bytes(minitel.recevoir_sequence(attente = 2).valeurs),
+                b'\x13\x41'
+            )
+            self.assertEqual(minitel.recevoir(True, 2), 'x')
+        finally:
+            minitel.close()
+
+    def test_attente_totale(self):
+        # Une séquence arrivant au compte-gouttes ne prolonge pas l’attente
+        local, distant = TransportBoucle.paire()
+        minitel = Minitel(local)
+        arret = threading.Event()
+
+        def goutte_a_goutte():
+            for octets in [b'\x1b[', b'2', b'A']:
+                if arret.wait(0.4):
+                    return
+
+                distant.write(octets)
+
+        thread = threading.Thread(target = goutte_a_goutte)
+        thread.start()
+
+        try:
+            with self.assertRaises(Empty):
+                minitel.recevoir_sequence(attente = 1)
+
+            # Les caractères reçus entre-temps sont conservés
+            self.assertEqual(
+                bytes(minitel.recevoir_sequence(attente = 2).valeurs),
+                b'\x1b[2A'
+            )
+        finally:
+            arret.set()
+            thread.join()
+            minitel.close()
+
+    def test_sans_attente_esc_isole(self):
+        # bloque = False rend la main même si un ESC isolé est en attente
+        local, distant = TransportBoucle.paire()
+        minitel = Minitel(local)
+        minitel.decodeur.attente_esc = 2
+
+        try:
+            distant.write(b'\x1b')
+            while minitel.entree.empty():
+                time.sleep(0.01)
+
+            debut = time.monotonic()
+            with self.assertRaises(Empty):
+                minitel.recevoir_sequence(bloque = False)
+
+            self.assertLess(time.monotonic() - debut, 0.5)
+            self.assertEqual(
+                bytes(minitel.recevoir_sequence(attente = 3).valeurs),
+                b'\x1b'
+            )
+        finally:
+            minitel.close()
+
+    def test_compression_videotex_seulement(self):
+        # En mode mixte, DC2 n’est pas la commande REP
+        local, distant = TransportBoucle.paire()
+        minitel = Minitel(local)
+        minitel.compresseur = Compresseur()
+        minitel.optimiseur = Optimiseur()
+
+        try:
+            minitel.mode = 'MIXTE'
+            minitel.envoyer('a' * 5 + '\x1f\x41\x41\x1f\x42\x42')
+            minitel.sortie.join()
+            self.assertEqual(distant.read(20),
+                             b'aaaaa\x1f\x41\x41\x1f\x42\x42')
+
+            minitel.mode = 'VIDEOTEX'
+            minitel.envoyer('a' * 5 + '\x1f\x41\x41\x1f\x42\x42')
+            minitel.sortie.join()
+            self.assertEqual(distant.read(20), b'a\x12\x44\x1f\x42\x42')
+        finally:
+            minitel.close()
+
+    def test_connexion_fermee(self):
+        # La fermeture de la connexion par l’autre extrémité réveille les
+        # appels en attente au lieu de les bloquer indéfiniment
+        serveur = socket.socket()
+        serveur.bind(('127.0.0.1', 0))
+        serveur.listen(1)
+
+        minitel = Minitel('tcp://127.0.0.1:%d' % serveur.getsockname()[1])
+        connexion, _ = serveur.accept()
+        serveur.close()
+
+        try:
+            connexion.sendall(b'a')
+            connexion.close()
+
+            self.assertEqual(minitel.recevoir(True, 5), 'a')
+
+            with self.assertRaises(ConnectionError):
+                minitel.recevoir(True, 5)
+
+            with self.assertRaises(ConnectionError):
+                minitel.recevoir_sequence(True, 5)
+
+            self.assertFalse(minitel.connecte)
+
+            minitel.envoyer('perdu')
+            minitel.sortie.join()
+        finally:
+            minitel.close()
+
+    def test_vitesse_connexion_acceptee(self):
+        # Le nom d’une connexion acceptée contient le port éphémère du
+        # client : sa vitesse ne doit pas être mémorisée
+        serveur = socket.socket()
+        serveur.bind(('127.0.0.1', 0))
+        serveur.listen(1)
+
+        client = socket.create_connection(serveur.getsockname())
+        connexion, _ = serveur.accept()
+        serveur.close()
+
+        transport = TransportSocket(connexion)
+        self.assertFalse(transport.stable)
+
+        def repondre():
+            client.recv(10)
+            client.sendall(b'\x1b\x3a\x71\x40')
+
+        repondeur = threading.Thread(target = repondre)
+        repondeur.start()
+
+        connues = dict(VITESSES_CONNUES)
+        minitel = Minitel(transport)
+
+        try:
+            self.assertEqual(minitel.deviner_vitesse(), 9600)
+            self.assertEqual(VITESSES_CONNUES, connues)
+        finally:
+            repondeur.join()
+            minitel.close()
+            client.close()
+
+class TestClassesDeBase(unittest.TestCase):
+    def test_envoyer_obligatoire(self):
+        class Incomplet(MinitelBase):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplet()
+
+    def test_transport_incomplet(self):
+        class Incomplet(Transport):
+            def read(self, taille = 1):
+                return b''
+
+            def write(self, donnees):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplet('incomplet')
+
+class TestTransport(unittest.TestCase):
+    def test_boucle_selectionnable(self):
+        local, distant = TransportBoucle.paire(timeout = 0)
+
+        try:
+            self.assertEqual(select([local], [], [], 0)[0], [])
+            distant.write(b'abc')
+            self.assertEqual(select([local], [], [], 1)[0], [local])
+            self.assertEqual(local.in_waiting, 3)
+            self.assertEqual(local.read(10), b'abc')
+        finally:
+            local.close()
+            distant.close()
+
+    def test_ouvrir_adresse_invalide(self):
+        for adresse in ['tcp://hote', 'tcp://hote:abc', 'tcp://:3615']:
+            with self.assertRaises(ValueError):
+                ouvrir(adresse)
+
+    def test_ouvrir_ipv6(self):
+        try:
+            ecoute = socket.socket(socket.AF_INET6)
+            ecoute.bind(('::1', 0))
+        except OSError:
+            self.skipTest('IPv6 indisponible')
+
+        ecoute.listen()
+
+        try:
+            transport = ouvrir('tcp://[::1]:%d' % ecoute.getsockname()[1])
+            self.assertEqual(
+                transport.nom, 'tcp://[::1]:%d' % ecoute.getsockname()[1]
+            )
+            transport.close()
+        finally:
+            ecoute.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Optimiseur"""
+
+import random
+import unittest
+
+from minitel.Decoupeur import Decoupeur, CARACTERE, REPETITION
+from minitel.Optimiseur import (Optimiseur, Compresseur,
+    compresser_repetitions)
+from minitel.Sequence import Sequence
+
+from minitel.constantes import REP
+
+# Flux mêlant texte, répétitions, attributs, positionnements, commandes CSI,
+# caractères accentués et définition de caractères
+FLUX = (
+    b'\x0c' + b'a' * 70 + b'\x1bA' + b'-' * 5 + b'\x1f\x41\x41' +
+    b'\x1b[2J' + bytes(Sequence('été ééé')) + b'\x1b\x3a\x69\x43' +
+    b'\x1f\x23\x20\x20\x20\x20\x20\x20\x1f\x41\x41' + b'x' * 130 + b'\x12\x43'
+)
+
+def decouper_hasard(octets, hasard):
+    """Découpe des octets en morceaux de tailles aléatoires"""
+    morceaux = []
+    while len(octets) > 0:
+        taille = hasard.randint(1, 6)
+        morceaux.append(octets[:taille])
+        octets = octets[taille:]
+
+    return morceaux
+
+def developper(octets):
+    """Remplace les commandes REP par les caractères qu’elles répètent"""
+    sortie = bytearray()
+    dernier = b''
+    for nature, commande in Decoupeur().decouper(octets):
+        if nature == REPETITION:
+            sortie += dernier * (commande[1] - 0x40)
+            continue
+
+        if nature == CARACTERE:
+            dernier = commande
+
+        sortie += commande
+
+    return bytes(sortie)
+
+class TestCompresseur(unittest.TestCase):
+    def test_suite(self):
+        self.assertEqual(
+            Compresseur().compresser(b'A' * 100),
+            b'A' + bytes([REP, 0x40 + 63, REP, 0x40 + 36])
+        )
+
+    def test_courtes_suites(self):
+        self.assertEqual(Compresseur().compresser(b'AAAB'), b'AAAB')
+
+    def test_commande_repartie(self):
+        compresseur = Compresseur()
+        sortie = [
+            compresseur.compresser(octets)
+            for octets in [b'\x1b', b'[', b'2J', b'aaaaa']
+        ]
+
+        self.assertEqual(sortie, [b'\x1b', b'[', b'2J', b'a\x12D'])
+
+    def test_definition_repartie(self):
+        compresseur = Compresseur()
+        sortie = b''.join(
+            compresseur.compresser(octets)
+            for octets in [b'\x1f\x23\x20', b'AAAAA', b'\x1f\x41\x41']
+        )
+
+        self.assertEqual(sortie, b'\x1f\x23\x20AAAAA\x1f\x41\x41')
+
+    def test_recommencer(self):
+        compresseur = Compresseur()
+        compresseur.compresser(b'\x1b')
+        compresseur.recommencer()
+
+        self.assertEqual(compresseur.compresser(b'aaaaa'), b'a\x12\x44')
+
+    def test_equivalence(self):
+        compresse = Compresseur().compresser(FLUX)
+
+        self.assertEqual(compresse, compresser_repetitions(FLUX))
+        self.assertLess(len(compresse), len(FLUX))
+        self.assertEqual(developper(compresse), developper(FLUX))
+
+    def test_decoupage_indifferent(self):
+        # Quel que soit le découpage des envois, le Minitel affiche la même
+        # chose qu’avec un envoi unique. Seules les suites coupées par le
+        # découpage sont moins compressées.
+        attendu = developper(Compresseur().compresser(FLUX))
+        hasard = random.Random(1)
+
+        for _ in range(200):
+            compresseur = Compresseur()
+            sortie = b''.join(
+                compresseur.compresser(morceau)
+                for morceau in decouper_hasard(FLUX, hasard)
+            )
+
+            self.assertEqual(developper(sortie), attendu)
+
+class TestOptimiseur(unittest.TestCase):
+    def test_attribut_remplace(self):
+        self.assertEqual(
+            Optimiseur().optimiser(b'\x1f\x41\x41\x1bA\x1bBx'),
+            b'\x1f\x41\x41\x1bBx'
+        )
+
+    def test_attribut_en_vigueur(self):
+        optimiseur = Optimiseur()
+        optimiseur.optimiser(b'\x1f\x41\x41\x1bAx')
+
+        self.assertEqual(optimiseur.optimiser(b'\x1bAy'), b'y')
+
+    def test_positionnements_successifs(self):
+        self.assertEqual(
+            Optimiseur().optimiser(b'\x1bA\x1f\x41\x41\x1f\x42\x42x'),
+            b'\x1f\x42\x42x'
+        )
+
+    def test_deplacements_relatifs_conserves(self):
+        self.assertEqual(
+            Optimiseur().optimiser(b'\n\n\x1f\x42\x42x'),
+            b'\n\n\x1f\x42\x42x'
+        )
+
+    def test_repetitions(self):
+        self.assertEqual(
+            Optimiseur().optimiser(b'\x0c' + b'-' * 10),
+            b'\x0c-\x12\x49'
+        )
+
+    def test_sortie_ligne_zero(self):
+        # Un attribut destiné à la ligne 0 ne doit pas passer après le LF
+        # qui en sort, même si d’autres commandes ont été émises sur la
+        # ligne 0
+        self.assertEqual(
+            Optimiseur().optimiser(b'\x1f\x45\x41X\x1f@A\x0eb\x1bA\nY'),
+            b'\x1f\x45\x41X\x1f@A\x0eb\x1bA\nY'
+        )
+
+    def test_commande_incomplete_emise(self):
+        # Rien n’est retenu : la fin d’un envoi atteint le Minitel sans
+        # attendre l’envoi suivant
+        optimiseur = Optimiseur()
+        sortie = [
+            optimiseur.optimiser(octets)
+            for octets in [b'\x1f\x41\x41\x1b', b'[', b'2J', b'\x1b', b'Aa']
+        ]
+
+        self.assertEqual(sortie, [b'\x1f\x41\x41\x1b', b'[', b'2J', b'\x1b',
+                                  b'Aa'])
+        self.assertEqual(optimiseur.optimiser(b'\x1bAb'), b'b')
+
+    def test_recommencer(self):
+        optimiseur = Optimiseur()
+        optimiseur.optimiser(b'\x1f\x41\x41\x1bAx\x1b')
+        optimiseur.recommencer()
+
+        self.assertEqual(optimiseur.optimiser(b'\x1bAy'), b'\x1bAy')
+
+    def test_decoupage_indifferent(self):
+        attendu = developper(Optimiseur().optimiser(FLUX))
+        hasard = random.Random(2)
+
+        for _ in range(200):
+            optimiseur = Optimiseur()
+            sortie = b''.join(
+                optimiseur.optimiser(morceau)
+                for morceau in decouper_hasard(FLUX, hasard)
+            )
+
+            self.assertEqual(developper(sortie), attendu)
+
+if __name__ == '__main__':
+    unittest.main()
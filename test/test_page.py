@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Page"""
+
+import os
+import tempfile
+import unittest
+
+from minitel.Page import Page, CaptureMinitel, Compilateur
+
+def accueil(minitel):
+    """Construit un écran comportant un emplacement"""
+    minitel.efface()
+    minitel.position(1, 1)
+    minitel.envoyer('Bonjour ')
+    minitel.emplacement('nom', 6)
+    minitel.envoyer('!')
+
+class TestPage(unittest.TestCase):
+    def test_capture(self):
+        capture = CaptureMinitel()
+        accueil(capture)
+        page = capture.page()
+
+        self.assertEqual(page.emplacements, {'nom': 6})
+        self.assertTrue(page.octets(nom = 'Marcel').endswith(b'Marcel!'))
+        self.assertTrue(page.octets().endswith(b'Bonjour       !'))
+
+    def test_largeur_fixe(self):
+        page = Page([b'<', ('nom', 4), b'>'])
+
+        self.assertEqual(page.octets(nom = 'abcdef'), b'<abcd>')
+        self.assertEqual(page.octets(nom = 'a\nb\x0c'), b'<a b >')
+        self.assertEqual(page.octets(nom = 'é'), b'<\x19\x42e   >')
+
+    def test_largeur_en_cases(self):
+        # ñ et … n’ont pas d’équivalent Minitel et occupent plusieurs cases
+        page = Page([b'x', ('nom', 5), b'y'])
+
+        self.assertEqual(page.octets(nom = 'Muñoz'), b'xMun?oy')
+        self.assertEqual(page.octets(nom = 'a…b'), b'xa...by')
+        self.assertEqual(page.octets(nom = 'abcd…'), b'xabcd y')
+        self.assertEqual(page.octets(nom = 'éèàçù£'),
+                         b'x\x19\x42e\x19\x41e\x19\x41a\x19\x4bc'
+                         b'\x19\x41uy')
+
+    def test_mode_mixte(self):
+        page = Page([b'<', ('nom', 3), b'>'], 'MIXTE')
+
+        self.assertEqual(page.octets(nom = 'éà'), b'<\x0e{\x0f\x0e@\x0f >')
+
+    def test_page_statique(self):
+        page = Page([b'abc', b'def'])
+
+        self.assertEqual(page.octets(), b'abcdef')
+
+    def test_enregistrement(self):
+        page = Page([b'\x0c', ('nom', 4), b'fin'], 'MIXTE')
+
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, 'p.page')
+            page.enregistrer(chemin)
+            relue = Page.charger(chemin)
+
+            with open(chemin, 'r+b') as fichier:
+                fichier.truncate(os.path.getsize(chemin) - 1)
+
+            with self.assertRaises(ValueError):
+                Page.charger(chemin)
+
+        self.assertEqual(relue.segments, page.segments)
+        self.assertEqual(relue.mode, 'MIXTE')
+
+class TestCompilateur(unittest.TestCase):
+    def test_cache_disque(self):
+        appels = []
+
+        def construction(minitel):
+            appels.append(minitel)
+            accueil(minitel)
+
+        with tempfile.TemporaryDirectory() as dossier:
+            premiere = Compilateur(dossier).compiler('accueil', construction)
+            seconde = Compilateur(dossier).compiler('accueil', construction)
+
+            self.assertEqual(len(appels), 1)
+            self.assertEqual(seconde.segments, premiere.segments)
+
+            compilateur = Compilateur(dossier)
+            compilateur.invalider()
+            compilateur.compiler('accueil', construction)
+
+            self.assertEqual(len(appels), 2)
+
+    def test_modes_distincts(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            videotex = Compilateur(dossier).compiler('accueil', accueil)
+            mixte = Compilateur(dossier).compiler('accueil', accueil, 'MIXTE')
+
+            self.assertEqual(videotex.mode, 'VIDEOTEX')
+            self.assertEqual(mixte.mode, 'MIXTE')
+            self.assertEqual(
+                Compilateur(dossier).compiler('accueil', accueil).mode,
+                'VIDEOTEX'
+            )
+
+            compilateur = Compilateur(dossier)
+            compilateur.invalider('accueil')
+
+            self.assertEqual(os.listdir(dossier), [])
+
+    def test_nom_invalide(self):
+        compilateur = Compilateur()
+
+        for nom in ['', '../page', 'a/b', '.cachee', 'a b']:
+            with self.assertRaises(AssertionError):
+                compilateur.compiler(nom, accueil)
+
+if __name__ == '__main__':
+    unittest.main()
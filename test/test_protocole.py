@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Protocole"""
+
+import random
+import unittest
+
+from minitel.Protocole import Protocole
+
+from minitel.constantes import PRO2, PRO3, SOH
+
+# Frappes clavier mêlées à une identification, un acquittement PRO2 et un
+# acquittement PRO3, un ESC du clavier précédant l’acquittement PRO2
+FLUX = b'a\x01Cu2\x04b\x1b\x1b\x3a\x71\x40c\x1b\x3b\x63\x5a\x41d'
+
+def attendre(protocole, rappels = None):
+    """Enregistre les requêtes correspondant aux réponses de FLUX"""
+    def rappel():
+        if rappels != None:
+            rappels.append(len(protocole.requetes))
+
+    return [
+        protocole.attendre(PRO3, 5, rappel),
+        protocole.attendre(SOH, 5, rappel),
+        protocole.attendre(PRO2, 4, rappel),
+    ]
+
+class TestProtocole(unittest.TestCase):
+    def test_reponses(self):
+        protocole = Protocole()
+        rappels = []
+        pro3, soh, pro2 = attendre(protocole, rappels)
+
+        self.assertEqual(protocole.traiter(FLUX), b'ab\x1bcd')
+        self.assertEqual(soh.reponse, b'\x01Cu2\x04')
+        self.assertEqual(pro2.reponse, b'\x1b\x3a\x71\x40')
+        self.assertEqual(pro3.reponse, b'\x1b\x3b\x63\x5a\x41')
+        self.assertEqual(rappels, [2, 1, 0])
+        self.assertEqual(protocole.requetes, [])
+
+    def test_decoupage_indifferent(self):
+        hasard = random.Random(5)
+
+        for _ in range(200):
+            protocole = Protocole()
+            requetes = attendre(protocole)
+            passe = bytearray()
+            debut = 0
+            while debut < len(FLUX):
+                fin = debut + hasard.randint(1, 4)
+                passe += protocole.traiter(FLUX[debut:fin])
+                debut = fin
+
+            self.assertEqual(passe, b'ab\x1bcd')
+            self.assertTrue(all(requete.terminee for requete in requetes))
+
+    def test_sans_requete(self):
+        self.assertEqual(Protocole().traiter(b'\x1b\x3a'), b'\x1b\x3a')
+
+    def test_motif_vide(self):
+        protocole = Protocole()
+        requete = protocole.attendre(None, 2)
+
+        self.assertEqual(protocole.traiter(b'xyz'), b'z')
+        self.assertEqual(requete.reponse, b'xy')
+
+    def test_annulation(self):
+        # La réponse incomplète est confiée à la requête annulée, les
+        # caractères suivants redeviennent des frappes clavier
+        protocole = Protocole()
+        requete = protocole.attendre(PRO2, 4)
+
+        self.assertEqual(protocole.traiter(b'\x1b\x3a\x71'), b'')
+
+        protocole.annuler(requete)
+
+        self.assertEqual(requete.reponse, b'\x1b\x3a\x71')
+        self.assertFalse(requete.terminee)
+        self.assertEqual(requete.sequence().longueur, 3)
+        self.assertEqual(protocole.traiter(b'x'), b'x')
+
+    def test_expiration(self):
+        protocole = Protocole()
+        ancienne = protocole.attendre(PRO2, 4, echeance = 1)
+        recente = protocole.attendre(PRO3, 5, echeance = 3)
+
+        self.assertEqual(protocole.expirer(2), [ancienne])
+        self.assertEqual(protocole.requetes, [recente])
+        self.assertEqual(ancienne.sequence().longueur, 0)
+
+if __name__ == '__main__':
+    unittest.main()
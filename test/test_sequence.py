@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Sequence"""
+
+import unittest
+
+from minitel.Sequence import Sequence
+
+class TestSequence(unittest.TestCase):
+    def test_liste_imbriquee(self):
+        self.assertEqual(
+            bytes(Sequence(['dd', 32, ['dd', [32]]]).valeurs),
+            b'dd dd '
+        )
+
+    def test_octets_dans_une_liste(self):
+        sequence = Sequence([
+            b'\x1b', 'A', bytearray(b'B'), memoryview(b'C'), Sequence('D')
+        ])
+
+        self.assertEqual(bytes(sequence.valeurs), b'\x1bABCD')
+
+    def test_type_refuse(self):
+        for element in [None, (1, 2), 1.5]:
+            with self.assertRaises(TypeError):
+                Sequence(['a', element])
+
+    def test_accents(self):
+        self.assertEqual(bytes(Sequence('é').valeurs), b'\x19Be')
+        self.assertEqual(bytes(Sequence('à').valeurs), b'\x19Aa')
+
+    def test_majuscules_accentuees(self):
+        # Les majuscules gardent leur accent en Videotex
+        self.assertEqual(bytes(Sequence('É').valeurs), b'\x19BE')
+        self.assertEqual(bytes(Sequence('À').valeurs), b'\x19AA')
+        self.assertEqual(bytes(Sequence('Ç').valeurs), b'\x19KC')
+
+        # Les autres standards ne connaissent pas les diacritiques
+        self.assertEqual(bytes(Sequence('É', 'MIXTE').valeurs), b'E?')
+        self.assertEqual(bytes(Sequence('À', 'MIXTE').valeurs), b'A?')
+        self.assertEqual(bytes(Sequence('Ç', 'MIXTE').valeurs), b'C?')
+
+    def test_egalite(self):
+        self.assertEqual(Sequence('ab'), Sequence([0x61, 'b']))
+        self.assertEqual(Sequence('ab'), b'ab')
+        self.assertTrue(Sequence('ab').egale('ab'))
+        self.assertTrue(Sequence(0x61).egale([0x61]))
+
+    def test_egalite_et_empreinte(self):
+        # Deux valeurs égales ont toujours la même empreinte
+        self.assertNotEqual(Sequence('a'), 'a')
+        self.assertNotEqual(Sequence('a'), 0x61)
+        self.assertNotEqual(Sequence('a'), [0x61])
+        self.assertEqual(hash(Sequence('ab')), hash(b'ab'))
+        self.assertEqual({Sequence('ab'): 1}.get(b'ab'), 1)
+        self.assertNotIn('a', {Sequence('a')})
+
+if __name__ == '__main__':
+    unittest.main()
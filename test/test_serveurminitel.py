@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module ServeurMinitel à l’aide de sockets locales"""
+
+import errno
+import socket
+import threading
+import time
+import unittest
+
+from selectors import EVENT_READ
+
+from minitel.ServeurMinitel import ServeurMinitel
+from minitel.Transport import TransportBoucle
+
+class ServeurTest(ServeurMinitel):
+    """Serveur conservant les exceptions au lieu de les afficher"""
+    def __init__(self, application):
+        ServeurMinitel.__init__(self, application)
+        self.erreurs = []
+
+    def erreur_session(self, session, erreur):
+        self.erreurs.append((session, erreur))
+
+class EcouteDefaillante(socket.socket):
+    """Socket d’écoute ne pouvant plus accepter de connexion"""
+    def accept(self):
+        raise OSError(errno.EMFILE, 'trop de fichiers ouverts')
+
+def attendre(condition, delai = 5):
+    """Attend qu’une condition soit remplie"""
+    echeance = time.monotonic() + delai
+    while not condition() and time.monotonic() < echeance:
+        time.sleep(0.01)
+
+    return condition()
+
+class TestServeurMinitel(unittest.TestCase):
+    def setUp(self):
+        self.recu = []
+        self.numero = 0
+        self.serveur = ServeurTest(self.fabrique)
+        ecoute = self.serveur.ecouter('127.0.0.1', 0)
+        self.port = ecoute.getsockname()[1]
+        self.thread = threading.Thread(target = self.serveur.executer)
+        self.thread.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+
+        self.serveur.arreter()
+        socket.create_connection(('127.0.0.1', self.port)).close()
+        self.thread.join()
+        self.serveur.close()
+
+    def fabrique(self, session):
+        self.numero += 1
+        if self.numero == 2:
+            raise RuntimeError('fabrique')
+
+        session.envoyer('bonjour')
+
+        def application(sequence):
+            if bytes(sequence.valeurs) == b'!':
+                raise RuntimeError('application')
+
+            self.recu.append(bytes(sequence.valeurs))
+
+        return application
+
+    def connecter(self):
+        client = socket.create_connection(('127.0.0.1', self.port))
+        client.settimeout(5)
+        self.clients.append(client)
+
+        return client
+
+    def test_exceptions_isolees(self):
+        premier = self.connecter()
+        self.assertEqual(premier.recv(100), b'bonjour')
+
+        # La fabrique échoue pour la deuxième connexion
+        second = self.connecter()
+        self.assertEqual(second.recv(100), b'')
+        self.assertTrue(attendre(lambda: len(self.serveur.erreurs) == 1))
+        self.assertEqual(self.serveur.erreurs[0][0], None)
+
+        troisieme = self.connecter()
+        self.assertEqual(troisieme.recv(100), b'bonjour')
+
+        # L’application du troisième échoue, le premier reste servi
+        troisieme.sendall(b'!')
+        self.assertEqual(troisieme.recv(100), b'')
+        self.assertTrue(attendre(lambda: len(self.serveur.erreurs) == 2))
+
+        premier.sendall(b'a')
+        self.assertTrue(attendre(lambda: self.recu == [b'a']))
+        self.assertEqual(len(self.serveur.sessions), 1)
+
+class TestAcceptation(unittest.TestCase):
+    def test_echec_accept(self):
+        # L’échec d’accept est signalé sans arrêter la boucle ni la faire
+        # tourner à vide
+        serveur = ServeurTest(lambda session: None)
+        ecoute = EcouteDefaillante()
+        ecoute.bind(('127.0.0.1', 0))
+        ecoute.listen()
+        ecoute.setblocking(False)
+        serveur._ecoutes.append(ecoute)
+        serveur._selecteur.register(ecoute, EVENT_READ, serveur._accepter)
+
+        thread = threading.Thread(target = serveur.executer)
+        thread.start()
+        client = socket.create_connection(ecoute.getsockname())
+
+        try:
+            self.assertTrue(attendre(lambda: len(serveur.erreurs) > 0))
+            time.sleep(0.3)
+
+            self.assertEqual(len(serveur.erreurs), 1)
+            self.assertEqual(serveur.erreurs[0][1].errno, errno.EMFILE)
+            self.assertTrue(thread.is_alive())
+        finally:
+            serveur.arreter()
+            thread.join(5)
+            client.close()
+            serveur.close()
+
+class TestBoucle(unittest.TestCase):
+    def test_session_en_boucle(self):
+        # Un transport en boucle peut être surveillé par le serveur
+        recu = []
+
+        def fabrique(session):
+            session.envoyer('bonjour')
+
+            def application(sequence):
+                recu.append(bytes(sequence.valeurs))
+                if bytes(sequence.valeurs) == b'z':
+                    serveur.arreter()
+
+            return application
+
+        serveur = ServeurTest(fabrique)
+        local, distant = TransportBoucle.paire(timeout = 5)
+        serveur.ajouter(local)
+
+        thread = threading.Thread(target = serveur.executer)
+        thread.start()
+
+        try:
+            self.assertEqual(distant.read(100), b'bonjour')
+            distant.write(b'az')
+            thread.join(5)
+
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(recu, [b'a', b'z'])
+            self.assertEqual(serveur.erreurs, [])
+        finally:
+            serveur.arreter()
+            thread.join(5)
+            serveur.close()
+            distant.close()
+
+if __name__ == '__main__':
+    unittest.main()
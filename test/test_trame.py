@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Vérifications du module Trame"""
+
+import unittest
+
+from minitel.Ecran import Ecran, LIGNES
+from minitel.Trame import Trame
+
+def remplir(trame):
+    """Écrit dans une trame des textes aux attributs variés"""
+    trame.ecrire(1, 1, 'Bienvenue', couleur = 'jaune')
+    trame.ecrire(5, 3, 'Été à Noël', inversion = True)
+    trame.ecrire(1, 10, '-' * 40, couleur = 'bleu')
+    trame.ecrire(30, 24, 'Suite', clignotement = True)
+    trame.ecrire(2, 12, '\x7f\x7f\x7f', semigraphique = True,
+                 soulignement = True)
+
+def afficher(trame, ecran):
+    """Applique au modèle d’écran le rendu d’une trame
+
+    :returns:
+        les octets émis
+    """
+    octets = trame.rendre(ecran)
+    ecran.traiter(octets)
+
+    return octets
+
+class TestTrame(unittest.TestCase):
+    def assertAffiche(self, ecran, trame):
+        self.assertEqual(ecran.grille[1:LIGNES], trame.grille[1:LIGNES])
+
+    def test_ecran_inconnu(self):
+        trame = Trame()
+        remplir(trame)
+        ecran = Ecran()
+
+        afficher(trame, ecran)
+
+        self.assertAffiche(ecran, trame)
+
+    def test_rien_a_changer(self):
+        trame = Trame()
+        remplir(trame)
+        ecran = Ecran()
+        afficher(trame, ecran)
+
+        self.assertEqual(trame.rendre(ecran), b'')
+
+    def test_difference(self):
+        trame = Trame()
+        remplir(trame)
+        ecran = Ecran()
+        complet = afficher(trame, ecran)
+
+        suivante = trame.copie()
+        suivante.ecrire(5, 3, 'Hiver')
+        suivante.ecrire(1, 10, ' ' * 40)
+        octets = afficher(suivante, ecran)
+
+        self.assertAffiche(ecran, suivante)
+        self.assertLess(len(octets), len(complet))
+        self.assertEqual(trame.case(5, 3)[0], b'\x19\x42E')
+
+    def test_rendu_sans_effet_sur_le_modele(self):
+        trame = Trame()
+        remplir(trame)
+        ecran = Ecran()
+        ecran.traiter(b'\x0c')
+        avant = [list(ligne) for ligne in ecran.grille]
+
+        trame.rendre(ecran)
+
+        self.assertEqual(ecran.grille, avant)
+
+    def test_depassement(self):
+        trame = Trame()
+        trame.ecrire(38, 2, 'abcdef')
+
+        self.assertEqual(trame.case(40, 2)[0], b'c')
+        self.assertEqual(trame.case(1, 3), Trame().case(1, 3))
+
+if __name__ == '__main__':
+    unittest.main()